@@ -1,13 +1,13 @@
+import os
+
 import pandas as pd
-import re
-import numpy as np
 import streamlit as st
-import plotly.graph_objs as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import seaborn as sns
+from datetime import date
 from pathlib import Path
 
+from tariff import diagnostics as diag
+from tariff import CountryIndex, HsIndex, HsPrefixIndex, RateMatrix, TariffCube, ValidityIndex, hs_str, in_force, load_item_table, load_tariff_frame, normalize_query
+
 
 # =========================================
 # 기본 설정
@@ -20,54 +20,55 @@ hs_path = "C:/Users/p/Desktop/인턴/streamlit/data/unique_hscode_semi.csv"
 base_dir = Path("C:/Users/p/Desktop/인턴/streamlit/data/tariff_semi")
 
 YEARS = [2020, 2021, 2022, 2023, 2024, 2025]
+DATE_RANGE = (date(YEARS[0], 1, 1), date(YEARS[-1], 12, 31))
 
 # =========================================
 # 유틸 함수
 # =========================================
+def cached(fn): # st.cache_resource + 호출/miss 카운터 (tariff.diag 로그)
+    name = fn.__name__
+    return diag.count_call(name)(st.cache_resource(diag.count_miss(name)(fn)))
+
 @st.cache_data
 def load_data(): # 데이터 읽기
     df = pd.read_csv(tariff_path, dtype=str, encoding="utf-8-sig")
     return df
 
-def load_data_all():
-    dfs = []
-    for y in YEARS:
-        f = base_dir / f"tariff_semi_{y}_with_info.csv"
-        if not f.exists():
-            continue
-        df = pd.read_csv(f, dtype=str, encoding="utf-8-sig")
-        df["연도"] = y # 2020~2025 데이터 하나로 합치고 새로운 컬럼 "연도" 추가
-        # 관세율 숫자형 변환
-        if "관세율" in df.columns:
-            df["관세율_num"] = pd.to_numeric(df["관세율"].str.replace(",",""), errors="coerce") # 문자열 -> 숫자 변환
-        dfs.append(df)
-    if dfs:
-        return pd.concat(dfs, ignore_index=True)
-    else:
-        return pd.DataFrame()
-
-def load_hs_list():
-    df_hs = pd.read_csv(hs_path, encoding="utf-8-sig")
+@cached
+def load_data_all(): # 연도별 스냅샷(data/.cache)에서 읽고, 바뀐 CSV 만 다시 파싱
+    return load_tariff_frame(base_dir, YEARS)
+
+@cached
+def load_items(): # 품목 차원 테이블 (품목번호 → 결정세번/이름/대분류/소분류)
+    return load_item_table(base_dir, YEARS)
+
+@cached
+def load_hs_index(): # 품목번호 → 연도별 행 구간 / 대표 품목명
+    return HsIndex(load_data_all(), load_items())
+
+@cached
+def load_validity_index(): # (품목번호, 적용개시일~적용만료일) → 기준일에 적용 중인 행
+    return ValidityIndex(load_hs_index())
+
+@cached
+def load_country_index(): # 국가 → 협정 행 역색인 (국가 목록도 데이터에서 추출)
+    return CountryIndex(load_hs_index())
+
+@cached
+def load_rate_matrix(): # (HS × 연도 × 국가) → 적용 협정 / 최저 관세율
+    return RateMatrix(load_country_index())
+
+@cached
+def load_cube(): # HS·류·호·소분류 × 연도 × 관세율구분 집계 큐브
+    return TariffCube(load_data_all(), load_items())
+
+@cached
+def load_hs_list(): # HS 목록 → 접두어 인덱스(정렬 배열 + bisect)
+    df_hs = pd.read_csv(hs_path, dtype=str, encoding="utf-8-sig")
     # 컬럼명이 'HS코드' 또는 첫 컬럼일 수 있음
     col = "HS코드" if "HS코드" in df_hs.columns else df_hs.columns[0]
-    hs_list = (
-        df_hs[col].astype(str).dropna().str.strip().replace("", pd.NA).dropna().unique().tolist()
-    )
-    hs_list = sorted(set(hs_list))
-    return hs_list
-
-
-def token_match_country(series: pd.Series, country: str) -> pd.Series:
-    """
-    데이터 '국가' 셀이 '브라질 미국 중국' 식으로 공백 구분일 때,
-    선택 국가가 토큰으로 포함되는 행만 True.
-    """
-    patt = re.compile(rf"(?:^|\s){re.escape(country)}(?:\s|$)")
-    out = series.astype(str).str.replace(r"\s+", " ", regex=True).str.strip().apply(
-        lambda s: bool(patt.search(s))
-    )
-    out.index = series.index   # ✅ 인덱스 강제 일치
-    return out
+    return HsPrefixIndex(df_hs[col].dropna())
+
 
 def main():
     # =========================================
@@ -79,6 +80,10 @@ def main():
     #     st.error(f"데이터 로드 오류: {e}")
     #     st.stop()
     df = load_data_all()
+    hs_idx = load_hs_index()
+    cty_idx = load_country_index()
+    rate_mx = load_rate_matrix()
+    cube = load_cube()
     hs_list = load_hs_list()
 
     # =========================================
@@ -89,13 +94,9 @@ def main():
     
     # hs코드 검색 + 후보
     q = st.sidebar.text_input("HS 코드 검색", value="", placeholder="예: 8486, 8542, ...")
-    if q:
-        candidates = [h for h in hs_list if h.startswith(q)]
-        if not candidates:
-            st.sidebar.warning("해당 패턴으로 시작하는 HS 코드가 없습니다.")
-            candidates = hs_list
-    else:
-        candidates = hs_list  # 너무 길면 UI가 무거워지므로 100개만 노출
+    candidates = hs_list.match(normalize_query(q), limit=1000)  # 너무 길면 UI가 무거워지므로 1000개만 노출
+    if q and not candidates:
+        st.sidebar.warning("해당 패턴으로 시작하는 HS 코드가 없습니다.")
 
     # HS코드 선택
     hs_selected = st.sidebar.selectbox("HS코드 선택", candidates)
@@ -137,25 +138,16 @@ def main():
     # 관세율 조회
     # =========================================
     if menu=="수입 관세율 조회":
-                # 고정 국가 리스트
-        COUNTRIES = [
-            "그리스","네덜란드","노르웨이","뉴질랜드","니카라과","덴마크","독일","라오스","라트비아",
-            "루마니아","룩셈부르크","리투아니아","리히텐슈타인","말레이시아","몰타","미국","미얀마",
-            "방글라데시","베트남","벨기에","불가리아","브루나이","사이프러스","스리랑카","스웨덴",
-            "스위스","스페인","슬로바키아","슬로베니아","싱가포르","아이슬란드","아일랜드","에스토니아",
-            "엘살바도르","영국","오스트리아","온두라스","이스라엘","이탈리아","인도","인도네시아",
-            "일본","중국","체코","칠레","캄보디아","캐나다","코스타리카","콜롬비아","크로아티아",
-            "쿠웨이트","태국","터키","페루","포르투갈","폴란드","프랑스","핀란드","헝가리",
-            "호주","홍콩"
-        ]
-
-        df_sel = df[df["품목번호"] == hs_selected]
-
+        # 국가 리스트 (데이터의 '국가' 컬럼에서 추출)
+        COUNTRIES = cty_idx.countries
+        valid_idx = load_validity_index()
+        ref_date = st.sidebar.date_input("기준일", value=min(date.today(), DATE_RANGE[1]),
+                                         min_value=DATE_RANGE[0], max_value=DATE_RANGE[1])
 
         st.markdown("## 📌수입 관세율 조회")
         col1, col2 = st.columns(2)
             
-        # # ==== 표1 - 2025기준 적용 협정/관세율 (필요없을것같은디;;)
+        # # ==== 표1 - 기준일 적용 협정/관세율 (필요없을것같은디;;)
         with col1: 
             if df.empty:
                 st.error("데이터가 없습니다. 파일 경로를 확인하세요.")
@@ -165,72 +157,35 @@ def main():
             if "품목번호" not in df.columns:
                 st.error("데이터에 '품목번호' 컬럼이 없습니다.")
                 return
-            df_sel = df[df["품목번호"] == hs_selected]
+            df_sel = hs_idx.rows(hs_selected)
 
             if df_sel.empty:
                 st.warning("선택한 HS 코드에 해당하는 데이터가 없습니다.")
                 return
 
             # 대표 품목명
-            item_name = None
-            for col in ["품명","품목명","이름","소분류","대분류"]:
-                if col in df_sel.columns:
-                    vals = df_sel[col].dropna().unique()
-                    if len(vals) > 0:
-                        item_name = vals[0]
-                        break
+            item_name = hs_idx.item_name(hs_selected)
             if item_name:
                 st.markdown(f"**품목명:** {item_name}")
             # st.markdown("## 📌수입 관세율 조회")
-            df_sel_2025 = df_sel[df_sel["연도"] == 2025]
-            st.markdown("### 2025년 관세 협정 / 관세율")
+            df_sel_date = valid_idx.rows(hs_selected, ref_date)
+            st.markdown(f"### {ref_date:%Y-%m-%d} 기준 관세 협정 / 관세율")
             show_cols = ["관세율구분값", "관세율"] # 보여줄 컬럼만 선택
             # 실제 데이터프레임에 해당 컬럼이 있는지 확인 후 추출
-            available_cols = [c for c in show_cols if c in df_sel_2025.columns]
+            available_cols = [c for c in show_cols if c in df_sel_date.columns]
             st.dataframe(
-                df_sel_2025[available_cols].sort_values(["관세율"]),
+                df_sel_date[available_cols].sort_values(["관세율"]),
                 use_container_width=True,
                 hide_index=True
             )
 
-        ###---------------------------
-        #     min_rate = df_sel_2025["관세율_num"].min()
-        #     df_min = df_sel_2025[df_sel_2025["관세율_num"] == min_rate]
-        # # ====표2 - 최저세율 적용 국가들
-        #     if "국가" in df_sel_2025.columns and "관세율_num" in df_sel_2025.columns:
-        #         st.markdown("### 최저세율 적용 국가")
-        #         # grp = (df_sel_2025.dropna(subset=["관세율_num"])
-        #         #                 .groupby("국가", as_index=False)["관세율_num"].min()
-        #         #                 .sort_values("관세율_num"))
-        #         # st.dataframe(grp.rename(columns={"관세율_num":"최저 관세율(%)"}),
-        #         #             use_container_width=True, hide_index=True)
-        #         expanded_rows = []
-
-        #         for _, row in df_min.iterrows():
-        #             rate = row["관세율_num"]
-
-        #             if str(row.get("적용국가구분")) == "1":  
-        #                 # 전체 국가 공통 (COUNTRIES 전체 적용)
-        #                 for c in COUNTRIES:
-        #                     expanded_rows.append({"국가": c, "관세율_num": min_rate})
-
-        #             elif str(row.get("적용국가구분")) == "2":  
-        #                 # 특정 국가 리스트 풀기
-        #                 countries = str(row.get("국가", "")).split()
-        #                 for c in countries:
-        #                     if c and c.lower() != "all" and c != "nan":
-        #                         expanded_rows.append({"국가": c, "관세율_num": min_rate})
-
-        #         df_expanded = pd.DataFrame(expanded_rows)
-
-        #         if not df_expanded.empty:
-        #             grp = (df_expanded.groupby("국가", as_index=False)["관세율_num"]
-        #                                 .min()
-        #                                 .sort_values("관세율_num"))
-        #             st.dataframe(grp.rename(columns={"관세율_num":"최저 관세율(%)"}),
-        #                         use_container_width=True, hide_index=True)
-        #         else:
-        #             st.info("적용 국가 데이터가 없습니다.")
+        # ====표2 - 최저세율 적용 국가들 (미리 계산된 HS×연도×국가 행렬에서 조회)
+            st.markdown(f"### 최저세율 적용 국가 ({ref_date.year}년)")
+            cheapest = rate_mx.cheapest(hs_selected, ref_date.year)
+            if not cheapest.empty:
+                st.dataframe(cheapest, use_container_width=True, hide_index=True)
+            else:
+                st.info("적용 국가 데이터가 없습니다.")
         with col2:
             st.markdown("### ")
             # st.markdown("")
@@ -250,14 +205,11 @@ def main():
             
             
             sel_cty = st.selectbox("국가 선택", sorted(filtered_countries))
-            if "국가" in df_sel_2025.columns:
-                # 1) 기본세율 (모든 국가 공통)
-                base = df_sel_2025[df_sel_2025["적용국가구분"] == "1"]
-                # 2) 특정 국가 협정세율 (적용국가구분=2 + 국가 포함)
-                mask = (df_sel_2025["적용국가구분"] == "2") & token_match_country(df_sel_2025["국가"], sel_cty)
-                country_rows = df_sel_2025.loc[mask]
-                # 3) 합치기 + 중복 제거
-                cut_cty = pd.concat([base, country_rows], ignore_index=True)
+            if "국가" in df_sel_date.columns:
+                # 1) 기본세율 (모든 국가 공통) + 2) 특정 국가 협정세율 (적용국가구분=2 + 국가 포함)
+                cut_cty = cty_idx.rows(hs_selected, sel_cty, ref_date.year)
+                cut_cty = cut_cty[in_force(cut_cty, ref_date)].reset_index(drop=True)
+                # 3) 중복 제거
                 cut_cty = cut_cty.drop_duplicates(subset=["관세율구분값","관세율"])
                 # 보여줄 컬럼
                 cols_cty = [c for c in ["관세율구분","관세율구분값","관세율"] if c in cut_cty.columns]
@@ -266,8 +218,8 @@ def main():
                 else:
                     st.dataframe(cut_cty[cols_cty].sort_values(["관세율"]),
                                 use_container_width=True, hide_index=True)
-            # mask = token_match_country(df_sel_2025["국가"], sel_cty)
-            # cut_cty = df_sel_2025.loc[mask].copy()   # 이제 에러 안 남
+            # mask = token_match_country(df_sel_date["국가"], sel_cty)
+            # cut_cty = df_sel_date.loc[mask].copy()   # 이제 에러 안 남
             # cols_cty = [c for c in ["관세율구분","관세율구분값","관세율"] if c in cut_cty.columns]
             # if cut_cty.empty:
             #     st.info(f"{sel_cty} 관련 협정 데이터가 없습니다.")
@@ -293,32 +245,27 @@ def main():
         if "품목번호" not in df.columns:
             st.error("데이터에 '품목번호' 컬럼이 없습니다.")
             return
-        df_sel = df[df["품목번호"] == hs_selected]
+        df_sel = hs_idx.rows(hs_selected)
 
         if df_sel.empty:
             st.warning("선택한 HS 코드에 해당하는 데이터가 없습니다.")
             return
 
         # 대표 품목명
-        item_name = None
-        for col in ["품명","품목명","이름","소분류","대분류"]:
-            if col in df_sel.columns:
-                vals = df_sel[col].dropna().unique()
-                if len(vals) > 0:
-                    item_name = vals[0]
-                    break
+        item_name = hs_idx.item_name(hs_selected)
         if item_name:
             st.markdown(f"**품목명:** {item_name}")
         col1, col2 = st.columns(2)
         with col1:
 
-            # 연도별 평균 관세율 집계
+            # 연도별 평균 관세율 집계 (미리 계산된 큐브에서 조회)
             if "관세율" in df_sel.columns:
-                grp = df_sel.groupby("연도", as_index=False)["관세율_num"].mean()
+                grp = cube.series("세번", hs_str(hs_selected))[["연도", "mean"]].rename(columns={"mean": "관세율_num"})
                 st.markdown("#### 연도별 평균 관세율")
                 st.dataframe(grp.rename(columns={"관세율_num":"평균 관세율(%)"}), use_container_width=True, hide_index=True)
         with col2:
             st.markdown("### 연도별 평균 관세율 추이")
+            import plotly.express as px  # 차트 페이지에서만 import
             fig = px.line(grp, x="연도", y="관세율_num", markers=True)
                          # title="연도별 평균 관세율 추이")
             fig.update_layout(yaxis_title="관세율(%)")
@@ -326,4 +273,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    diag.setup_logging(os.environ.get("TARIFF_DIAG_LOG"))
+    with diag.rerun():
+        main()
\ No newline at end of file
@@ -1,13 +1,38 @@
+import functools
+import os
+import threading
+
 import pandas as pd
-import re
-import numpy as np
 import streamlit as st
-import plotly.graph_objs as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import seaborn as sns
+from datetime import date
 from pathlib import Path
 
+from tariff import diagnostics as diag
+from tariff import shared
+from tariff import (
+    CHANGE_KINDS,
+    HS_LEVELS,
+    TOTAL,
+    ChangeLog,
+    CountryIndex,
+    HsIndex,
+    HsPrefixIndex,
+    NameIndex,
+    PartitionedStore,
+    RateMatrix,
+    TariffCube,
+    TariffStore,
+    TariffWatcher,
+    ValidityIndex,
+    country_names,
+    data_version,
+    in_force,
+    load_item_table,
+    normalize_query,
+    read_csv_safe,
+)
+from tariff.config import SHARED_DIR, current_years  # SHARED_DIR: 워밍업/CLI 와 같은 공유 Arrow 위치
+
 # =========================================
 # 기본 설정
 # =========================================
@@ -19,208 +44,654 @@ DATA_DIR = APP_DIR / "data"
 TARIFF_DIR = DATA_DIR / "tariff_semi"   # 예: data/tariff_semi/tariff_semi_2020_with_info.csv
 HS_PATH = DATA_DIR / "unique_hscode_semi.csv"
 
-YEARS = [2020, 2021, 2022, 2023, 2024, 2025]
+# 폴더에 있는 연도 파일 기준 (rerun 마다 다시 읽으므로 새 연도 파일을 넣으면 재시작 없이 반영)
+# 프로세스 단위 캐시는 이 연도 목록을 키로 받으므로 연도가 늘거나 줄면 새로 만들어짐
+YEARS = current_years(TARIFF_DIR)
+# 전체 연도 캐시 키 — 캐시 키는 실제로 넘긴 인자만 보므로 로더에는 기본값을 두지 않고 항상 이 값을 넘김
+# (인자를 빼먹으면 reload_years 가 갱신하지 않는 별도 캐시가 생기므로 호출 자체가 실패하게 둠)
+ALL_YEARS = tuple(YEARS)
+DATE_RANGE = (date(YEARS[0], 1, 1), date(YEARS[-1], 12, 31))  # 기준일로 고를 수 있는 범위
+MAX_HS_OPTIONS = 1000  # HS코드 선택 박스에 한 번에 올릴 최대 후보 수
+MAX_NAME_HITS = 200    # 품목명 검색 결과 최대 개수
+MAX_HS_SCOPES = 1024   # (HS, 연도) 단위 인덱스를 프로세스당 캐시해 둘 최대 개수
+MAX_YEAR_SETS = 2      # 연도 목록을 키로 쓰는 프로세스 단위 구조를 남겨 둘 개수 (직전 목록까지)
+BOM_PAGE = "BOM 일괄 조회"
+CHANGE_PAGE = "연도별 변경 내역"
+EXPORT_PAGE = "관세율 일괄 내보내기"
+HEATMAP_PAGE = "HS 그룹 비교"
+EXPORT_DIR = DATA_DIR / ".cache" / "exports"  # 내보내기 결과 임시 파일 (세션당 최근 1개)
+DIAG_PAGE = "진단(diagnostics)"  # ?diag=1 로 접속했을 때만 메뉴에 노출
 
 # =========================================
 # 유틸 함수
 # =========================================
-def _read_csv_safe(path: Path, **kwargs) -> pd.DataFrame:
-    """utf-8-sig → utf-8 순서로 시도하여 안전하게 읽기"""
+def cached(fn=None, *, max_entries: int | None = None):
+    """st.cache_resource + 호출/miss 카운터 (진단 페이지의 캐시 적중률)"""
+    if fn is None:
+        return functools.partial(cached, max_entries=max_entries)
+    name = fn.__name__
+    cache = st.cache_resource(show_spinner=False, max_entries=max_entries)
+    return diag.count_call(name)(cache(diag.count_miss(name)(fn)))
+
+def fragment(page: str, run_every: float | None = None):
+    """
+    st.fragment + 진단 기록 — 안쪽 위젯이 바뀌면 이 함수만 다시 실행 (입력은 인자로만 받음)
+    run_every(초)를 주면 그 간격으로 이 부분만 주기적으로 다시 실행 (진행률 표시 등)
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            with diag.partial(page):
+                return fn(*args, **kwargs)
+        return st.fragment(body, run_every=run_every)
+    return deco
+
+@cached(max_entries=MAX_YEAR_SETS)
+def load_store(years: tuple) -> TariffStore:
+    """연도별 지연 로딩 저장소 (연도 목록당 1개, 연도마다 처음 요청될 때만 로딩)"""
+    return TariffStore(TARIFF_DIR, list(years))
+
+@cached
+def load_data_all(version: str, years: tuple) -> pd.DataFrame:
+    """
+    data/tariff_semi 아래 연도별 관세율 파일(품목 정보 없는 fact)을 로드해 합치고 숫자 컬럼 생성
+    - 컬럼형 스냅샷(data/.cache)에서 읽고, 원본 CSV 가 바뀐 연도만 다시 파싱
+    - years 에 지정한 연도만 (동시에) 로딩 → 페이지가 쓰는 연도만 비용 지불
+    - version(원본 파일 크기/mtime)이 바뀌면 캐시가 새로 만들어짐
+    - 호스트당 한 번 Arrow IPC 파일로 공개하고, 모든 워커가 읽기 전용 memory-map 으로 공유
+    - 세션 간 공유 객체를 그대로 반환(rerun 마다 복사 없음) → 호출 측에서 수정 금지
+    """
+    def build() -> pd.DataFrame:
+        store = load_store(ALL_YEARS)
+        df = store.frame(list(years))
+        store.release(list(years))  # 공개한 뒤에는 매핑된 사본만 쓰므로 연도별 사본은 놓아 줌
+        return df
+
+    return shared.shared_frame(SHARED_DIR, version, "facts_" + "-".join(map(str, years)), build)
+
+@cached(max_entries=MAX_YEAR_SETS)
+def load_partitions(years: tuple) -> PartitionedStore:
+    """
+    연도 × HS 류(2단위) parquet 파티션 (연도 목록당 1개) — 원본이 바뀐 연도는 reload_years 가 다시 씀
+    (연도가 추가되면 새 목록으로 만들어지고, 디스크의 기존 연도 파티션은 그대로 재사용)
+    """
+    parts = PartitionedStore(TARIFF_DIR, list(years))
+    parts.sync()
+    return parts
+
+@cached(max_entries=MAX_YEAR_SETS)
+def load_watcher(years: tuple) -> TariffWatcher:
+    """연도 파일 감시 (연도 목록당 1개, rerun 마다 stat 만 확인)"""
+    return TariffWatcher(TARIFF_DIR, list(years))
+
+def version_of(years=None) -> str:
+    """
+    해당 연도 원본만으로 만든 데이터 버전 — 연도 범위가 좁은 캐시는 이 값을 키로 써서
+    다른 연도 파일이 바뀌어도 그대로 적중
+    """
+    return data_version(TARIFF_DIR, list(years or YEARS))
+
+@cached
+def load_countries(version: str, years: tuple) -> list[str]:
+    """국가 목록 — 해당 연도 파티션의 '국가' 컬럼만 읽어서 추출 (version 은 version_of(years))"""
+    return country_names(load_partitions(ALL_YEARS).distinct("국가", years, 적용국가구분=2))
+
+@cached
+def load_items(version: str) -> pd.DataFrame:
+    """품목 차원 테이블 (품목번호 → 결정세번/이름/대분류/소분류) — 필요할 때만 관세율 행에 join (워커 간 공유)"""
+    years = list(YEARS)  # version(version_of(ALL_YEARS)) 이 연도 목록까지 담고 있으므로 캐시 키로 충분
+    return shared.shared_frame(SHARED_DIR, version, "items", lambda: load_item_table(TARIFF_DIR, years))
+
+@cached(max_entries=MAX_HS_SCOPES)
+def load_hs_index(version: str, years: tuple, hs: str = "") -> HsIndex:
+    """
+    품목번호 → 연도별 행 구간 / 대표 품목명 인덱스 (version 은 version_of(years))
+    - hs 를 주면 그 HS·연도 파티션만 읽어서 만든 작은 인덱스 (조회 페이지용)
+    - hs 가 없으면 해당 연도 전체 (BOM 등 여러 HS 를 한 번에 보는 페이지용)
+    """
+    items = load_items(version_of(ALL_YEARS))
+    if hs:
+        return HsIndex(load_partitions(ALL_YEARS).query(hs=hs, years=years), items)
+    return HsIndex(load_data_all(version, years), items)
+
+@cached(max_entries=MAX_HS_SCOPES)
+def load_validity_index(version: str, years: tuple, hs: str = "") -> ValidityIndex:
+    """(품목번호, 적용개시일~적용만료일) 유효기간 인덱스 — 기준일에 적용 중인 행 조회"""
+    return ValidityIndex(load_hs_index(version, years, hs))
+
+@cached(max_entries=MAX_HS_SCOPES)
+def load_country_index(version: str, years: tuple, hs: str = "") -> CountryIndex:
+    """국가 → 협정 행 역색인 (HS 하나만 담을 때도 국가 축은 그 연도 전체 국가 목록)"""
+    return CountryIndex(load_hs_index(version, years, hs), load_countries(version, years) if hs else None)
+
+@cached(max_entries=MAX_HS_SCOPES)
+def load_rate_matrix(version: str, years: tuple, hs: str = "") -> RateMatrix:
+    """(HS × 연도 × 국가) → 적용 협정 / 최저 관세율 행렬"""
+    return RateMatrix(load_country_index(version, years, hs))
+
+@cached
+def load_rate_grid(version: str):
+    """HS × 연도 비교용 조밀 행렬 (최저/기본세율, 특혜 국가 비율) — 데이터 버전당 1회 피벗"""
+    from tariff import heatmap  # 비교 페이지/워밍업에서만 필요
+
+    return heatmap.RateGrid(load_rate_matrix(version, ALL_YEARS), load_cube(ALL_YEARS),
+                            load_hs_index(version, ALL_YEARS).names)
+
+@cached(max_entries=MAX_YEAR_SETS)
+def load_cube(years: tuple) -> TariffCube:
+    """HS·류·호·소분류 × 연도 × 관세율구분 집계 큐브 (연도 목록당 1개, 바뀐 연도만 reload_years 가 갱신)"""
+    version = version_of(years)
+    return TariffCube(load_data_all(version, years), load_items(version))  # 추이 페이지와 같은 캐시 키
+
+@cached(max_entries=MAX_YEAR_SETS)
+def load_changes(years: tuple) -> ChangeLog:
+    """연속 연도 간 변경 내역(신규/삭제/인상/인하/국가 변경) — 연도 목록당 1회 비교, 이후엔 바뀐 연도 쌍만"""
+    version = version_of(years)
+    return ChangeLog(load_data_all(version, years), load_items(version))  # 추이 페이지와 같은 캐시 키
+
+def reload_years(changed: list[int], years: tuple) -> None:
+    """
+    원본이 바뀐/추가된/삭제된 연도만 다시 읽어 프로세스 단위 구조를 제자리 갱신 (캐시 비우기·재시작 없음)
+    - 파티션: 그 연도 디렉터리만 다시 씀 / 큐브: 그 연도 칸만 / 변경 내역: 그 연도가 낀 쌍만
+    - 연도 범위가 좁은 캐시(조회 페이지)는 version_of(연도) 키라서 다른 연도는 계속 적중
+    - 전체 연도 프레임은 새 버전 키로 스냅샷에서 다시 합침 (CSV 는 바뀐 연도만 재파싱)
+    """
+    with diag.span("reload"):
+        store = load_store(years)
+        store.release(changed)  # 이전 원본으로 읽어 둔 연도 사본은 버림
+        items = load_items(version_of(years))
+        load_partitions(years).sync(changed)
+        cube = load_cube(years)
+        for y in changed:
+            cube.update(y, store.year(y), items)
+        load_changes(years).update(changed, store.year, items)
+        store.release(changed)
+
+@cached
+def warm_up(version: str, years: tuple) -> threading.Thread:
+    """
+    프로세스당(데이터 버전당) 한 번: 지금 페이지가 안 쓰는 캐시를 백그라운드 스레드에서 미리 채움
+    (호스트 캐시는 배포 시 `python -m tariff warmup` 으로 미리 만들어 두면 여기서는 매핑+인덱스만 남음)
+    """
+    def run():
+        with diag.span("warmup"):
+            last = (DATE_RANGE[1].year,)
+            load_countries(version_of(last), last)
+            load_cube(years)
+            load_changes(years)
+            load_rate_matrix(version, years)
+            load_validity_index(version, years)
+            load_rate_grid(version)
+
+    t = threading.Thread(target=run, name="tariff-warmup", daemon=True)
+    t.start()
+    return t
+
+@cached
+def load_name_index(version: str) -> NameIndex:
+    """품목명/대분류/소분류 문자 n-gram 검색 인덱스 — 데이터 버전당 1회 구성"""
+    return NameIndex(load_items(version))
+
+@cached
+def load_hs_list() -> HsPrefixIndex:
+    """data/unique_hscode_semi.csv에서 HS 목록 로드 → 접두어/계층 인덱스로 1회 구성"""
+    df_hs = read_csv_safe(HS_PATH, dtype=str)
+    col = "HS코드" if "HS코드" in df_hs.columns else df_hs.columns[0]
+    return HsPrefixIndex(df_hs[col].dropna())
+
+def render_diagnostics():
+    """숨김 진단 페이지: 캐시 적중률 / 단계별 시간 / 최근 재실행 / RSS"""
+    st.markdown("## 🛠 진단")
+    cur, peak = diag.rss_mb()
+    runs = diag.recent_runs()
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("현재 RSS (MB)", cur if cur is not None else "-")
+    m2.metric("최대 RSS (MB)", peak if peak is not None else "-")
+    m3.metric("기록된 재실행", len(runs))
+    m4.metric("로딩된 연도", ", ".join(map(str, load_store(ALL_YEARS).loaded_years())) or "-")
+
+    st.markdown("### 공유 Arrow 파일 (워커 간 memory-map)")
+    files = shared.published(SHARED_DIR)
+    if files:
+        st.dataframe(pd.DataFrame(files), use_container_width=True, hide_index=True)
+    else:
+        st.caption(f"{SHARED_DIR} 에 공개된 파일이 없습니다.")
+    st.markdown("### 캐시 함수")
+    st.dataframe(pd.DataFrame(diag.cache_stats()), use_container_width=True, hide_index=True)
+    st.markdown("### 단계별 시간 (최근 측정 기준)")
+    st.dataframe(pd.DataFrame(diag.span_stats()), use_container_width=True, hide_index=True)
+    st.markdown("### 최근 재실행")
+    if runs:
+        table = pd.DataFrame([{
+            "시각": pd.Timestamp(r["ts"], unit="s").strftime("%H:%M:%S"),
+            "페이지": r["page"],
+            "전체(ms)": r["total_ms"],
+            "가장 느린 단계": max(r["spans"], key=lambda x: x[1])[0] if r["spans"] else "",
+            "RSS(MB)": r["rss_mb"],
+        } for r in reversed(runs)])
+        st.dataframe(table, use_container_width=True, hide_index=True)
+    st.caption("같은 내용이 'tariff.diag' 로거로 JSON 한 줄씩 기록됩니다 (TARIFF_DIAG_LOG 로 파일 지정).")
+
+@fragment(BOM_PAGE)
+def render_bom(version: str):
+    """BOM(HS 코드, 원산지[, 기준일, 과세가격]) 업로드 → 줄별 최저세율/협정/예상 관세액 (업로드/연도 변경은 이 페이지만 재실행)"""
+    from tariff import bom  # BOM 페이지에서만 필요
+
+    st.markdown("## 📌BOM 일괄 조회")
+    st.caption("필수 컬럼: HS코드, 원산지 / 선택: 기준일(있으면 그날 적용 중인 세율), 과세가격(있으면 예상 관세액)")
+    types = ["csv", "xlsx"] if bom.excel_available() else ["csv"]
+    upload = st.file_uploader("BOM 파일", type=types)
+    default_year = st.selectbox("기준일이 없는 줄의 연도", YEARS[::-1])
+    if upload is None:
+        return
+
     try:
-        return pd.read_csv(path, encoding="utf-8-sig", **kwargs)
-    except UnicodeDecodeError:
-        return pd.read_csv(path, encoding="utf-8", **kwargs)
-
-@st.cache_data(show_spinner=False)
-def load_data_all() -> pd.DataFrame:
-    """data/tariff_semi 아래 연도별 파일을 모두 로드해 합치고 숫자 컬럼 생성"""
-    dfs = []
-    for y in YEARS:
-        f = TARIFF_DIR / f"tariff_semi_{y}_with_info.csv"
-        if not f.exists():
-            continue
-        df = _read_csv_safe(f, dtype=str)
-        df["연도"] = y
-        # 관세율 숫자형 변환
-        if "관세율" in df.columns:
-            df["관세율_num"] = pd.to_numeric(
-                df["관세율"].str.replace(",", ""), errors="coerce"
+        lines = bom.normalize_bom(bom.read_bom(upload))
+    except (ValueError, ImportError) as e:
+        st.error(str(e))
+        return
+    diag.lap("bom.read")
+    # 워밍업/내보내기/비교 페이지와 같은 (version, ALL_YEARS) 키 — 전체 연도 인덱스는 프로세스에 하나만
+    valid_idx = load_validity_index(version, ALL_YEARS)
+    cty_idx = load_country_index(version, ALL_YEARS)
+    rate_mx = load_rate_matrix(version, ALL_YEARS)
+    diag.lap("load.bom_index")
+    result = bom.resolve_bom(lines, rate_mx, valid_idx, cty_idx, default_year=default_year)
+    diag.lap("bom.resolve")
+
+    summary = bom.summarize(result)
+    cols = st.columns(len(summary))
+    for col, (k, v) in zip(cols, summary.items()):
+        col.metric(k, f"{v:,.0f}" if isinstance(v, float) else f"{v:,}")
+    st.dataframe(result, use_container_width=True, hide_index=True)
+
+    stem = Path(upload.name).stem
+    d1, d2 = st.columns(2)
+    d1.download_button("CSV 다운로드", bom.to_bytes(result, "csv"), f"{stem}_관세.csv", "text/csv")
+    if bom.excel_available():
+        d2.download_button("Excel 다운로드", bom.to_bytes(result, "xlsx"), f"{stem}_관세.xlsx",
+                           "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    diag.lap("bom.render")
+
+@fragment(EXPORT_PAGE)
+def render_export(version: str, prefix: str):
+    """
+    (HS × 연도 × 국가) 최저 관세율/협정 전체를 파일로 — HS chunk 단위로 만들어 백그라운드 스레드에서 이어 씀
+    (세션이 들고 있는 건 작업 객체뿐이고, 파일이 완성되면 다운로드 버튼만 띄움)
+    """
+    from tariff import bom, export  # 내보내기 페이지에서만 필요
+
+    st.markdown("## 📌관세율 일괄 내보내기")
+    rate_mx = load_rate_matrix(version, ALL_YEARS)
+    diag.lap("load.rate_matrix")
+    st.caption(f"범위: {'HS ' + prefix + '*' if prefix else '전체 HS'} (사이드바의 HS 코드 검색/드릴다운 기준)")
+    f1, f2, f3 = st.columns([2, 3, 1])
+    years = f1.multiselect("연도", rate_mx.years.tolist()[::-1], default=rate_mx.years.tolist()[-1:])
+    countries = f2.multiselect("국가 (비우면 전체)", rate_mx.countries)
+    fmts = [f for f in export.FORMATS if f != "xlsx" or bom.excel_available()]
+    fmt = f3.selectbox("형식", fmts)
+    total = export.count_rows(rate_mx, prefix, years, countries)
+    st.caption(f"예상 {total:,}행")
+
+    job = st.session_state.get("export_job")
+    running = job is not None and not job.done
+    if st.button("내보내기 시작", disabled=running or not years or total == 0):
+        if job is not None:
+            job.path.unlink(missing_ok=True)  # 이 세션의 이전 결과 파일
+        name = f"관세율_{prefix or '전체'}_{'-'.join(map(str, sorted(years)))}.{fmt}"
+        path = EXPORT_DIR / f"{os.urandom(8).hex()}.{fmt}"
+        job = export.ExportJob(rate_mx, path, fmt, name, prefix=prefix, years=years, countries=countries,
+                               names=load_hs_index(version, ALL_YEARS).names)
+        st.session_state["export_job"] = job.start()
+        running = True
+    diag.lap("export.options")
+
+    if running:
+        render_export_progress()
+    elif job is not None:
+        if job.error is not None:
+            st.error(f"내보내기 실패: {job.error}")
+        elif job.path.exists():
+            st.success(f"{job.rows:,}행 / {job.seconds:.1f}초")
+            with open(job.path, "rb") as f:
+                st.download_button(f"{job.name} 다운로드", f, job.name)
+
+@fragment(EXPORT_PAGE + "/진행률", run_every=1)
+def render_export_progress():
+    """진행 중인 내보내기 진행률 — 1초마다 이 부분만 다시 그리고, 끝나면 페이지 전체를 한 번 재실행"""
+    job = st.session_state.get("export_job")
+    if job is None or job.done:
+        st.rerun()
+    st.progress(job.progress, text=f"{job.rows:,} / {job.total:,}행 기록 중…")
+
+@fragment(CHANGE_PAGE)
+def render_changes(prefix: str):
+    """연도 간 변경 내역 — 미리 만든 로그를 필터로 거르기만 함 (필터 변경은 이 페이지만 재실행)"""
+    st.markdown("## 📌연도별 변경 내역")
+    changes = load_changes(ALL_YEARS)
+    diag.lap("load.changes")
+    if changes.log.empty:
+        st.info("비교할 수 있는 연도 데이터가 없습니다.")
+        return
+
+    f1, f2, f3 = st.columns(3)
+    years = f1.multiselect("연도 (변경 후 기준)", changes.years[1:][::-1], default=changes.years[-1:])
+    kinds = f2.multiselect("변경 구분", CHANGE_KINDS, default=[])
+    agreements = f3.multiselect("관세율구분값", sorted(changes.log["관세율구분값"].cat.categories))
+    g1, g2 = st.columns(2)
+    prefix = normalize_query(g1.text_input("HS 코드 접두어", value=prefix, placeholder="예: 8486"))
+    min_delta = g2.number_input("최소 변동폭(%p)", min_value=0.0, value=0.0, step=0.5)
+    log = changes.filter(years, kinds, prefix, agreements, min_delta)
+    diag.lap("changes.filter")
+
+    summary = changes.summary(log)
+    cols = st.columns(len(summary.columns))
+    for col, k in zip(cols, summary.columns):
+        col.metric(k, f"{int(summary[k].sum()):,}")
+    if log.empty:
+        st.info("조건에 맞는 변경 내역이 없습니다.")
+    else:
+        if len(summary) > 1:
+            st.dataframe(summary, use_container_width=True)
+        st.dataframe(log, use_container_width=True, hide_index=True)
+    diag.lap("changes.render")
+
+def render_lookup(version: str, page_years: tuple, hs_selected: str, ref_date: date):
+    """수입 관세율 조회 col1: 기준일 적용 협정/관세율 + 국가별 최저 관세율 (HS·기준일에만 의존)"""
+    valid_idx = load_validity_index(version, page_years, hs_selected)
+    rate_mx = load_rate_matrix(version, page_years, hs_selected)
+    diag.lap("load.lookup_index")
+
+    df_sel_date = valid_idx.rows(hs_selected, ref_date)
+    st.markdown(f"### {ref_date:%Y-%m-%d} 기준 관세 협정 / 관세율")
+    if df_sel_date.empty:
+        st.info(f"{ref_date:%Y-%m-%d}에 적용 중인 데이터가 없어요. 상단의 '연도별 관세 추이'에서 다른 연도를 확인해 보세요.")
+        return
+    show_cols = ["관세율구분값", "관세율"]
+    available = [c for c in show_cols if c in df_sel_date.columns]
+    if not available:
+        st.info("표시 가능한 컬럼이 없습니다.")
+    else:
+        st.dataframe(
+            df_sel_date[available].sort_values(available[-1]),
+            use_container_width=True,
+            hide_index=True
+        )
+    diag.lap("lookup.table")
+
+    # 국가별 최저 관세율 (미리 계산된 연 단위 행렬에서 조회)
+    st.markdown(f"### 국가별 최저 관세율 ({ref_date.year}년)")
+    cheapest = rate_mx.cheapest(hs_selected, ref_date.year)
+    if cheapest.empty:
+        st.info("적용 국가 데이터가 없습니다.")
+    else:
+        st.dataframe(cheapest, use_container_width=True, hide_index=True)
+    diag.lap("lookup.cheapest")
+
+@fragment("수입 관세율 조회/국가")
+def render_country(version: str, page_years: tuple, hs_selected: str, ref_date: date):
+    """수입 관세율 조회 col2: 국가 검색/선택 → 해당 국가 관세율 (국가 위젯이 바뀌면 이 패널만 재실행)"""
+    valid_idx = load_validity_index(version, page_years, hs_selected)
+    cty_idx = load_country_index(version, page_years, hs_selected)
+    rate_mx = load_rate_matrix(version, page_years, hs_selected)
+    COUNTRIES = cty_idx.countries  # 데이터의 '국가' 컬럼에서 추출
+    diag.lap("load.country_index")
+
+    df_sel_date = valid_idx.rows(hs_selected, ref_date)
+    if df_sel_date.empty:
+        st.info(f"{ref_date:%Y-%m-%d}에 적용 중인 데이터가 없어 국가별 조회를 표시할 수 없습니다.")
+        return
+    country_query = st.text_input("국가 검색", value="", placeholder="예: 미국, 일본, 중국...")
+    filtered = [c for c in COUNTRIES if country_query in c] if country_query else COUNTRIES
+    if not filtered:
+        st.warning("검색 결과가 없습니다. 다시 입력해주세요.")
+        filtered = COUNTRIES
+
+    sel_cty = st.selectbox("국가 선택", sorted(filtered))
+    if "국가" not in df_sel_date.columns or "적용국가구분" not in df_sel_date.columns:
+        st.info("데이터에 '국가' 또는 '적용국가구분' 컬럼이 없습니다.")
+        return
+    # 전체 국가 공통(적용국가구분=1) + 해당 국가 협정(적용국가구분=2) 행
+    cut_cty = cty_idx.rows(hs_selected, sel_cty, ref_date.year)
+    cut_cty = cut_cty[in_force(cut_cty, ref_date)].reset_index(drop=True)
+    cut_cty = cut_cty.drop_duplicates(subset=[c for c in ["관세율구분값","관세율"] if c in cut_cty.columns])
+    diag.lap("lookup.country_mask")
+
+    cols_cty = [c for c in ["관세율구분","관세율구분값","관세율"] if c in cut_cty.columns]
+    if cut_cty.empty or not cols_cty:
+        st.info(f"{sel_cty} 관련 협정 데이터가 없습니다.")
+        return
+    # 1) 정렬 키 안전 선택
+    if "관세율_num" in cut_cty.columns:
+        sort_key = "관세율_num"
+        to_show = cut_cty.sort_values(sort_key, na_position="last")
+    elif "관세율" in cut_cty.columns:
+        # 관세율이 문자열일 수 있어 임시 숫자 컬럼으로 정렬
+        tmp = cut_cty.assign(
+            __관세율_num_tmp=pd.to_numeric(
+                cut_cty["관세율"].astype(str).str.replace(",", ""), errors="coerce"
             )
-        dfs.append(df)
-    if dfs:
-        out = pd.concat(dfs, ignore_index=True)
-        # 품목번호 표준화(공백 제거)
-        if "품목번호" in out.columns:
-            out["품목번호"] = out["품목번호"].astype(str).str.strip()
-        return out
-    return pd.DataFrame()
-
-@st.cache_data(show_spinner=False)
-def load_hs_list() -> list[str]:
-    """data/unique_hscode_semi.csv에서 HS 목록 로드"""
-    df_hs = _read_csv_safe(HS_PATH)
-    col = "HS코드" if "HS코드" in df_hs.columns else df_hs.columns[0]
-    hs_list = (
-        df_hs[col]
-        .astype(str)
-        .dropna()
-        .str.strip()
-        .replace("", pd.NA)
-        .dropna()
-        .unique()
-        .tolist()
-    )
-    return sorted(set(hs_list))
+        )
+        sort_key = "__관세율_num_tmp"
+        to_show = tmp.sort_values(sort_key, na_position="last").drop(columns=[sort_key])
+    else:
+        # 정렬 기준이 없으면 첫 표시 컬럼으로 정렬
+        sort_key = cols_cty[0]
+        to_show = cut_cty.sort_values(sort_key, na_position="last")
 
-def token_match_country(series: pd.Series, country: str) -> pd.Series:
+    # 2) 정렬 후에 표시 컬럼만 선택 (KeyError 방지 포인트!)
+    to_show = to_show[cols_cty]
+    diag.lap("lookup.sort")
+    st.dataframe(to_show, use_container_width=True, hide_index=True)
+    diag.lap("lookup.country_render")
+
+    min_rate, best, _ = rate_mx.lookup(hs_selected, sel_cty, ref_date.year)
+    if best is not None:
+        st.markdown(f"**{sel_cty} 최저 관세율({ref_date.year}년):** {min_rate:g}% ({best})")
+
+@fragment("연도별 관세 추이/옵션")
+def render_trend(hs_selected: str):
+    """연도별 추이 표/그래프 — 집계 단위·관세율구분이 바뀌면 이 부분만 재실행"""
+    # 미리 집계된 큐브에서 (집계 단위, 관세율구분) 슬라이스만 읽음
+    cube = load_cube(ALL_YEARS)
+    diag.lap("load.cube")
+    opt1, opt2 = st.columns(2)
+    with opt1:
+        level = st.radio("집계 단위", cube.levels, horizontal=True)
+    key = cube.key_for(level, hs_selected)
+    with opt2:
+        kind = st.selectbox("관세율구분", [TOTAL] + cube.kinds(level, key))
+    grp = cube.series(level, key, kind).rename(columns={"mean": "관세율_num"})
+    diag.lap("trend.series")
+    if level != "세번":
+        st.caption(f"{level} '{key}' 에 속한 HS 코드 기준 집계")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### 연도별 평균 관세율")
+        table = grp.rename(columns={
+            "관세율_num": "평균 관세율(%)", "min": "최저(%)", "max": "최고(%)", "count": "행 수", "n_hs": "HS 수",
+        })
+        if level == "세번":
+            table = table.drop(columns=["HS 수"])
+        st.dataframe(table, use_container_width=True, hide_index=True)
+    diag.lap("trend.table")
+
+    with col2:
+        st.markdown("### 연도별 평균 관세율 추이")
+        if grp.empty:
+            st.info("표시할 데이터가 없습니다.")
+        else:
+            with diag.span("import.plotly"):
+                import plotly.express as px  # 차트 페이지에서만 필요 (첫 호출 때만 실제 import)
+            fig = px.line(grp, x="연도", y="관세율_num", markers=True)
+            fig.update_layout(yaxis_title="관세율(%)")
+            diag.lap("trend.figure")
+            st.plotly_chart(fig, use_container_width=True)
+            diag.lap("trend.render")
+
+@fragment(HEATMAP_PAGE + "/옵션")
+def render_heatmap(version: str, hs_selected: str):
     """
-    '브라질 미국 중국'처럼 공백 구분된 국가 문자열에서 토큰 매칭
+    선택 HS 가 속한 류/호/소호/소분류/대분류 전체를 HS × 연도 히트맵으로 비교
+    미리 피벗한 행렬에서 행만 골라 그리고, 행이 많으면 서버에서 묶음 평균으로 줄여 보냄
     """
-    patt = re.compile(rf"(?:^|\s){re.escape(country)}(?:\s|$)")
-    out = series.astype(str).str.replace(r"\s+", " ", regex=True).str.strip().apply(
-        lambda s: bool(patt.search(s))
-    )
-    out.index = series.index
-    return out
+    from tariff import heatmap  # 비교 페이지에서만 필요
+
+    grid = load_rate_grid(version)
+    diag.lap("load.rate_grid")
+    opt1, opt2 = st.columns(2)
+    level = opt1.radio("비교 범위", grid.levels, horizontal=True)
+    metric = opt2.selectbox("지표", heatmap.METRICS)
+    key = grid.key_for(level, hs_selected)
+    rows = grid.select(level, key)
+    if not len(rows):
+        st.info("비교할 HS 코드가 없습니다.")
+        return
+    z, labels, step = grid.view(rows, metric)
+    diag.lap("heatmap.view")
+    st.caption(f"{level} '{key}' 에 속한 HS {len(rows):,}개"
+               + (f" — 연속한 {step}개씩 평균해 {len(labels):,}줄로 표시" if step > 1 else ""))
+
+    with diag.span("import.plotly"):
+        import plotly.graph_objects as go  # 차트 페이지에서만 필요
+    fig = go.Figure(go.Heatmap(  # 셀 수는 view 가 MAX_ROWS × 연도로 제한
+        z=z, x=[str(y) for y in grid.years], y=labels, colorscale="YlOrRd",
+        colorbar=dict(title=metric), hoverinfo="x+y+z",
+    ))
+    fig.update_layout(height=min(max(320, 22 * len(labels)), 1400), yaxis=dict(autorange="reversed"),
+                      margin=dict(l=10, r=10, t=30, b=10))
+    diag.lap("heatmap.figure")
+    st.plotly_chart(fig, use_container_width=True)
+    diag.lap("heatmap.render")
 
 def main():
     # =========================================
     # 데이터 로드
     # =========================================
-    df = load_data_all()
+    changed = load_watcher(ALL_YEARS).poll()
+    if changed:
+        reload_years(changed, ALL_YEARS)
+        st.toast(f"{', '.join(map(str, changed))}년 관세율 파일이 바뀌어 해당 연도만 다시 읽었습니다.")
+    version = version_of(ALL_YEARS)
+    parts = load_partitions(ALL_YEARS)
+    warm_up(version, ALL_YEARS)
     hs_list = load_hs_list()
+    diag.lap("load.hs_list")
 
     st.title("반도체 분야 관세율·협정 대시보드")
     st.sidebar.title("필터")
 
-    # HS 코드 검색 + 후보
+    # HS 코드 검색 + 계층별 드릴다운 (류 2 → 호 4 → 소호 6단위)
     q = st.sidebar.text_input("HS 코드 검색", value="", placeholder="예: 8486, 8542, ...")
-    if q:
-        candidates = [h for h in hs_list if h.startswith(q)]
-        if not candidates:
-            st.sidebar.warning("해당 패턴으로 시작하는 HS 코드가 없습니다.")
-            candidates = hs_list
+    prefix = normalize_query(q)
+    if prefix and hs_list.count(prefix) == 0:
+        st.sidebar.warning("해당 패턴으로 시작하는 HS 코드가 없습니다.")
+        candidates = []
     else:
-        candidates = hs_list
+        for level, width in HS_LEVELS[:-1]:
+            groups = hs_list.level_counts(prefix, width)
+            if len(prefix) >= width or len(groups) <= 1:
+                continue
+            counts = dict(groups)
+            pick = st.sidebar.selectbox(
+                f"{level}({width}단위)", ["전체"] + list(counts),
+                format_func=lambda g, counts=counts: g if g == "전체" else f"{g} ({counts[g]}개)",
+            )
+            if pick == "전체":
+                break
+            prefix = pick
+        candidates = hs_list.match(prefix, limit=MAX_HS_OPTIONS)
+        n_match = hs_list.count(prefix)
+        if n_match > len(candidates):
+            st.sidebar.caption(f"{n_match:,}개 중 {len(candidates):,}개만 표시 — 상위 단위를 먼저 선택하세요.")
+        elif prefix:
+            st.sidebar.caption(f"검색 결과 {n_match:,}개")
 
-    hs_selected = st.sidebar.selectbox("HS코드 선택", candidates if candidates else [""])
+    # 품목명으로 찾기 (위에서 고른 HS 범위 안에서, 점수 높은 순)
+    name_q = st.sidebar.text_input("품목명 검색", value="", placeholder="예: 웨이퍼, 포토레지스트, 삼불화염소")
+    labels = {}
+    if name_q.strip():
+        hits = load_name_index(version).search(name_q, limit=MAX_NAME_HITS)
+        if prefix:
+            hits = hits[hits["품목번호"].str.startswith(prefix)]
+        candidates = hits["품목번호"].tolist()
+        labels = dict(zip(candidates, hits["이름"]))
+        st.sidebar.caption(f"품목명 검색 결과 {len(candidates):,}개" if candidates else "일치하는 품목명이 없습니다.")
+    diag.lap("name_search")
 
-    menu = st.sidebar.radio(
-        "페이지",
-        ["수입 관세율 조회", "연도별 관세 추이", "관세 이슈 키워드(예정)", "주요 국가별 해외 관세(예정)", "무역 동향(예정)"],
+    hs_selected = st.sidebar.selectbox(
+        "HS코드 선택", candidates if candidates else [""],
+        format_func=lambda c: f"{c} · {labels[c]}" if labels.get(c) else c,
     )
 
+    pages = ["수입 관세율 조회", "연도별 관세 추이", HEATMAP_PAGE, CHANGE_PAGE, BOM_PAGE, EXPORT_PAGE, "주요 국가별 해외 관세(예정)", "무역 동향(예정)"]
+    if st.query_params.get("diag") == "1":
+        pages.append(DIAG_PAGE)
+    menu = st.sidebar.radio("페이지", pages)
+    diag.set_page(menu)
+    diag.lap("sidebar")
+    if menu == DIAG_PAGE:
+        render_diagnostics()
+        return
+    if menu == BOM_PAGE:
+        render_bom(version)
+        return
+    if menu == CHANGE_PAGE:
+        render_changes(prefix)
+        return
+    if menu == EXPORT_PAGE:
+        render_export(version, prefix)
+        return
+
+    # 페이지가 쓰는 연도만 로딩 (수입 관세율 조회는 기준일이 속한 연도 하나)
+    if menu == "수입 관세율 조회":
+        ref_date = st.sidebar.date_input(
+            "기준일", value=min(date.today(), DATE_RANGE[1]), min_value=DATE_RANGE[0], max_value=DATE_RANGE[1]
+        )
+        page_years = (ref_date.year,)
+    else:
+        page_years = ALL_YEARS
     # 공통 가드
-    if df.empty:
+    if parts.dataset is None:
         st.error("데이터가 없습니다. 레포의 data/ 폴더와 파일명을 확인하세요.")
         return
-    if "품목번호" not in df.columns:
-        st.error("데이터에 '품목번호' 컬럼이 없습니다.")
-        return
 
-    df_sel = df[df["품목번호"] == hs_selected] if hs_selected else pd.DataFrame()
+    # 선택 HS 가 속한 (연도, 류) 파티션만 읽음 — 키도 그 연도 원본 버전만
+    scope = version_of(page_years)
+    name_idx = load_hs_index(scope, page_years, hs_selected) if hs_selected else None
+    df_sel = name_idx.rows(hs_selected) if name_idx is not None else pd.DataFrame()
+    diag.lap("load.data")
+    if df_sel.empty and hs_selected and page_years != ALL_YEARS:
+        # 기준 연도에는 없는 코드 → 이때만 전체 연도에서 확인 (품목명/안내 문구 유지)
+        name_idx = load_hs_index(version, ALL_YEARS, hs_selected)
+        df_sel = name_idx.rows(hs_selected)
     if df_sel.empty:
         st.info("선택한 HS 코드에 해당하는 데이터가 없습니다.")
     else:
-        # 대표 품목명 추출
-        item_name = None
-        for col in ["품명", "품목명", "이름", "소분류", "대분류"]:
-            if col in df_sel.columns:
-                vals = df_sel[col].dropna().unique()
-                if len(vals) > 0:
-                    item_name = vals[0]
-                    break
+        # 품목명 검색으로 고른 코드면 맞은 이름, 아니면 대표 품목명 (인덱스에 미리 계산됨)
+        item_name = labels.get(hs_selected) or name_idx.item_name(hs_selected)
         if item_name:
             st.markdown(f"**품목명:** {item_name}")
+    diag.lap("hs_filter")
 
     # =========================================
     # 수입 관세율 조회
     # =========================================
     if menu == "수입 관세율 조회":
-        COUNTRIES = [
-            "그리스","네덜란드","노르웨이","뉴질랜드","니카라과","덴마크","독일","라오스","라트비아",
-            "루마니아","룩셈부르크","리투아니아","리히텐슈타인","말레이시아","몰타","미국","미얀마",
-            "방글라데시","베트남","벨기에","불가리아","브루나이","사이프러스","스리랑카","스웨덴",
-            "스위스","스페인","슬로바키아","슬로베니아","싱가포르","아이슬란드","아일랜드","에스토니아",
-            "엘살바도르","영국","오스트리아","온두라스","이스라엘","이탈리아","인도","인도네시아",
-            "일본","중국","체코","칠레","캄보디아","캐나다","코스타리카","콜롬비아","크로아티아",
-            "쿠웨이트","태국","터키","페루","포르투갈","폴란드","프랑스","핀란드","헝가리",
-            "호주","홍콩"
-        ]
-
         st.markdown("## 📌수입 관세율 조회")
         col1, col2 = st.columns(2)
-
         with col1:
             if df_sel.empty:
                 st.info("선택한 HS 코드에 해당하는 데이터가 없습니다.")
             else:
-                df_sel_2025 = df_sel[df_sel["연도"] == 2025] if "연도" in df_sel.columns else pd.DataFrame()
-                st.markdown("### 2025년 관세 협정 / 관세율")
-                if df_sel_2025.empty:
-                    st.info("2025년 데이터가 없어요. 상단의 '연도별 관세 추이'에서 다른 연도를 확인해 보세요.")
-                else:
-                    show_cols = ["관세율구분값", "관세율"]
-                    available = [c for c in show_cols if c in df_sel_2025.columns]
-                    if not available:
-                        st.info("표시 가능한 컬럼이 없습니다.")
-                    else:
-                        st.dataframe(
-                            df_sel_2025[available].sort_values(available[-1]),
-                            use_container_width=True,
-                            hide_index=True
-                        )
-
+                render_lookup(scope, page_years, hs_selected, ref_date)
         with col2:
             st.markdown("### 국가별 해당 관세율")
             if df_sel.empty:
                 st.info("선택한 HS 코드에 해당하는 데이터가 없습니다.")
             else:
-                df_sel_2025 = df_sel[df_sel["연도"] == 2025] if "연도" in df_sel.columns else pd.DataFrame()
-                if df_sel_2025.empty:
-                    st.info("2025년 데이터가 없어 국가별 조회를 표시할 수 없습니다.")
-                else:
-                    country_query = st.text_input("국가 검색", value="", placeholder="예: 미국, 일본, 중국...")
-                    filtered = [c for c in COUNTRIES if country_query in c] if country_query else COUNTRIES
-                    if not filtered:
-                        st.warning("검색 결과가 없습니다. 다시 입력해주세요.")
-                        filtered = COUNTRIES
-        
-                    sel_cty = st.selectbox("국가 선택", sorted(filtered))
-                    if "국가" in df_sel_2025.columns and "적용국가구분" in df_sel_2025.columns:
-                        base = df_sel_2025[df_sel_2025["적용국가구분"] == "1"]  # 전체 국가 공통
-                        mask = (df_sel_2025["적용국가구분"] == "2") & token_match_country(df_sel_2025["국가"], sel_cty)
-                        country_rows = df_sel_2025.loc[mask]
-                        cut_cty = pd.concat([base, country_rows], ignore_index=True)
-                        cut_cty = cut_cty.drop_duplicates(subset=[c for c in ["관세율구분값","관세율"] if c in cut_cty.columns])
-        
-                        cols_cty = [c for c in ["관세율구분","관세율구분값","관세율"] if c in cut_cty.columns]
-                        if cut_cty.empty or not cols_cty:
-                            st.info(f"{sel_cty} 관련 협정 데이터가 없습니다.")
-                        else:
-                            # 1) 정렬 키 안전 선택
-                            if "관세율_num" in cut_cty.columns:
-                                sort_key = "관세율_num"
-                                to_show = cut_cty.sort_values(sort_key, na_position="last")
-                            elif "관세율" in cut_cty.columns:
-                                # 관세율이 문자열일 수 있어 임시 숫자 컬럼으로 정렬
-                                tmp = cut_cty.assign(
-                                    __관세율_num_tmp=pd.to_numeric(
-                                        cut_cty["관세율"].astype(str).str.replace(",", ""), errors="coerce"
-                                    )
-                                )
-                                sort_key = "__관세율_num_tmp"
-                                to_show = tmp.sort_values(sort_key, na_position="last").drop(columns=[sort_key])
-                            else:
-                                # 정렬 기준이 없으면 첫 표시 컬럼으로 정렬
-                                sort_key = cols_cty[0]
-                                to_show = cut_cty.sort_values(sort_key, na_position="last")
-        
-                            # 2) 정렬 후에 표시 컬럼만 선택 (KeyError 방지 포인트!)
-                            to_show = to_show[cols_cty]
-                            st.dataframe(to_show, use_container_width=True, hide_index=True)
-                    else:
-                        st.info("데이터에 '국가' 또는 '적용국가구분' 컬럼이 없습니다.")
+                render_country(scope, page_years, hs_selected, ref_date)
 
     # =========================================
     # 연도별 추이
@@ -234,30 +705,19 @@ def main():
         if "관세율_num" not in df_sel.columns or "연도" not in df_sel.columns:
             st.info("연도별 평균을 계산할 수 있는 컬럼(관세율_num, 연도)이 부족합니다.")
             return
+        render_trend(hs_selected)
 
-        col1, col2 = st.columns(2)
-        grp = (
-            df_sel.dropna(subset=["관세율_num"])
-            .groupby("연도", as_index=False)["관세율_num"]
-            .mean()
-        )
-
-        with col1:
-            st.markdown("#### 연도별 평균 관세율")
-            st.dataframe(
-                grp.rename(columns={"관세율_num": "평균 관세율(%)"}),
-                use_container_width=True,
-                hide_index=True
-            )
-
-        with col2:
-            st.markdown("### 연도별 평균 관세율 추이")
-            if grp.empty:
-                st.info("표시할 데이터가 없습니다.")
-            else:
-                fig = px.line(grp, x="연도", y="관세율_num", markers=True)
-                fig.update_layout(yaxis_title="관세율(%)")
-                st.plotly_chart(fig, use_container_width=True)
+    # =========================================
+    # HS 그룹 비교
+    # =========================================
+    elif menu == HEATMAP_PAGE:
+        st.markdown("## 📌HS 그룹 비교 (연도별 히트맵)")
+        if df_sel.empty:
+            st.info("선택한 HS 코드에 해당하는 데이터가 없습니다.")
+            return
+        render_heatmap(version, hs_selected)
 
 if __name__ == "__main__":
-    main()
+    diag.setup_logging(os.environ.get("TARIFF_DIAG_LOG"))
+    with diag.rerun():
+        main()
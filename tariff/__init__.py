@@ -0,0 +1,98 @@
+"""
+반도체 관세율 대시보드 데이터 계층 (Streamlit 비의존)
+
+streamlit_app.py 에서는 여기 함수들을 st.cache_* 로 감싸서 사용하고,
+벤치마크/CLI 등 Streamlit 밖에서도 그대로 import 해서 쓸 수 있도록 유지한다.
+
+`import tariff` 는 핵심 인덱스 타입만 불러오고, 특정 페이지/CLI 에서만 쓰는 모듈
+(bom, export, heatmap, partition, shared, bench, loadtest 등)은 처음 접근할 때 import 한다.
+"""
+import importlib
+
+from .changes import CHANGE_KINDS, ChangeLog
+from .country_index import CountryIndex, country_names, token_match_country
+from .cube import CUBE_LEVELS, TOTAL, TariffCube
+from .hs_index import HsIndex
+from .items import ITEM_ATTRS, ITEM_COLS, join_items, representative, split_items
+from .name_index import NameIndex
+from .prefix_index import HS_LEVELS, HsPrefixIndex, normalize_query
+from .rate_matrix import RateMatrix
+from .reload import TariffWatcher, discover_years
+from .schema import apply_schema, concat_typed, hs_key, hs_str, memory_report
+from .snapshot import (
+    compile_items,
+    compile_year,
+    data_version,
+    detect_encoding,
+    load_item_table,
+    load_tariff_frame,
+    read_csv_safe,
+    source_signature,
+)
+from .store import TariffStore
+from .validity_index import ValidityIndex, in_force
+
+# 처음 접근할 때 import 하는 모듈 / 이름 → 모듈 (pyarrow.dataset 등 무거운 의존성을 시작 경로에서 뺌)
+_LAZY_MODULES = {"bench", "bom", "export", "heatmap", "loadtest", "partition", "shared", "warmup"}
+_LAZY_ATTRS = {
+    "PartitionedStore": "partition",
+    "normalize_bom": "bom",
+    "read_bom": "bom",
+    "resolve_bom": "bom",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _LAZY_ATTRS:
+        return getattr(importlib.import_module(f".{_LAZY_ATTRS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "CHANGE_KINDS",
+    "CUBE_LEVELS",
+    "ITEM_ATTRS",
+    "ITEM_COLS",
+    "TOTAL",
+    "ChangeLog",
+    "CountryIndex",
+    "HS_LEVELS",
+    "HsIndex",
+    "HsPrefixIndex",
+    "NameIndex",
+    "PartitionedStore",
+    "RateMatrix",
+    "TariffCube",
+    "TariffStore",
+    "TariffWatcher",
+    "ValidityIndex",
+    "apply_schema",
+    "bom",
+    "export",
+    "heatmap",
+    "normalize_bom",
+    "read_bom",
+    "resolve_bom",
+    "concat_typed",
+    "country_names",
+    "hs_key",
+    "hs_str",
+    "join_items",
+    "representative",
+    "split_items",
+    "in_force",
+    "memory_report",
+    "normalize_query",
+    "compile_items",
+    "compile_year",
+    "data_version",
+    "detect_encoding",
+    "discover_years",
+    "load_item_table",
+    "load_tariff_frame",
+    "read_csv_safe",
+    "source_signature",
+    "token_match_country",
+]
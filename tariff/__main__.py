@@ -0,0 +1,144 @@
+"""
+명령행 도구 모음
+
+    python -m tariff memory      # 컬럼별 메모리 before/after 리포트
+    python -m tariff bench       # 합성 코퍼스(1x/10x/100x) 벤치마크 → bench/results.jsonl
+    python -m tariff bom bom.csv -o result.csv   # BOM 일괄 관세 조회
+    python -m tariff warmup      # 서버 시작 전 스냅샷/파티션/공유 Arrow 파일 생성 + import 시간
+    python -m tariff export -o report.parquet [--prefix 8486]   # HS × 연도 × 국가 최저세율/협정 일괄 내보내기
+    python -m tariff loadtest --sessions 1 5 10 20   # 서버 하나에 동시 세션 N 개 → 처리량/지연 백분위/RSS
+"""
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from .config import TARIFF_DIR, YEARS
+
+
+def cmd_memory(args) -> None:
+    from .schema import apply_schema, concat_typed, memory_report
+    from .snapshot import parse_year, source_path
+
+    files = [(y, source_path(TARIFF_DIR, y)) for y in YEARS]
+    raws = [parse_year(f, y, typed=False) for y, f in files if f.exists()]
+    raw = pd.concat(raws, ignore_index=True)
+    typed = concat_typed([apply_schema(r) for r in raws])
+    pd.set_option("display.width", 200)
+    print(memory_report(raw, typed))
+
+
+def cmd_bench(args) -> None:
+    from .bench import RESULTS_PATH, run
+
+    pd.set_option("display.width", 200)
+    run(args.scales, n_queries=args.queries, out=args.out or RESULTS_PATH, regenerate=args.regenerate)
+
+
+def cmd_bom(args) -> None:
+    import time
+
+    from . import CountryIndex, HsIndex, RateMatrix, ValidityIndex, load_item_table, load_tariff_frame
+    from .bom import normalize_bom, read_bom, resolve_bom, summarize, to_bytes
+
+    t = time.perf_counter()
+    df = load_tariff_frame(TARIFF_DIR, YEARS)
+    hs_idx = HsIndex(df, load_item_table(TARIFF_DIR, YEARS))
+    cty_idx = CountryIndex(hs_idx)
+    rate_mx, valid_idx = RateMatrix(cty_idx), ValidityIndex(hs_idx)
+    t_load = time.perf_counter() - t
+
+    t = time.perf_counter()
+    result = resolve_bom(normalize_bom(read_bom(args.bom)), rate_mx, valid_idx, cty_idx, default_year=args.year)
+    t_resolve = time.perf_counter() - t
+
+    out = args.out or args.bom.with_name(f"{args.bom.stem}_관세.csv")
+    out.write_bytes(to_bytes(result, "xlsx" if out.suffix.lower() == ".xlsx" else "csv"))
+    for k, v in summarize(result).items():
+        print(f"{k}: {v:,}")
+    print(f"데이터 로딩 {t_load:.2f}s / 조회 {t_resolve:.2f}s → {out}")
+
+
+def cmd_warmup(args) -> None:
+    from .warmup import import_times, warm_up
+
+    times = warm_up()
+    for k, v in times.items():
+        print(f"{k:<20} {v * 1000:9.1f} ms")
+    print(f"{'합계':<20} {sum(times.values()) * 1000:9.1f} ms")
+    if not args.skip_imports:
+        print("\ncold import")
+        for k, v in import_times().items():
+            print(f"{k:<20} {'실패' if v is None else f'{v * 1000:9.1f} ms'}")
+
+
+def cmd_export(args) -> None:
+    import time
+
+    from . import CountryIndex, HsIndex, RateMatrix, load_item_table, load_tariff_frame
+    from .export import count_rows, iter_report, write_report
+
+    t = time.perf_counter()
+    hs_idx = HsIndex(load_tariff_frame(TARIFF_DIR, YEARS), load_item_table(TARIFF_DIR, YEARS))
+    rate_mx = RateMatrix(CountryIndex(hs_idx))
+    t_load = time.perf_counter() - t
+
+    t = time.perf_counter()
+    total = count_rows(rate_mx, args.prefix, args.years, args.countries)
+    chunks = iter_report(rate_mx, args.prefix, args.years, args.countries, hs_idx.names, chunk_hs=args.chunk)
+    rows = write_report(chunks, args.out,
+                        on_chunk=lambda n: print(f"\r{n:,} / {total:,}행", end="", flush=True))
+    print(f"\n데이터 로딩 {t_load:.2f}s / 내보내기 {time.perf_counter() - t:.2f}s ({rows:,}행) → {args.out}")
+
+
+def cmd_loadtest(args) -> None:
+    from .loadtest import RESULTS_PATH, run
+
+    run(args.sessions, steps=args.steps, think=args.think, out=args.out or RESULTS_PATH)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m tariff")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("memory", help="컬럼별 메모리 before/after 리포트")
+    p.set_defaults(func=cmd_memory)
+
+    p = sub.add_parser("bench", help="합성 코퍼스로 로딩/조회 벤치마크 실행 후 결과 누적 저장")
+    p.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="배율 (1, 10, 100)")
+    p.add_argument("--queries", type=int, default=200, help="조회 항목별 반복 횟수")
+    p.add_argument("--out", type=Path, default=None, help="결과 jsonl 경로 (기본: bench/results.jsonl)")
+    p.add_argument("--regenerate", action="store_true", help="합성 코퍼스 다시 생성")
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("bom", help="BOM(HS 코드, 원산지[, 기준일, 과세가격]) 일괄 관세 조회")
+    p.add_argument("bom", type=Path, help="CSV 또는 Excel(.xlsx, openpyxl 필요) 파일")
+    p.add_argument("-o", "--out", type=Path, default=None, help="결과 파일 (.csv / .xlsx, 기본: <입력>_관세.csv)")
+    p.add_argument("--year", type=int, default=None, help="기준일이 없는 줄에 쓸 연도 (기본: 마지막 연도)")
+    p.set_defaults(func=cmd_bom)
+
+    p = sub.add_parser("warmup", help="서버 시작 전 호스트 캐시(스냅샷/파티션/공유 Arrow) 생성, 단계별·import 시간 출력")
+    p.add_argument("--skip-imports", action="store_true", help="모듈별 cold import 시간 측정 생략")
+    p.set_defaults(func=cmd_warmup)
+
+    p = sub.add_parser("export", help="(HS × 연도 × 국가) 최저 관세율/적용 협정 일괄 내보내기 (chunk 단위 스트리밍)")
+    p.add_argument("-o", "--out", type=Path, required=True, help="결과 파일 (.csv / .parquet / .xlsx(openpyxl 필요))")
+    p.add_argument("--prefix", default="", help="HS 접두어 (류/호/소호, 기본: 전체)")
+    p.add_argument("--years", type=int, nargs="+", default=None, help="연도 (기본: 전체)")
+    p.add_argument("--countries", nargs="+", default=None, help="국가 (기본: 전체)")
+    p.add_argument("--chunk", type=int, default=256, help="chunk 당 HS 코드 수")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("loadtest", help="headless streamlit 서버에 동시 세션 N 개 접속 → 처리량/rerun 지연/RSS 증가")
+    p.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20], help="동시 세션 수 (단계별)")
+    p.add_argument("--steps", type=int, default=20, help="세션당 동작 수 (접두어 입력/페이지 전환/국가 선택)")
+    p.add_argument("--think", type=float, default=0.0, help="동작 사이 평균 대기 시간(초, 0 이면 쉬지 않고)")
+    p.add_argument("--out", type=Path, default=None, help="결과 jsonl 경로 (기본: bench/loadtest.jsonl)")
+    p.set_defaults(func=cmd_loadtest)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+헤드리스 벤치마크 (Streamlit 없이 실행)
+
+- synthesize(): 실제 연도 파일을 본떠 1x / 10x / 100x 규모의 합성 코퍼스 생성
+  (HS 코드 수 × hs_mult, 연도 수 × year_mult, 협정 국가 목록도 길어짐)
+- run_scale(): 한 코퍼스에 대해 cold/warm 로딩, 인덱스 생성, 조회별 지연 백분위, 최대 메모리 측정
+- 결과는 bench/results.jsonl 에 한 줄씩 누적 → 직전 기록과 비교해 느려진 항목 표시
+
+    python -m tariff bench                      # 1x, 10x
+    python -m tariff bench --scales 1 10 100 --queries 300
+"""
+import json
+import random
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import ROOT_DIR, TARIFF_DIR, YEARS
+
+try:
+    import resource  # 유닉스 전용 (윈도우에서는 최대 RSS 를 기록하지 않음)
+except ImportError:  # pragma: no cover
+    resource = None
+
+BENCH_DIR = ROOT_DIR / "bench"
+RESULTS_PATH = BENCH_DIR / "results.jsonl"
+
+# 배율 → (HS 코드 배수, 연도 배수) — 행 수는 대략 두 값의 곱만큼 늘어남
+SCALES = {1: (1, 1), 10: (5, 2), 100: (25, 4)}
+# 직전 기록보다 이 배율 이상, 그리고 절대값으로도 이만큼 이상 느려지면 표시 (작은 값의 흔들림 무시)
+REGRESSION_RATIO = 1.2
+REGRESSION_MIN = {"s": 0.05, "p50 ms": 0.1}
+
+
+# =========================================
+# 합성 코퍼스
+# =========================================
+def _shift_year(dates: pd.Series, year: int) -> pd.Series:
+    """'20200101' → f'{year}0101' (빈 값은 그대로)"""
+    return dates.where(dates.isna(), str(year) + dates.str[4:])
+
+
+def synthesize(out_dir: Path, scale: int = 1, seed: int = 0,
+               src_dir: Path = TARIFF_DIR, years: list[int] = YEARS) -> Path:
+    """
+    out_dir/tariff_semi/ 아래 tariff_semi_{연도}.csv, *_with_info.csv 와 out_dir/unique_hscode_semi.csv 생성
+    - 실제 연도 파일의 행을 HS 별로 복제해 품목번호만 새로 부여 (류/호 앞 4자리는 유지)
+    - 연도는 실제 연도를 순환하며 날짜의 연도 부분만 바꿈
+    - 배율이 클수록 국가 지정(적용국가구분=2) 행의 국가 목록에 합성 국가를 덧붙임
+    """
+    hs_mult, year_mult = SCALES.get(scale, (scale, 1))
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+    tariff_dir = out_dir / "tariff_semi"
+    tariff_dir.mkdir(parents=True, exist_ok=True)
+
+    real = {y: pd.read_csv(src_dir / f"tariff_semi_{y}_with_info.csv", dtype=str, encoding="utf-8-sig")
+            for y in years}
+    n_years = len(years) * year_mult
+    syn_years = list(range(years[-1] - n_years + 1, years[-1] + 1))
+
+    # 실제 HS → 복제본별 새 코드 (앞 4자리 + 일련번호 6자리)
+    real_codes = sorted(set().union(*(set(df["품목번호"]) for df in real.values())))
+    code_map = {}
+    serial = 0
+    for copy in range(hs_mult):
+        for code in real_codes:
+            code_map[(copy, code)] = code if copy == 0 else f"{code[:4]}{serial:06d}"
+            serial += copy > 0
+
+    pool = [f"합성국가{i:03d}" for i in range(8 * year_mult * hs_mult)]
+    suffixes = [" ".join(rng.sample(pool, min(len(pool), 2 * (hs_mult + year_mult - 2)))) for _ in range(16)]
+
+    for i, y in enumerate(syn_years):
+        base = real[years[i % len(years)]]
+        parts = []
+        for copy in range(hs_mult):
+            part = base.copy()
+            part["품목번호"] = [code_map[(copy, c)] for c in part["품목번호"]]
+            if "결정세번" in part.columns:
+                same = part["결정세번"] == base["품목번호"]
+                part["결정세번"] = part["결정세번"].where(~same, part["품목번호"])
+            parts.append(part)
+        df = pd.concat(parts, ignore_index=True)
+        for c in ["적용개시일", "적용만료일"]:
+            if c in df.columns:
+                df[c] = _shift_year(df[c], y)
+        if scale > 1 and "국가" in df.columns:
+            # 같은 관세율 행(결정세번만 다른 중복 행)은 같은 국가 목록을 받도록 행 내용으로 고름
+            listed = df["적용국가구분"] == "2"
+            key = pd.util.hash_pandas_object(df.loc[listed, ["품목번호", "관세율구분"]], index=False)
+            extra = np.asarray(suffixes, dtype=object)[(key % len(suffixes)).to_numpy()]
+            df.loc[listed, "국가"] = df.loc[listed, "국가"] + " " + extra
+
+        df.to_csv(tariff_dir / f"tariff_semi_{y}_with_info.csv", index=False, encoding="utf-8-sig")
+        fact_cols = [c for c in df.columns if c not in ("결정세번", "결정세번 다름", "이름", "대분류", "소분류")]
+        df[fact_cols].drop_duplicates().to_csv(tariff_dir / f"tariff_semi_{y}.csv", index=False, encoding="utf-8")
+
+    codes = sorted(set(code_map.values()))
+    pd.DataFrame({"HS코드": codes}).to_csv(out_dir / "unique_hscode_semi.csv", index=False, encoding="utf-8-sig")
+    return out_dir
+
+
+def corpus_years(scale: int, years: list[int] = YEARS) -> list[int]:
+    _, year_mult = SCALES.get(scale, (scale, 1))
+    n = len(years) * year_mult
+    return list(range(years[-1] - n + 1, years[-1] + 1))
+
+
+# =========================================
+# 측정
+# =========================================
+def _stats(samples: list[float]) -> dict:
+    """초 단위 측정값 목록 → ms 단위 백분위"""
+    ms = np.asarray(samples, dtype=np.float64) * 1000
+    return {
+        "n": int(len(ms)),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+    }
+
+
+def _timed(fn, *args):
+    t = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t
+
+
+def _queries(fn, args_list: list[tuple]) -> dict:
+    samples = []
+    for args in args_list:
+        t = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - t)
+    return _stats(samples)
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # 리눅스: KB
+    return round(kb / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scale(data_dir: Path, years: list[int], n_queries: int = 200, seed: int = 0) -> dict:
+    """한 코퍼스(data_dir/tariff_semi, data_dir/unique_hscode_semi.csv)에 대한 측정 결과"""
+    from . import (CountryIndex, HsIndex, HsPrefixIndex, NameIndex, PartitionedStore, RateMatrix, TariffCube,
+                   ValidityIndex, hs_key, hs_str, load_item_table, load_tariff_frame, read_csv_safe, token_match_country)
+
+    data_dir = Path(data_dir)
+    tariff_dir = data_dir / "tariff_semi"
+    hs_path = data_dir / "unique_hscode_semi.csv"
+    res = {}
+
+    def load():
+        return load_tariff_frame(tariff_dir, years), load_item_table(tariff_dir, years)
+
+    shutil.rmtree(data_dir / ".cache", ignore_errors=True)
+    _, res["load.cold_s"] = _timed(load)
+    (df, items), res["load.warm_s"] = _timed(load)
+    hs_list, res["load.hs_list_s"] = _timed(
+        lambda: HsPrefixIndex(read_csv_safe(hs_path, dtype=str).iloc[:, 0].dropna()))
+    hs_idx, res["build.hs_index_s"] = _timed(HsIndex, df, items)
+    cty_idx, res["build.country_index_s"] = _timed(CountryIndex, hs_idx)
+    rate_mx, res["build.rate_matrix_s"] = _timed(RateMatrix, cty_idx)
+    valid, res["build.validity_index_s"] = _timed(ValidityIndex, hs_idx)
+    cube, res["build.cube_s"] = _timed(TariffCube, df, items)
+    names, res["build.name_index_s"] = _timed(NameIndex, items)
+    parts = PartitionedStore(tariff_dir, years)
+    _, res["build.partitions_s"] = _timed(parts.sync)
+    res = {k: round(v, 4) for k, v in res.items()}
+
+    rng = random.Random(seed)
+    codes = hs_str(pd.Series(hs_idx.codes)).tolist()
+    countries = cty_idx.countries or ["all"]
+    qs = [(rng.choice(codes), rng.choice(countries), rng.choice(years)) for _ in range(n_queries)]
+    hs_col = df["품목번호"]
+
+    def scan_year(hs, y):
+        sel = df[hs_col == hs_key(hs)]
+        return sel[sel["연도"] == y]
+
+    res["query.hs_filter.scan"] = _queries(lambda hs: df[hs_col == hs_key(hs)], [(h,) for h, _, _ in qs])
+    res["query.hs_filter.index"] = _queries(hs_idx.rows, [(h,) for h, _, _ in qs])
+    res["query.country.regex"] = _queries(
+        lambda hs, c, y: token_match_country(scan_year(hs, y)["국가"], c), qs)
+    res["query.country.index"] = _queries(cty_idx.rows, qs)
+    res["query.trend.groupby"] = _queries(
+        lambda hs: df[hs_col == hs_key(hs)].groupby("연도")["관세율_num"].mean(), [(h,) for h, _, _ in qs])
+    res["query.trend.cube"] = _queries(lambda hs: cube.series("세번", hs), [(h,) for h, _, _ in qs])
+    res["query.prefix"] = _queries(lambda hs: hs_list.match(hs[:4], limit=1000), [(h,) for h, _, _ in qs])
+    # 품목명 앞부분 2~4글자 (사용자가 치는 중인 검색어)
+    words = items["이름"].dropna().astype(str).tolist() if "이름" in items.columns else []
+    if words:
+        res["query.name_search"] = _queries(
+            names.search, [(w[:rng.randint(2, 4)],) for w in rng.choices(words, k=n_queries)])
+    res["query.cheapest"] = _queries(rate_mx.cheapest, [(h, y) for h, _, y in qs])
+    res["query.partition"] = _queries(lambda hs, y: parts.query(hs=hs, years=[y]), [(h, y) for h, _, y in qs])
+    res["query.validity"] = _queries(
+        valid.rows, [(h, pd.Timestamp(y, 1 + rng.randrange(12), 1)) for h, _, y in qs])
+
+    return {
+        "rows": int(len(df)),
+        "items": int(len(items)),
+        "hs": int(len(hs_idx.codes)),
+        "years": len(years),
+        "countries": len(cty_idx.countries),
+        "peak_rss_mb": _peak_rss_mb(),
+        "results": res,
+    }
+
+
+# =========================================
+# 기록 / 비교
+# =========================================
+def git_rev(root: Path = ROOT_DIR) -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def load_results(path: Path = RESULTS_PATH) -> list[dict]:
+    if not Path(path).exists():
+        return []
+    with open(path, encoding="utf-8") as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+
+def _value(metric) -> float | None:
+    """비교 기준값: 조회는 p50(ms), 나머지는 초"""
+    if isinstance(metric, dict):
+        return metric.get("p50_ms")
+    return metric
+
+
+def compare(cur: dict, prev: dict | None) -> pd.DataFrame:
+    """직전 기록 대비 비율 (REGRESSION_RATIO / REGRESSION_MIN 을 둘 다 넘으면 regress 표시)"""
+    rows = []
+    for name, metric in cur["results"].items():
+        v = _value(metric)
+        p = _value(prev["results"].get(name)) if prev else None
+        ratio = round(v / p, 2) if p else None
+        unit = "p50 ms" if isinstance(metric, dict) else "s"
+        slower = bool(ratio) and ratio >= REGRESSION_RATIO and v - p >= REGRESSION_MIN[unit]
+        rows.append({
+            "항목": name,
+            "값": v,
+            "단위": unit,
+            "p95_ms": metric.get("p95_ms") if isinstance(metric, dict) else None,
+            "p99_ms": metric.get("p99_ms") if isinstance(metric, dict) else None,
+            "직전": p,
+            "비율": ratio,
+            "": "regress" if slower else "",
+        })
+    return pd.DataFrame(rows)
+
+
+def run(scales: list[int], n_queries: int = 200, out: Path = RESULTS_PATH,
+        data_root: Path = BENCH_DIR / "data", regenerate: bool = False) -> list[dict]:
+    """배율별로 (필요하면) 코퍼스를 만들고, 배율마다 새 프로세스에서 측정해 기록"""
+    history = load_results(out)
+    records = []
+    for scale in scales:
+        years = corpus_years(scale)
+        data_dir = Path(data_root) / f"x{scale}"
+        if regenerate or not (data_dir / "tariff_semi").exists():
+            shutil.rmtree(data_dir, ignore_errors=True)
+            synthesize(data_dir, scale)
+        # 최대 RSS 가 배율끼리 섞이지 않도록 배율마다 새 프로세스
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            rec = pool.submit(run_scale, data_dir, years, n_queries).result()
+        rec = {"ts": datetime.now().isoformat(timespec="seconds"), "rev": git_rev(), "scale": scale,
+               "queries": n_queries, **rec}
+        prev = next((r for r in reversed(history) if r.get("scale") == scale), None)
+        records.append(rec)
+
+        print(f"\n== {scale}x: 행 {rec['rows']:,} / HS {rec['hs']:,} / 연도 {rec['years']} / "
+              f"국가 {rec['countries']} / 최대 RSS {rec['peak_rss_mb']} MB"
+              + (f"  (직전: {prev['rev']} {prev['ts']})" if prev else ""))
+        print(compare(rec, prev).to_string(index=False))
+
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "a", encoding="utf-8") as fp:
+        for rec in records:
+            fp.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    return records
@@ -0,0 +1,197 @@
+"""
+BOM(자재 목록) 일괄 관세 조회 — (HS 코드, 원산지[, 기준일, 과세가격]) 수만~수십만 줄을 한 번에
+
+- 기준일이 없는 줄: RateMatrix (HS × 연도 × 국가) 셀을 배열 인덱싱으로 한 번에 꺼냄
+- 기준일이 있는 줄: ValidityIndex 로 그날 적용 중인 행을 배치 조회한 뒤,
+  CountryIndex.applies 로 원산지에 적용되는 행만 남기고 줄별 최저세율/협정을 누적
+→ 줄 단위 파이썬 반복(token_match_country 등) 없음
+
+    python -m tariff bom bom.csv -o result.csv [--year 2025]   # 결과 확장자 .xlsx 면 Excel (openpyxl 필요)
+"""
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .country_index import CountryIndex
+from .rate_matrix import ORIGIN_SPECIFIC_CODES, RateMatrix
+from .schema import HS_WIDTH
+from .snapshot import detect_encoding
+from .validity_index import ValidityIndex
+
+# 표준 컬럼 → 업로드 파일에서 허용하는 이름 (대소문자/공백 무시)
+BOM_ALIASES = {
+    "HS코드": ["hs코드", "hs", "hscode", "hs_code", "품목번호", "세번"],
+    "원산지": ["원산지", "국가", "country", "origin"],
+    "기준일": ["기준일", "일자", "date", "수입일"],
+    "과세가격": ["과세가격", "customs_value", "value", "금액", "가격"],
+}
+
+
+# =========================================
+# 입력
+# =========================================
+def read_bom(source, name: str | None = None) -> pd.DataFrame:
+    """CSV / Excel BOM 읽기 — source 는 경로 또는 업로드 파일 객체(bytes 읽기 가능)"""
+    name = str(name or getattr(source, "name", source))
+    data = Path(source).read_bytes() if isinstance(source, (str, Path)) else source.read()
+    if name.lower().endswith((".xlsx", ".xlsm", ".xls")):
+        try:
+            return pd.read_excel(io.BytesIO(data), dtype=str)
+        except ImportError as e:
+            raise ImportError("Excel BOM 을 읽으려면 openpyxl 이 필요합니다 (pip install openpyxl)") from e
+    return pd.read_csv(io.BytesIO(data), dtype=str, encoding=detect_encoding(data))
+
+
+def normalize_bom(df: pd.DataFrame) -> pd.DataFrame:
+    """별칭 컬럼을 표준 이름(HS코드/원산지/기준일/과세가격)으로 맞추고 값 정리"""
+    lookup = {}
+    for std, aliases in BOM_ALIASES.items():
+        for c in df.columns:
+            if str(c).strip().lower().replace(" ", "") in aliases or str(c).strip() == std:
+                lookup.setdefault(std, c)
+    missing = [c for c in ("HS코드", "원산지") if c not in lookup]
+    if missing:
+        raise ValueError(f"BOM 에 필수 컬럼이 없습니다: {', '.join(missing)} (현재 컬럼: {', '.join(map(str, df.columns))})")
+
+    out = df.copy()
+    # 숫자만 남겨 10자리로 맞춤 — 숫자가 없거나 10자리를 넘는 값은 입력 그대로 두고 resolve_bom 에서 형식 오류로 표시
+    raw = df[lookup["HS코드"]]
+    digits = raw.astype(str).str.replace(r"\D", "", regex=True)
+    parsed = raw.notna() & digits.str.len().between(1, HS_WIDTH)
+    out["HS코드"] = digits.str.zfill(HS_WIDTH).where(parsed, raw.fillna("").astype(str))
+    out["원산지"] = df[lookup["원산지"]].astype(str).str.strip()
+    out["기준일"] = (pd.to_datetime(df[lookup["기준일"]], errors="coerce") if "기준일" in lookup
+                   else pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]"))
+    out["과세가격"] = (pd.to_numeric(df[lookup["과세가격"]].astype(str).str.replace(",", ""), errors="coerce")
+                    if "과세가격" in lookup else np.nan)
+    return out
+
+
+# =========================================
+# 일괄 조회
+# =========================================
+def _agreement_lists(mask: np.ndarray, agreements: np.ndarray) -> np.ndarray:
+    """줄별 packed 비트마스크 → '협정A, 협정B' 문자열 (서로 다른 비트 조합마다 한 번만 만듦)"""
+    out = np.full(len(mask), "", dtype=object)
+    if len(mask) == 0:
+        return out
+    patterns, inverse = np.unique(mask, axis=0, return_inverse=True)
+    names = []
+    for bits in patterns:
+        on = np.flatnonzero(np.unpackbits(bits, bitorder="little")[: len(agreements)])
+        names.append(", ".join(agreements[on].tolist()))
+    return np.asarray(names, dtype=object)[inverse.ravel()]
+
+
+def resolve_bom(bom: pd.DataFrame, rate_mx: RateMatrix, valid_idx: ValidityIndex | None = None,
+                cty_idx: CountryIndex | None = None, default_year: int | None = None) -> pd.DataFrame:
+    """
+    표준화된 BOM(normalize_bom 결과)의 줄마다 최저 관세율 / 그 협정 / 적용 가능 협정 / 예상 관세액
+    - 기준일이 있는 줄은 그날 적용 중인 행 기준 (valid_idx, cty_idx 필요)
+    - 없는 줄은 default_year(기본: 데이터 마지막 연도)의 연 단위 행렬 기준
+    """
+    n = len(bom)
+    years = rate_mx.years
+    default_year = int(default_year if default_year is not None else (years[-1] if len(years) else 0))
+    nbytes = rate_mx.mask.shape[-1]
+
+    hs_text = bom["HS코드"].astype(str)
+    fmt_ok = hs_text.str.fullmatch(rf"\d{{{HS_WIDTH}}}").to_numpy(dtype=bool)
+    codes = np.where(fmt_ok, pd.to_numeric(hs_text.where(fmt_ok), errors="coerce").fillna(-1), -1).astype(np.int64)
+    dates = pd.to_datetime(bom["기준일"]) if "기준일" in bom.columns else pd.Series(pd.NaT, index=bom.index)
+    year = dates.dt.year.fillna(default_year).astype(np.int64).to_numpy()
+    h = np.searchsorted(rate_mx.codes, codes)
+    h_ok = h < len(rate_mx.codes)
+    h_ok[h_ok] = rate_mx.codes[h[h_ok]] == codes[h_ok]
+    y = np.searchsorted(years, year)
+    y_ok = y < len(years)
+    y_ok[y_ok] = years[y[y_ok]] == year[y_ok]
+    c = pd.Index(rate_mx.countries).get_indexer(bom["원산지"].astype(str))
+    c_ok = c >= 0
+
+    min_rate = np.full(n, np.nan)
+    best = np.full(n, -1, dtype=np.int64)
+    mask = np.zeros((n, nbytes), dtype=np.uint8)
+
+    # 1) 기준일 없는 줄 → 연 단위 행렬 셀 꺼내기
+    by_year = h_ok & y_ok & c_ok & dates.isna().to_numpy()
+    i = np.flatnonzero(by_year)
+    if len(i):
+        min_rate[i] = rate_mx.min_rate[h[i], y[i], c[i]]
+        best[i] = rate_mx.best[h[i], y[i], c[i]]
+        mask[i] = rate_mx.mask[h[i], y[i], c[i]]
+
+    # 2) 기준일 있는 줄 → 그날 적용 중인 행 × 원산지 적용 여부
+    by_date = h_ok & c_ok & dates.notna().to_numpy()
+    j = np.flatnonzero(by_date)
+    if len(j) and valid_idx is not None and cty_idx is not None:
+        df = valid_idx.hs_index.df
+        qid, pos = valid_idx.lookup(codes[j], dates.to_numpy()[j])
+        keep = cty_idx.applies(pos, cty_idx.country_ids(bom["원산지"].to_numpy()[j])[qid])
+        if "관세율구분" in df.columns:
+            keep &= ~np.isin(df["관세율구분"].to_numpy()[pos].astype(object), list(ORIGIN_SPECIFIC_CODES))
+        qid, pos = qid[keep], pos[keep]
+        agr = df["관세율구분값"].cat.set_categories(rate_mx.agreements).cat.codes.to_numpy()[pos].astype(np.int64)
+        rate = df["관세율_num"].to_numpy(dtype=np.float64)[pos]
+        ok = agr >= 0
+        # 공통 행과 국가 지정 행을 따로 누적한 뒤 RateMatrix 와 같은 규칙으로 합침 (같은 세율이면 국가 지정 협정)
+        base = ok & (df["적용국가구분"].to_numpy()[pos] == 1)
+        spec = ok & ~base
+        d_min, d_best, d_mask = RateMatrix._merge(
+            RateMatrix._accumulate((qid[base],), (len(j),), agr[base], rate[base], nbytes),
+            RateMatrix._accumulate((qid[spec],), (len(j),), agr[spec], rate[spec], nbytes))
+        min_rate[j], best[j], mask[j] = d_min, d_best, d_mask
+
+    # 3) 결과 컬럼
+    out = bom.copy()
+    out["적용 연도"] = np.where(dates.notna(), dates.dt.year.fillna(0).astype(int), default_year)
+    out["최저 관세율(%)"] = RateMatrix._rates(min_rate)
+    out["최저세율 협정"] = np.append(rate_mx.agreements, None)[best]  # best=-1 → None
+    out["적용 가능 협정"] = _agreement_lists(mask, rate_mx.agreements)
+    value = pd.to_numeric(out["과세가격"], errors="coerce") if "과세가격" in out.columns else np.nan
+    out["예상 관세액"] = np.round(value * out["최저 관세율(%)"] / 100, 2)
+
+    note = np.full(n, "", dtype=object)
+    note[np.isnan(min_rate)] = "해당 세율 없음"
+    note[~y_ok & dates.isna().to_numpy()] = f"{default_year}년 데이터 없음"
+    note[~c_ok] = "원산지 국가를 찾을 수 없음"
+    note[~h_ok] = "HS 코드 없음"
+    note[~fmt_ok] = "HS 코드 형식 오류"
+    out["비고"] = note
+    return out
+
+
+def summarize(result: pd.DataFrame) -> dict:
+    """결과 요약 (줄 수 / 조회 성공 / 예상 관세액 합계)"""
+    ok = result["비고"] == ""
+    return {
+        "줄 수": int(len(result)),
+        "조회 성공": int(ok.sum()),
+        "실패": int((~ok).sum()),
+        "예상 관세액 합계": float(np.nansum(result["예상 관세액"].to_numpy(dtype=np.float64))),
+    }
+
+
+# =========================================
+# 출력
+# =========================================
+def to_bytes(result: pd.DataFrame, fmt: str = "csv") -> bytes:
+    """다운로드용 바이트 (csv: 엑셀에서 바로 열리도록 utf-8-sig / xlsx: openpyxl 필요)"""
+    if fmt == "xlsx":
+        buf = io.BytesIO()
+        try:
+            result.to_excel(buf, index=False)
+        except ImportError as e:
+            raise ImportError("Excel 로 저장하려면 openpyxl 이 필요합니다 (pip install openpyxl)") from e
+        return buf.getvalue()
+    return result.to_csv(index=False).encode("utf-8-sig")
+
+
+def excel_available() -> bool:
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,210 @@
+"""
+연도 간 관세 변경 내역(change log)
+
+연속한 두 연도의 관세율 표를 (품목번호, 관세율구분) 키로 비교해 바뀐 줄만 남긴다.
+- 키는 정수 하나(품목번호 × 관세율구분 코드 수 + 코드)로 합쳐 연도별로 정렬해 두고,
+  두 연도의 정렬 배열을 np.intersect1d / setdiff1d(정렬 병합)로 맞춘다
+- 적용 국가 집합은 '국가' 카테고리 문자열만 토큰화해서 비교 (행 단위 문자열 처리 없음)
+- 데이터 버전당 한 번 만들고, 페이지에서는 완성된 로그를 마스크로 거르기만 한다
+
+변경 구분: 신규 / 삭제 / 인상 / 인하 / 세율 변경(숫자로 비교 불가) / 국가 변경
+"""
+import numpy as np
+import pandas as pd
+
+from .country_index import EXCLUDED_TOKENS, tokenize_countries
+from .items import representative
+from .schema import concat_typed, hs_str
+
+NEW, REMOVED, UP, DOWN, CHANGED, COUNTRY = "신규", "삭제", "인상", "인하", "세율 변경", "국가 변경"
+CHANGE_KINDS = [NEW, REMOVED, UP, DOWN, CHANGED, COUNTRY]
+
+LOG_COLS = [
+    "연도", "이전연도", "품목번호", "이름", "관세율구분", "관세율구분값", "변경",
+    "이전 관세율", "관세율", "변동(%p)", "추가 국가", "제외 국가",
+]
+
+
+def _categorical(s: pd.Series) -> pd.Series:
+    return s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+
+
+class _Encoded:
+    """비교에 필요한 컬럼을 정수 코드로 바꿔 둔 프레임 + 연도별 (정렬된 키, 대표 행 위치)"""
+
+    def __init__(self, df: pd.DataFrame):
+        kind = _categorical(df["관세율구분"])
+        self.kinds = np.asarray(kind.cat.categories, dtype=object)
+        self.n_kind = max(len(self.kinds), 1)
+        keys = df["품목번호"].to_numpy(dtype=np.int64) * self.n_kind + kind.cat.codes.to_numpy().astype(np.int64)
+        years = df["연도"].to_numpy()
+        self.years = sorted(int(y) for y in np.unique(years))
+
+        self.rate_num = df["관세율_num"].to_numpy(dtype=np.float64) if "관세율_num" in df.columns \
+            else np.full(len(df), np.nan)
+        rate = _categorical(df["관세율"].astype(str) if "관세율" in df.columns
+                            else pd.Series("", index=df.index))
+        agr = _categorical(df["관세율구분값"] if "관세율구분값" in df.columns
+                           else pd.Series("", index=df.index))
+        cty = _categorical(df["국가"] if "국가" in df.columns else pd.Series("", index=df.index))
+        self.rate = rate.cat.codes.to_numpy()
+        self.agr, self.agr_cats = agr.cat.codes.to_numpy(), np.asarray(agr.cat.categories, dtype=object)
+        self.cty = cty.cat.codes.to_numpy()
+        # 카테고리(서로 다른 국가 문자열)별 국가 집합
+        self.cty_sets = [frozenset(t for t in tokenize_countries(v) if t not in EXCLUDED_TOKENS)
+                         for v in cty.cat.categories]
+
+        # 같은 키가 여럿이면 처음 나온 행
+        self.by_year = {}
+        for y in self.years:
+            pos = np.flatnonzero(years == y)
+            k, first = np.unique(keys[pos], return_index=True)
+            self.by_year[y] = (k, pos[first])
+
+
+class ChangeLog:
+    def __init__(self, df: pd.DataFrame, items: pd.DataFrame | None = None):
+        self.years: list[int] = []
+        self.log = pd.DataFrame(columns=LOG_COLS)
+        self._parts: dict[int, pd.DataFrame] = {}  # 변경 후 연도 → (이전 연도 → 그 연도) 변경분
+        self._names = pd.Series(dtype=object)
+        if df.empty or any(c not in df.columns for c in ["품목번호", "관세율구분", "연도"]):
+            return
+
+        enc = _Encoded(df)
+        self.years = enc.years
+        self._parts = {b: self._diff(enc, a, b) for a, b in zip(self.years[:-1], self.years[1:])}
+        self._set_names(items if items is not None else df)
+        self.log = self._build_log(self._parts)
+
+    def update(self, changed: list[int], load_year, items: pd.DataFrame | None = None) -> list[int]:
+        """
+        바뀐 연도만 다시 비교 — changed 연도가 한쪽 끝인 (이전, 다음) 쌍만 새로 계산
+        load_year(y): 그 연도 프레임 (원본이 사라졌으면 None). 다시 계산한 '변경 후 연도' 목록 반환
+        """
+        frames = {y: load_year(y) for y in changed}
+        years = sorted((set(self.years) - set(changed)) | {y for y, f in frames.items() if f is not None})
+        old_pairs = set(zip(self.years[:-1], self.years[1:]))
+        new_pairs = list(zip(years[:-1], years[1:]))
+        redo = [(a, b) for a, b in new_pairs if a in frames or b in frames or (a, b) not in old_pairs]
+        parts = {b: self._parts[b] for a, b in new_pairs if (a, b) not in redo}
+        for a, b in redo:
+            pair = [frames[y] if y in frames else load_year(y) for y in (a, b)]
+            parts[b] = self._diff(_Encoded(concat_typed(pair)), a, b) if all(f is not None for f in pair) \
+                else pd.DataFrame()
+        if items is not None:
+            self._set_names(items)
+        # 다른 세션이 읽는 중일 수 있으므로 새 로그를 다 만든 뒤 한 번에 교체
+        self.years, self._parts, self.log = years, parts, self._build_log(parts)
+        return [b for _, b in redo]
+
+    def _set_names(self, items: pd.DataFrame) -> None:
+        names = representative(items, ["이름"])
+        self._names = names["이름"].astype(object) if "이름" in names.columns else pd.Series(dtype=object)
+
+    def _build_log(self, parts: dict[int, pd.DataFrame]) -> pd.DataFrame:
+        """연도 쌍별 변경분 → 표시용 로그 한 장"""
+        parts = [p for _, p in sorted(parts.items()) if not p.empty]
+        if not parts:
+            return pd.DataFrame(columns=LOG_COLS)
+        log = pd.concat(parts, ignore_index=True)
+        log["이름"] = log["hs"].map(self._names)
+        log["품목번호"] = hs_str(log["hs"])
+        log = log.sort_values(["연도", "품목번호", "관세율구분"], kind="stable").reset_index(drop=True)
+        for c in ["품목번호", "관세율구분", "관세율구분값", "변경"]:
+            log[c] = log[c].astype("category")
+        log["연도"] = log["연도"].astype("int16")
+        log["이전연도"] = log["이전연도"].astype("int16")
+        return log[LOG_COLS]
+
+    @staticmethod
+    def _diff(enc: _Encoded, prev: int, cur: int) -> pd.DataFrame:
+        """prev → cur 연도의 바뀐 키만 (정렬 키 배열끼리 병합)"""
+        (ka, pa), (kb, pb) = enc.by_year[prev], enc.by_year[cur]
+        n_kind = enc.n_kind
+
+        def cset(code: int) -> frozenset:
+            return enc.cty_sets[code] if code >= 0 else frozenset()
+
+        common, ia, ib = np.intersect1d(ka, kb, assume_unique=True, return_indices=True)
+        ra, rb = pa[ia], pb[ib]
+
+        # 세율: 숫자로 비교할 수 있으면 크기, 아니면 표기 문자열 비교
+        na, nb = enc.rate_num[ra], enc.rate_num[rb]
+        both = ~np.isnan(na) & ~np.isnan(nb)
+        up = both & (nb > na)
+        down = both & (nb < na)
+        changed = ~both & (enc.rate[ra] != enc.rate[rb])
+        cty_changed = enc.cty[ra] != enc.cty[rb]
+        cty_changed[cty_changed] = [cset(x) != cset(y)
+                                    for x, y in zip(enc.cty[ra][cty_changed], enc.cty[rb][cty_changed])]
+        hit = up | down | changed | cty_changed
+        kind = np.select([up, down, changed], [UP, DOWN, CHANGED], COUNTRY)
+
+        added = np.setdiff1d(kb, ka, assume_unique=True)
+        removed = np.setdiff1d(ka, kb, assume_unique=True)
+        r_new = pb[np.searchsorted(kb, added)]
+        r_old = pa[np.searchsorted(ka, removed)]
+
+        keys = np.concatenate([common[hit], added, removed])
+        before = np.concatenate([ra[hit], np.full(len(added), -1), r_old])
+        after = np.concatenate([rb[hit], r_new, np.full(len(removed), -1)])
+        change = np.concatenate([kind[hit], np.full(len(added), NEW, dtype=object),
+                                 np.full(len(removed), REMOVED, dtype=object)])
+        if len(keys) == 0:
+            return pd.DataFrame()
+
+        either = np.where(after >= 0, after, before)
+        agr = enc.agr[either]
+        rate_before = np.where(before >= 0, enc.rate_num[np.maximum(before, 0)], np.nan)
+        rate_after = np.where(after >= 0, enc.rate_num[np.maximum(after, 0)], np.nan)
+        sets_before = [cset(enc.cty[r]) if r >= 0 else frozenset() for r in before]
+        sets_after = [cset(enc.cty[r]) if r >= 0 else frozenset() for r in after]
+        return pd.DataFrame({
+            "연도": cur,
+            "이전연도": prev,
+            "hs": keys // n_kind,
+            "관세율구분": enc.kinds[keys % n_kind],
+            "관세율구분값": np.where(agr >= 0, enc.agr_cats[np.maximum(agr, 0)], None),
+            "변경": change,
+            "이전 관세율": np.round(rate_before, 4),
+            "관세율": np.round(rate_after, 4),
+            "변동(%p)": np.round(rate_after - rate_before, 4),
+            "추가 국가": [" ".join(sorted(s1 - s0)) for s0, s1 in zip(sets_before, sets_after)],
+            "제외 국가": [" ".join(sorted(s0 - s1)) for s0, s1 in zip(sets_before, sets_after)],
+        })
+
+    # =========================================
+    # 조회
+    # =========================================
+    def filter(self, years: list[int] | None = None, changes: list[str] | None = None,
+               prefix: str = "", agreements: list[str] | None = None, min_delta: float = 0.0) -> pd.DataFrame:
+        """연도(변경 후 기준) / 변경 구분 / HS 접두어 / 관세율구분값 / 최소 변동폭(%p)으로 거른 로그"""
+        log = self.log
+        if log.empty:
+            return log
+        keep = np.ones(len(log), dtype=bool)
+        if years:
+            keep &= log["연도"].isin(years).to_numpy()
+        if changes:
+            keep &= log["변경"].isin(changes).to_numpy()
+        if agreements:
+            keep &= log["관세율구분값"].isin(agreements).to_numpy()
+        if prefix:
+            # 카테고리 값만 비교하고 코드로 펼침
+            cats = log["품목번호"].cat.categories
+            keep &= np.asarray(cats.str.startswith(prefix))[log["품목번호"].cat.codes.to_numpy()]
+        if min_delta > 0:
+            delta = np.abs(log["변동(%p)"].to_numpy(dtype=np.float64))
+            # 변동폭을 잴 수 없는 신규/삭제, 세율은 그대로인 국가 변경은 남김
+            keep &= ~(delta < min_delta) | (log["변경"] == COUNTRY).to_numpy()
+        return log[keep]
+
+    def summary(self, log: pd.DataFrame | None = None) -> pd.DataFrame:
+        """(행: 연도, 열: 변경 구분) 건수 표"""
+        log = self.log if log is None else log
+        if log.empty:
+            return pd.DataFrame(columns=CHANGE_KINDS)
+        out = pd.crosstab(log["연도"], log["변경"]).reindex(columns=CHANGE_KINDS, fill_value=0)
+        out.columns.name = None
+        return out
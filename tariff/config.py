@@ -0,0 +1,24 @@
+"""레포 내 data/ 폴더 기준 기본 경로 (CLI/벤치마크 등 Streamlit 밖에서 사용)"""
+import os
+from pathlib import Path
+
+from .reload import discover_years
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / "data"
+TARIFF_DIR = DATA_DIR / "tariff_semi"
+HS_PATH = DATA_DIR / "unique_hscode_semi.csv"
+# 워커들이 같이 매핑하는 Arrow IPC 파일 위치 (예: TARIFF_SHARED_DIR=/dev/shm/tariff)
+SHARED_DIR = Path(os.environ.get("TARIFF_SHARED_DIR") or DATA_DIR / ".cache" / "shared")
+
+# 연도 파일이 하나도 없을 때만 쓰는 기본 연도
+DEFAULT_YEARS = [2020, 2021, 2022, 2023, 2024, 2025]
+
+
+def current_years(tariff_dir: Path = TARIFF_DIR) -> list[int]:
+    """폴더에 있는 연도 파일 기준 연도 목록 (부를 때마다 다시 찾음, 없으면 DEFAULT_YEARS)"""
+    return discover_years(tariff_dir) or list(DEFAULT_YEARS)
+
+
+# CLI/워밍업/벤치마크 기본 연도 — 앱과 같은 규칙 (새 연도 파일을 넣으면 같이 따라감)
+YEARS = current_years()
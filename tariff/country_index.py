@@ -0,0 +1,119 @@
+"""
+국가 → 협정 행 역색인(inverted index)
+
+'국가' 셀('브라질 미국 중국' 식 공백 구분)은 카테고리라서 서로 다른 값이 수십 개뿐이다.
+카테고리 문자열만 한 번 토큰화하고, 국가마다 해당 행 위치를 HsIndex 정렬 순서 기준의
+정렬된 배열로 저장한다. → (HS, 연도) 구간과의 교집합은 searchsorted 두 번이면 끝
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from .hs_index import HsIndex
+
+# 국가 목록에서 제외할 토큰 ('all' 은 적용국가구분=1 표기, '한국' 은 수입국 자신)
+EXCLUDED_TOKENS = {"all", "nan", "한국"}
+
+
+def tokenize_countries(value) -> list[str]:
+    """'브라질  미국 중국' → ['브라질', '미국', '중국'] (공백 여러 개/앞뒤 공백 허용)"""
+    return str(value).split()
+
+
+def token_match_country(series: pd.Series, country: str) -> pd.Series:
+    """
+    '브라질 미국 중국'처럼 공백 구분된 국가 문자열에서 토큰 매칭 (행 단위 정규식, 인덱스 없이 쓸 때)
+    """
+    patt = re.compile(rf"(?:^|\s){re.escape(country)}(?:\s|$)")
+    out = series.astype(str).str.replace(r"\s+", " ", regex=True).str.strip().apply(
+        lambda s: bool(patt.search(s))
+    )
+    out.index = series.index
+    return out
+
+
+def country_names(values) -> list[str]:
+    """'국가' 컬럼 값들 → 국가 목록 (정렬, 제외 토큰 빼고)"""
+    return sorted({t for v in values for t in tokenize_countries(v)} - EXCLUDED_TOKENS)
+
+
+class CountryIndex:
+    def __init__(self, hs_index: HsIndex, countries: list[str] | None = None):
+        """countries 를 주면 국가 축을 그 목록으로 고정 (HS 일부만 담긴 프레임에서도 전체 국가 기준 조회)"""
+        self.hs_index = hs_index
+        df = hs_index.df
+        order = hs_index.order
+        empty = np.empty(0, dtype=np.int64)
+        self.base_pos = empty       # 적용국가구분=1 (전체 국가 공통) 행
+        self.postings = {}          # 국가 → 적용국가구분=2 이면서 그 국가를 포함하는 행
+        self.countries = list(countries) if countries is not None else []
+        self.cat_country = np.zeros((0, 0), dtype=bool)  # '국가' 카테고리 코드 × 국가 → 포함 여부
+        self._cat_codes = self._scope = empty              # df 행 순서 기준 (배치 조회용)
+        if df.empty or "국가" not in df.columns or "적용국가구분" not in df.columns:
+            return
+
+        scope = df["적용국가구분"].to_numpy()[order]
+        self.base_pos = np.flatnonzero(scope == 1)
+
+        cty = df["국가"]
+        if not isinstance(cty.dtype, pd.CategoricalDtype):
+            cty = cty.astype("category")
+        codes = cty.cat.codes.to_numpy()[order]
+
+        # 카테고리(서로 다른 국가 문자열)만 토큰화 → 국가별 카테고리 코드 목록
+        token_cats: dict[str, list[int]] = {}
+        for code, value in enumerate(cty.cat.categories):
+            for tok in tokenize_countries(value):
+                token_cats.setdefault(tok, []).append(code)
+
+        listed = scope == 2
+        for tok, cats in token_cats.items():
+            self.postings[tok] = np.flatnonzero(listed & np.isin(codes, cats))
+        self.countries = (list(countries) if countries is not None else
+                          sorted(t for t, p in self.postings.items() if t not in EXCLUDED_TOKENS and len(p)))
+
+        cty_id = {c: i for i, c in enumerate(self.countries)}
+        self.cat_country = np.zeros((len(cty.cat.categories), len(self.countries)), dtype=bool)
+        for tok, cats in token_cats.items():
+            if tok in cty_id:
+                self.cat_country[cats, cty_id[tok]] = True
+        self._cat_codes = cty.cat.codes.to_numpy()
+        self._scope = df["적용국가구분"].to_numpy()
+
+    def country_ids(self, names) -> np.ndarray:
+        """국가 이름들 → countries 상의 번호 (없는 국가는 -1)"""
+        return pd.Index(self.countries).get_indexer(pd.Index(names, dtype=object))
+
+    def applies(self, pos: np.ndarray, country_id: np.ndarray) -> np.ndarray:
+        """
+        (df 행 위치, 국가 번호) 쌍마다 그 행이 해당 국가에 적용되는지 — 공통(적용국가구분=1) 행 포함
+        행 단위 정규식 없이 카테고리 코드 × 국가 표 한 번 조회로 끝남
+        """
+        pos, country_id = np.asarray(pos), np.asarray(country_id)
+        if len(self._scope) == 0 or len(pos) == 0:
+            return np.zeros(len(pos), dtype=bool)
+        scope = self._scope[pos]
+        codes = self._cat_codes[pos]
+        ok = (codes >= 0) & (country_id >= 0)
+        listed = np.zeros(len(pos), dtype=bool)
+        listed[ok] = self.cat_country[codes[ok], country_id[ok]]
+        return (scope == 1) | ((scope == 2) & listed)
+
+    @staticmethod
+    def _clip(pos: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        return pos[np.searchsorted(pos, lo, "left"):np.searchsorted(pos, hi, "left")]
+
+    def positions(self, hs, country: str, year: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """(공통 행 위치, 해당 국가 협정 행 위치) — HsIndex.order 기준"""
+        lo, hi = self.hs_index.bounds(hs, year)
+        base = self._clip(self.base_pos, lo, hi)
+        listed = self.postings.get(country)
+        listed = self._clip(listed, lo, hi) if listed is not None else listed
+        return base, (listed if listed is not None else np.empty(0, dtype=np.int64))
+
+    def rows(self, hs, country: str, year: int | None = None) -> pd.DataFrame:
+        """해당 HS/연도에서 country 에 적용되는 행: 공통(적용국가구분=1) + 국가 지정 협정"""
+        base, listed = self.positions(hs, country, year)
+        order = self.hs_index.order
+        return self.hs_index.df.take(np.concatenate([order[base], order[listed]]))
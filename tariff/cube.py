@@ -0,0 +1,143 @@
+"""
+연도별 관세율 집계 큐브
+
+(품목번호 × 연도 × 관세율구분) 단위로 관세율_num 의 합계/건수/최소/최대를 한 번 집계하고,
+그 결과를 다시 묶어 소호(6)·호(4)·류(2)·소분류·대분류 단위로 롤업한다.
+한 연도 파일이 바뀌면 update() 로 그 연도의 fine 집계만 다시 만들고 롤업을 다시 계산한다.
+(평균 = 합계/건수 로 다시 계산하므로 롤업해도 원본 행 기준 평균과 동일)
+소분류·대분류는 품목 차원 테이블(items)이 있으면 거기서 HS 별 대표값을 가져온다.
+"""
+import numpy as np
+import pandas as pd
+
+from .items import representative
+from .schema import hs_str
+
+# (이름, 그룹 키 만드는 방법) — 숫자면 HS 앞자리 수, 문자열이면 해당 컬럼
+CUBE_LEVELS = [
+    ("세번", 10),
+    ("소호", 6),
+    ("호", 4),
+    ("류", 2),
+    ("소분류", "소분류"),
+    ("대분류", "대분류"),
+]
+TOTAL = "전체"  # 관세율구분 전체 합산 행의 표시값
+FINE_COLS = ["품목번호", "연도", "관세율구분", "관세율_num"]
+
+
+class TariffCube:
+    def __init__(self, df: pd.DataFrame, items: pd.DataFrame | None = None):
+        self.levels: list[str] = []
+        self.tables: dict[str, pd.DataFrame] = {}
+        self.hs_labels = pd.DataFrame()  # 세번 → 각 level 의 그룹 키
+        self._fine = pd.DataFrame()
+        self._codes: dict[int, np.ndarray] = {}  # 연도 → 그 연도에 나오는 품목번호
+        self._attrs = pd.DataFrame()
+        if df.empty or any(c not in df.columns for c in FINE_COLS):
+            return
+
+        # 1) 가장 잘게: (품목번호, 연도, 관세율구분) — 정수/카테고리 키로 한 번만 원본 행을 훑음
+        self._fine = self._fine_table(df)
+        pairs = np.unique(np.stack([df["연도"].to_numpy().astype(np.int64), df["품목번호"].to_numpy()]), axis=1)
+        self._codes = {int(y): pairs[1, pairs[0] == y] for y in np.unique(pairs[0])}
+        self._attrs = representative(items if items is not None else df,
+                                     [how for _, how in CUBE_LEVELS if isinstance(how, str)])
+        self.levels, self.tables, self.hs_labels = self._build(self._fine, self._codes, self._attrs)
+
+    def update(self, year: int, df_year: pd.DataFrame | None, items: pd.DataFrame | None = None) -> None:
+        """
+        한 연도만 다시 집계 (df_year 가 None 이면 그 연도 제거) — 다른 연도의 fine 집계는 그대로 두고
+        롤업만 fine 에서 다시 계산. 새 표를 다 만든 뒤 한 번에 교체하므로 조회 중인 세션은 이전 표를 봄
+        """
+        fine = self._fine[self._fine["연도"] != year] if not self._fine.empty else self._fine
+        codes = {y: c for y, c in self._codes.items() if y != year}
+        if df_year is not None and not df_year.empty and all(c in df_year.columns for c in FINE_COLS):
+            fine = pd.concat([fine, self._fine_table(df_year)], ignore_index=True)
+            codes[year] = np.unique(df_year["품목번호"].to_numpy())
+        attrs = self._attrs
+        if items is not None:
+            attrs = representative(items, [how for _, how in CUBE_LEVELS if isinstance(how, str)])
+        built = self._build(fine, codes, attrs) if codes else ([], {}, pd.DataFrame())
+        self._fine, self._codes, self._attrs = fine, codes, attrs
+        self.levels, self.tables, self.hs_labels = built
+
+    @staticmethod
+    def _fine_table(df: pd.DataFrame) -> pd.DataFrame:
+        base = df.loc[df["관세율_num"].notna(), FINE_COLS]
+        fine = (
+            base.groupby(["품목번호", "연도", "관세율구분"], observed=True, sort=False)["관세율_num"]
+            .agg(sum="sum", count="count", min="min", max="max")
+            .reset_index()
+        )
+        fine["관세율구분"] = fine["관세율구분"].astype(str)
+        return fine
+
+    @classmethod
+    def _build(cls, fine: pd.DataFrame, codes: dict, attrs: pd.DataFrame) -> tuple:
+        # 2) HS 별 각 level 그룹 키 (소분류/대분류는 HS 별 대표값(첫 값))
+        codes = pd.Index(np.unique(np.concatenate(list(codes.values()))), name="품목번호")
+        labels = pd.DataFrame(index=codes)
+        labels["세번"] = hs_str(pd.Series(codes, index=codes))
+        for name, how in CUBE_LEVELS:
+            if isinstance(how, int):
+                labels[name] = labels["세번"].str[:how]
+            elif how in attrs.columns:
+                labels[name] = attrs[how].astype(str).reindex(codes).fillna("")
+        levels = [name for name, _ in CUBE_LEVELS if name in labels.columns]
+        hs_labels = labels.set_index("세번", drop=False)[levels]
+
+        # 3) 롤업은 원본 행이 아니라 fine 집계를 다시 묶어서 계산
+        fine = fine.copy()
+        tables = {}
+        for name in levels:
+            fine["key"] = fine["품목번호"].map(labels[name])
+            tables[name] = cls._rollup(fine)
+        return levels, tables, hs_labels
+
+    @staticmethod
+    def _rollup(fine: pd.DataFrame) -> pd.DataFrame:
+        agg = dict(sum=("sum", "sum"), count=("count", "sum"), min=("min", "min"), max=("max", "max"),
+                   n_hs=("품목번호", "nunique"))
+        by_kind = fine.groupby(["key", "연도", "관세율구분"]).agg(**agg).reset_index()
+        total = fine.groupby(["key", "연도"]).agg(**agg).reset_index().assign(관세율구분=TOTAL)
+        out = pd.concat([total, by_kind], ignore_index=True)
+        out["mean"] = out["sum"] / out["count"]
+        out = out.set_index(["key", "관세율구분", "연도"]).sort_index()
+        return out[["mean", "min", "max", "count", "n_hs"]]
+
+    # =========================================
+    # 조회
+    # =========================================
+    def key_for(self, level: str, hs) -> str | None:
+        """선택 HS 가 속한 level 의 그룹 키 (예: 류 → '84')"""
+        try:
+            return self.hs_labels.at[hs_str(hs), level]
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def series(self, level: str, key: str, kind: str = TOTAL) -> pd.DataFrame:
+        """level/key 의 연도별 집계 (연도, mean, min, max, count, n_hs). 없으면 빈 프레임"""
+        tbl = self.tables.get(level)
+        cols = ["연도", "mean", "min", "max", "count", "n_hs"]
+        try:
+            return tbl.loc[(key, kind)].reset_index()[cols]
+        except (KeyError, AttributeError):
+            return pd.DataFrame(columns=cols)
+
+    def kinds(self, level: str, key: str) -> list[str]:
+        """해당 그룹에 존재하는 관세율구분 목록 (전체 제외)"""
+        try:
+            sub = self.tables[level].loc[key]
+        except KeyError:
+            return []
+        return [k for k in sub.index.get_level_values(0).unique() if k != TOTAL]
+
+    def compare(self, level: str, keys: list[str], value: str = "mean", kind: str = TOTAL) -> pd.DataFrame:
+        """여러 그룹 비교용 (행: 연도, 열: key) 피벗"""
+        tbl = self.tables.get(level)
+        if tbl is None or not keys:
+            return pd.DataFrame()
+        sub = tbl[tbl.index.get_level_values("관세율구분") == kind]
+        sub = sub[sub.index.get_level_values("key").isin(keys)]
+        return sub[value].unstack("key").droplevel("관세율구분") if not sub.empty else pd.DataFrame()
@@ -0,0 +1,239 @@
+"""
+실행 계측 (Streamlit 비의존)
+
+- span(name): 코드 구간 시간 측정 (with 블록) — 로더/인덱스 생성 등
+- rerun(page) / lap(name): 한 번의 main() 재실행을 단계별로 끊어서 기록 (들여쓰기 없이 단계 경계에만 호출)
+- partial(page): st.fragment 본문 — 프래그먼트만 다시 실행될 때도 재실행 하나로 기록
+- count_call / count_miss: st.cache_* 함수의 호출 수 / 실제 실행(=miss) 수
+- rss_mb(): 현재·최대 RSS
+모든 측정은 프로세스 전역 집계에 쌓이고, "tariff.diag" 로거로 JSON 한 줄씩 남긴다.
+"""
+import contextvars
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import resource  # 유닉스 전용
+except ImportError:  # pragma: no cover
+    resource = None
+
+log = logging.getLogger("tariff.diag")
+
+RECENT_RUNS = 50  # 진단 페이지에 보여줄 최근 재실행 수
+SPAN_SAMPLES = 500  # 구간별로 남겨 둘 최근 측정값 수 (백분위 계산용)
+
+_lock = threading.Lock()
+_spans: dict[str, deque] = {}                     # 구간 이름 → 최근 ms 목록
+_cache: dict[str, dict] = {}                      # 캐시 함수 이름 → {calls, misses, miss_ms}
+_runs: deque = deque(maxlen=RECENT_RUNS)          # 최근 재실행 요약
+_current: contextvars.ContextVar = contextvars.ContextVar("tariff_diag_run", default=None)
+
+
+# =========================================
+# 로그
+# =========================================
+def setup_logging(path: str | None = None, level: int = logging.INFO) -> None:
+    """JSON 한 줄 로그 출력 설정 (path 가 있으면 파일, 없으면 stderr). 여러 번 불러도 핸들러는 하나"""
+    if any(getattr(h, "_tariff_diag", False) for h in log.handlers):
+        return
+    handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._tariff_diag = True
+    log.addHandler(handler)
+    log.setLevel(level)
+    log.propagate = False
+
+
+def _emit(event: str, **fields) -> None:
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, ensure_ascii=False))
+
+
+# =========================================
+# 메모리
+# =========================================
+def rss_mb() -> tuple[float | None, float | None]:
+    """(현재 RSS, 최대 RSS) MB — 측정할 수 없는 플랫폼에서는 None"""
+    cur = peak = None
+    try:
+        with open("/proc/self/statm") as fp:
+            cur = int(fp.read().split()[1]) * resource.getpagesize() / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = kb / (2**20 if sys.platform == "darwin" else 2**10)
+    return (round(cur, 1) if cur is not None else None, round(peak, 1) if peak is not None else None)
+
+
+# =========================================
+# 구간 측정
+# =========================================
+def _record(name: str, ms: float) -> None:
+    with _lock:
+        _spans.setdefault(name, deque(maxlen=SPAN_SAMPLES)).append(ms)
+    run = _current.get()
+    if run is not None:
+        run.spans.append((name, round(ms, 3)))
+
+
+@contextmanager
+def span(name: str):
+    """with span("load.data"): ... — 걸린 시간을 전역 집계와 현재 재실행 기록에 추가"""
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, (time.perf_counter() - t) * 1000)
+
+
+class Run:
+    """main() 한 번의 재실행 — lap() 으로 단계 경계를 찍으면 직전 경계부터의 시간이 그 단계로 기록됨"""
+
+    def __init__(self, page: str = ""):
+        self.page = page
+        self.spans: list[tuple[str, float]] = []
+        self.started = time.perf_counter()
+        self._mark = self.started
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        ms = (now - self._mark) * 1000
+        self._mark = now
+        with _lock:
+            _spans.setdefault(name, deque(maxlen=SPAN_SAMPLES)).append(ms)
+        self.spans.append((name, round(ms, 3)))
+
+    def summary(self) -> dict:
+        cur, peak = rss_mb()
+        return {
+            "page": self.page,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "spans": self.spans,
+            "rss_mb": cur,
+            "peak_rss_mb": peak,
+        }
+
+
+@contextmanager
+def rerun(page: str = ""):
+    """with rerun(): main() — 재실행 하나를 묶어서 끝날 때 요약을 기록/로그"""
+    run = Run(page)
+    token = _current.set(run)
+    try:
+        yield run
+    finally:
+        _current.reset(token)
+        summary = run.summary()
+        with _lock:
+            _runs.append({"ts": time.time(), **summary})
+        _emit("rerun", **summary)
+
+
+@contextmanager
+def partial(page: str):
+    """프래그먼트 본문용 — 전체 재실행 중이면 그 기록에 이어서 단계를 찍고, 프래그먼트 단독 재실행이면 따로 기록"""
+    run = _current.get()
+    if run is not None:
+        yield run
+        return
+    with rerun(page) as run:
+        yield run
+
+
+def current_run() -> Run | None:
+    return _current.get()
+
+
+def lap(name: str) -> None:
+    """현재 재실행의 단계 경계 (재실행 밖에서는 아무것도 안 함)"""
+    run = _current.get()
+    if run is not None:
+        run.lap(name)
+
+
+def set_page(page: str) -> None:
+    run = _current.get()
+    if run is not None:
+        run.page = page
+
+
+# =========================================
+# 캐시 카운터
+# =========================================
+def _cache_entry(name: str) -> dict:
+    return _cache.setdefault(name, {"calls": 0, "misses": 0, "miss_ms": 0.0})
+
+
+def count_call(name: str):
+    """캐시 래퍼 바깥에 씌움 — 호출 수 (hit + miss)"""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _lock:
+                _cache_entry(name)["calls"] += 1
+            return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def count_miss(name: str):
+    """캐시 래퍼 안쪽(원래 함수)에 씌움 — 실제로 실행된 횟수(miss)와 실행 시간"""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - t) * 1000
+                with _lock:
+                    e = _cache_entry(name)
+                    e["misses"] += 1
+                    e["miss_ms"] += ms
+                _record(f"cache.{name}", ms)
+                _emit("cache_miss", name=name, ms=round(ms, 3))
+        return wrapper
+    return deco
+
+
+# =========================================
+# 조회 (진단 페이지용)
+# =========================================
+def span_stats() -> list[dict]:
+    """구간별 횟수 / 평균 / p50 / p95 / 최대 (ms, 최근 SPAN_SAMPLES 개 기준)"""
+    with _lock:
+        items = [(k, np.asarray(v, dtype=np.float64)) for k, v in _spans.items()]
+    return [
+        {"구간": k, "횟수": len(v), "평균(ms)": round(v.mean(), 2), "p50(ms)": round(np.percentile(v, 50), 2),
+         "p95(ms)": round(np.percentile(v, 95), 2), "최대(ms)": round(v.max(), 2)}
+        for k, v in sorted(items) if len(v)
+    ]
+
+
+def cache_stats() -> list[dict]:
+    """캐시 함수별 호출 / miss / hit / 적중률 / miss 평균 실행 시간"""
+    with _lock:
+        items = [(k, dict(v)) for k, v in _cache.items()]
+    out = []
+    for k, e in sorted(items):
+        hits = max(e["calls"] - e["misses"], 0)
+        out.append({
+            "함수": k, "호출": e["calls"], "miss": e["misses"], "hit": hits,
+            "적중률(%)": round(100 * hits / e["calls"], 1) if e["calls"] else None,
+            "miss 평균(ms)": round(e["miss_ms"] / e["misses"], 2) if e["misses"] else None,
+        })
+    return out
+
+
+def recent_runs() -> list[dict]:
+    with _lock:
+        return list(_runs)
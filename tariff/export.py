@@ -0,0 +1,217 @@
+"""
+관세율 일괄 내보내기 — (HS × 연도 × 국가) 전체를 CSV / Excel / Parquet 로
+
+- iter_report(): RateMatrix 를 HS 축으로 잘라 chunk_hs 개씩 긴 형태 DataFrame 을 만들어 내보내는 generator
+  (한 번에 메모리에 올라가는 건 chunk 하나 — 전체 행 수와 무관)
+- write_report(): chunk 를 받는 대로 파일에 이어 씀
+  csv: utf-8-sig 헤더 한 번 + 이어쓰기 / parquet: row group 단위 / xlsx: openpyxl write-only (시트당 최대 행 넘으면 새 시트)
+- ExportJob: 백그라운드 스레드에서 write_report 실행, 진행률/오류를 속성으로 노출
+  (numpy/pyarrow/파일 쓰기는 GIL 을 자주 놓으므로 다른 세션 rerun 을 막지 않음)
+
+    python -m tariff export -o report.parquet [--prefix 8486] [--years 2024 2025]
+"""
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from .bom import _agreement_lists
+from .rate_matrix import RateMatrix
+from .schema import HS_WIDTH, hs_str
+
+FORMATS = ["csv", "xlsx", "parquet"]
+REPORT_COLS = ["품목번호", "이름", "연도", "국가", "최저 관세율(%)", "적용 협정", "적용 가능 협정"]
+CHUNK_HS = 256              # chunk 하나에 담을 HS 코드 수 (행 수 ≈ CHUNK_HS × 연도 × 국가)
+EXCEL_MAX_ROWS = 1_048_575  # 시트당 최대 행 (헤더 제외)
+
+
+def fmt_of(path: Path) -> str:
+    """확장자 → 형식 (.xlsx / .parquet / 나머지는 csv)"""
+    suffix = Path(path).suffix.lower().lstrip(".")
+    return suffix if suffix in FORMATS else "csv"
+
+
+def hs_slice(codes: np.ndarray, prefix: str = "") -> tuple[int, int]:
+    """정렬된 품목번호 배열에서 접두어에 해당하는 [lo, hi) 구간"""
+    prefix = str(prefix).strip()[:HS_WIDTH]
+    if not prefix:
+        return 0, len(codes)
+    lo = int(prefix.ljust(HS_WIDTH, "0"))
+    hi = int(prefix.ljust(HS_WIDTH, "9"))
+    return int(np.searchsorted(codes, lo, "left")), int(np.searchsorted(codes, hi, "right"))
+
+
+def _axes(rate_mx: RateMatrix, prefix: str = "", years: list[int] | None = None,
+          countries: list[str] | None = None) -> tuple[int, int, np.ndarray, np.ndarray]:
+    """HS [lo, hi) 구간 + 고른 연도/국가의 축 위치 (없는 연도/국가는 빠짐)"""
+    lo, hi = hs_slice(rate_mx.codes, prefix)
+    y_ids = np.flatnonzero(np.isin(rate_mx.years, years)) if years else np.arange(len(rate_mx.years))
+    if countries:
+        c_ids = pd.Index(rate_mx.countries).get_indexer(list(countries))
+        c_ids = c_ids[c_ids >= 0]
+    else:
+        c_ids = np.arange(len(rate_mx.countries))
+    return lo, hi, y_ids, c_ids
+
+
+def count_rows(rate_mx: RateMatrix, prefix: str = "", years: list[int] | None = None,
+               countries: list[str] | None = None, chunk_hs: int = CHUNK_HS) -> int:
+    """내보낼 행 수 (최저세율이 있는 칸 수) — 프레임을 만들지 않고 셈"""
+    lo, hi, y_ids, c_ids = _axes(rate_mx, prefix, years, countries)
+    return sum(int(np.count_nonzero(~np.isnan(rate_mx.min_rate[s:min(s + chunk_hs, hi)][:, y_ids][:, :, c_ids])))
+               for s in range(lo, hi, chunk_hs))
+
+
+def iter_report(rate_mx: RateMatrix, prefix: str = "", years: list[int] | None = None,
+                countries: list[str] | None = None, names: dict | None = None,
+                chunk_hs: int = CHUNK_HS) -> Iterator[pd.DataFrame]:
+    """
+    HS chunk 단위 긴 형태 보고서 (품목번호, 이름, 연도, 국가, 최저 관세율, 적용 협정, 적용 가능 협정)
+    - prefix: 류/호/소호 등 HS 접두어 (빈 값이면 전체) / years, countries: 없으면 전체
+    - 최저 관세율이 없는 (HS, 연도, 국가) 칸은 건너뜀
+    """
+    lo, hi, y_ids, c_ids = _axes(rate_mx, prefix, years, countries)
+    if hi <= lo or len(y_ids) == 0 or len(c_ids) == 0:
+        return
+    cty_names = np.asarray(rate_mx.countries, dtype=object)
+    agreements = rate_mx.agreements
+    names = names or {}
+
+    for start in range(lo, hi, chunk_hs):
+        stop = min(start + chunk_hs, hi)
+        rate = rate_mx.min_rate[start:stop][:, y_ids][:, :, c_ids]
+        h, y, c = np.nonzero(~np.isnan(rate))
+        if len(h) == 0:
+            continue
+        hs_pos = start + h
+        best = rate_mx.best[hs_pos, y_ids[y], c_ids[c]]
+        codes = rate_mx.codes[hs_pos]
+        yield pd.DataFrame({
+            "품목번호": hs_str(pd.Series(codes, dtype="int64")).to_numpy(),
+            "이름": [names.get(k) for k in codes.tolist()],
+            "연도": rate_mx.years[y_ids[y]],
+            "국가": cty_names[c_ids[c]],
+            "최저 관세율(%)": RateMatrix._rates(rate[h, y, c]),
+            "적용 협정": np.where(best >= 0, agreements[np.maximum(best, 0)], None),
+            "적용 가능 협정": _agreement_lists(rate_mx.mask[hs_pos, y_ids[y], c_ids[c]], agreements),
+        }, columns=REPORT_COLS)
+
+
+# =========================================
+# 파일 쓰기
+# =========================================
+def _write_csv(chunks, path: Path, on_chunk) -> None:
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        f.write(",".join(REPORT_COLS) + "\n")  # 결과가 비어도 헤더는 남김
+        for df in chunks:
+            df.to_csv(f, header=False, index=False)
+            on_chunk(len(df))
+
+
+def _write_parquet(chunks, path: Path, on_chunk) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([("품목번호", pa.string()), ("이름", pa.string()), ("연도", pa.int16()),
+                        ("국가", pa.string()), ("최저 관세율(%)", pa.float64()),
+                        ("적용 협정", pa.string()), ("적용 가능 협정", pa.string())])
+    with pq.ParquetWriter(str(path), schema, compression="zstd") as writer:
+        for df in chunks:
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            on_chunk(len(df))
+
+
+def _write_xlsx(chunks, path: Path, on_chunk) -> None:
+    try:
+        from openpyxl import Workbook
+    except ImportError as e:
+        raise ImportError("Excel 로 저장하려면 openpyxl 이 필요합니다 (pip install openpyxl)") from e
+
+    wb = Workbook(write_only=True)  # 행을 바로 디스크 쪽 XML 로 흘려 보냄
+    ws, n = None, EXCEL_MAX_ROWS
+    for df in chunks:
+        for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+            if n >= EXCEL_MAX_ROWS:
+                ws = wb.create_sheet(f"관세율{len(wb.worksheets) + 1}")
+                ws.append(REPORT_COLS)
+                n = 0
+            ws.append(row)
+            n += 1
+        on_chunk(len(df))
+    if ws is None:
+        wb.create_sheet("관세율").append(REPORT_COLS)
+    wb.save(str(path))
+
+
+WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def write_report(chunks, path: Path, fmt: str | None = None, on_chunk=None) -> int:
+    """chunk 를 받는 대로 path 에 기록 (tmp 파일에 쓴 뒤 교체). 기록한 행 수 반환"""
+    path = Path(path)
+    fmt = fmt or fmt_of(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} ({', '.join(FORMATS)})")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+
+    def count(n: int) -> None:
+        nonlocal rows
+        rows += n
+        if on_chunk is not None:
+            on_chunk(rows)
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        WRITERS[fmt](chunks, tmp, count)
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return rows
+
+
+class ExportJob:
+    """
+    백그라운드 내보내기 — start() 후 rows / done / error / seconds 를 읽어 진행 상황 표시
+    (예상 행 수 total 은 최저세율이 있는 칸만 세므로 정확한 최종 행 수)
+    """
+
+    def __init__(self, rate_mx: RateMatrix, path: Path, fmt: str | None = None, name: str = "", **report_kw):
+        """name: 사용자에게 보여 줄 파일 이름 (기본: path 이름) / report_kw: iter_report 인자"""
+        self.path = Path(path)
+        self.fmt = fmt or fmt_of(self.path)
+        self.name = name or self.path.name
+        self.rows = 0
+        self.total = count_rows(rate_mx, **{k: v for k, v in report_kw.items() if k != "names"})
+        self.error: Exception | None = None
+        self.seconds = 0.0
+        self._chunks = iter_report(rate_mx, **report_kw)
+        self._thread = threading.Thread(target=self._run, name="tariff-export", daemon=True)
+
+    def _run(self) -> None:
+        t = time.perf_counter()
+        try:
+            write_report(self._chunks, self.path, self.fmt, on_chunk=self._progress)
+        except Exception as e:  # 세션 쪽에서 표시
+            self.error = e
+        finally:
+            self.seconds = time.perf_counter() - t
+
+    def _progress(self, rows: int) -> None:
+        self.rows = rows
+
+    def start(self) -> "ExportJob":
+        self._thread.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._thread.ident is not None and not self._thread.is_alive()
+
+    @property
+    def progress(self) -> float:
+        return 1.0 if self.done else (self.rows / self.total if self.total else 0.0)
+
@@ -0,0 +1,104 @@
+"""
+HS 그룹 비교 히트맵용 행렬 — 데이터 버전당 한 번 피벗해 둔 조밀 (HS × 연도) NumPy 배열
+
+- RateGrid(rate_mx, cube): 지표별 (HS × 연도) float32 행렬
+  최저 관세율: RateMatrix 의 국가 축 최저값 / 기본세율: 큐브 세번 단위의 관세율구분 A 최저값 /
+  특혜 국가 비율: 공통 최저세율(적용국가구분=1 — 기본·WTO 등 모든 국가에 적용)보다
+  낮은 국가 지정 세율을 받는 국가 비율(%) — WTO 인하처럼 모두에게 적용되는 세율은 특혜로 세지 않음
+- select(level, key): 류/호/소호/소분류/대분류 그룹에 속한 HS 행 위치 (큐브의 hs_labels 와 같은 기준)
+- view(rows, metric, max_rows): 행이 max_rows 보다 많으면 연속한 HS 를 묶어 평균 (서버 쪽 다운샘플링)
+  → 브라우저로는 최대 max_rows × 연도 칸만 보냄, rerun 마다 원본 프레임을 다시 피벗하지 않음
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from .cube import TariffCube
+from .rate_matrix import RateMatrix
+from .schema import hs_str
+
+MIN_RATE, BASIC_RATE, PREF_SHARE = "최저 관세율(%)", "기본세율(%)", "특혜 국가 비율(%)"
+METRICS = [MIN_RATE, BASIC_RATE, PREF_SHARE]
+GRID_LEVELS = ["류", "호", "소호", "소분류", "대분류"]
+BASIC_KIND = "A"  # 관세율구분: 기본세율
+MAX_ROWS = 400    # 히트맵 한 장에 그릴 최대 행 수 (넘으면 묶음 평균)
+
+
+class RateGrid:
+    def __init__(self, rate_mx: RateMatrix, cube: TariffCube, names: dict | None = None):
+        self.codes = rate_mx.codes
+        self.years = rate_mx.years
+        self.hs = hs_str(pd.Series(self.codes, dtype="int64")).to_numpy()
+        H, Y, C = rate_mx.min_rate.shape
+        names = names or {}
+        self.names = np.asarray([names.get(k) for k in self.codes.tolist()], dtype=object)
+        # HS 행별 그룹 키 (큐브와 같은 기준, 없으면 None)
+        labels = cube.hs_labels.reindex(self.hs) if not cube.hs_labels.empty else pd.DataFrame(index=self.hs)
+        self.labels = {lv: labels[lv].to_numpy(dtype=object) for lv in GRID_LEVELS if lv in labels.columns}
+        self.levels = list(self.labels)
+
+        min_rate = np.fmin.reduce(rate_mx.min_rate, axis=2) if C else np.full((H, Y), np.nan, np.float32)
+        basic = self._basic(cube, H, Y)
+        common = rate_mx.base_rate
+        with np.errstate(invalid="ignore"):
+            pref = (rate_mx.min_rate < common[:, :, None]).sum(axis=2)  # NaN 비교는 False
+            share = np.where(np.isnan(common) | (C == 0), np.nan, pref * 100.0 / max(C, 1))
+        self.values = {
+            MIN_RATE: RateMatrix._rates(min_rate).astype(np.float32),
+            BASIC_RATE: RateMatrix._rates(basic).astype(np.float32),
+            PREF_SHARE: np.round(share, 1).astype(np.float32),
+        }
+
+    def _basic(self, cube: TariffCube, H: int, Y: int) -> np.ndarray:
+        """(HS × 연도) 기본세율 — 큐브 세번 테이블에서 관세율구분 A 의 최저값을 자리에 채움"""
+        out = np.full((H, Y), np.nan, dtype=np.float32)
+        tbl = cube.tables.get("세번")
+        if tbl is None or tbl.empty or BASIC_KIND not in tbl.index.get_level_values("관세율구분"):
+            return out
+        sub = tbl.xs(BASIC_KIND, level="관세율구분")["min"]
+        keys = sub.index.get_level_values("key").astype("int64").to_numpy()
+        years = sub.index.get_level_values("연도").to_numpy()
+        h = np.searchsorted(self.codes, keys)
+        y = np.searchsorted(self.years, years)
+        ok = (h < H) & (y < Y)
+        ok[ok] = (self.codes[h[ok]] == keys[ok]) & (self.years[y[ok]] == years[ok])
+        out[h[ok], y[ok]] = sub.to_numpy()[ok]
+        return out
+
+    # =========================================
+    # 조회
+    # =========================================
+    def key_for(self, level: str, hs) -> str | None:
+        """선택 HS 가 속한 level 의 그룹 키"""
+        i = np.searchsorted(self.hs, hs_str(hs)) if hs else len(self.hs)
+        if i >= len(self.hs) or self.hs[i] != hs_str(hs) or level not in self.labels:
+            return None
+        key = self.labels[level][i]
+        return None if pd.isna(key) else key
+
+    def select(self, level: str, key) -> np.ndarray:
+        """그룹에 속한 HS 행 위치 (품목번호 순)"""
+        if level not in self.labels or key is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.labels[level] == key)
+
+    def view(self, rows: np.ndarray, metric: str, max_rows: int = MAX_ROWS) -> tuple[np.ndarray, list[str], int]:
+        """
+        표시용 (z, 행 라벨, 묶음 크기) — 행이 max_rows 보다 많으면 연속한 HS step 개씩 NaN 제외 평균
+        (묶음 라벨은 '첫 코드 ~ 마지막 코드')
+        """
+        z = self.values[metric][rows]
+        step = max(1, math.ceil(len(rows) / max_rows))
+        if step == 1:
+            labels = [f"{c} {n}" if n else c for c, n in zip(self.hs[rows], self.names[rows])]
+            return z, labels, 1
+        starts = np.arange(0, len(rows), step)
+        ok = ~np.isnan(z)
+        total = np.add.reduceat(np.where(ok, z, 0.0), starts, axis=0)
+        count = np.add.reduceat(ok.astype(np.int64), starts, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = np.where(count > 0, total / count, np.nan).astype(np.float32)
+        ends = np.minimum(starts + step, len(rows)) - 1
+        labels = [f"{self.hs[rows[a]]} ~ {self.hs[rows[b]]}" for a, b in zip(starts, ends)]
+        return z, labels, step
@@ -0,0 +1,88 @@
+"""
+품목번호(HS) → 연도별 행 구간 인덱스
+
+전체 프레임을 (품목번호, 연도) 순으로 안정 정렬한 행 순서(order)와
+HS 별 시작/끝 위치만 들고 있다가, 조회 시 해당 구간만 take 한다.
+→ 조회 비용이 전체 행 수가 아니라 그 HS 의 행 수에 비례
+대표 품목명은 품목 차원 테이블(items.py)이 있으면 거기서, 없으면 프레임의 품목 컬럼에서 찾는다.
+"""
+import numpy as np
+import pandas as pd
+
+from .items import representative
+from .schema import hs_key
+
+# 대표 품목명을 찾을 컬럼 우선순위
+ITEM_NAME_COLS = ["품명", "품목명", "이름", "소분류", "대분류"]
+
+
+class HsIndex:
+    def __init__(self, df: pd.DataFrame, items: pd.DataFrame | None = None):
+        self.df = df
+        self.items = items
+        if df.empty or "품목번호" not in df.columns:
+            self.order = np.empty(0, dtype=np.int64)
+            self.codes = np.empty(0, dtype=np.int64)
+            self.starts = self.ends = np.empty(0, dtype=np.int64)
+            self.years_sorted = np.empty(0, dtype=np.int16)
+            self.names = {}
+            return
+
+        hs = df["품목번호"].to_numpy()
+        years = df["연도"].to_numpy() if "연도" in df.columns else np.zeros(len(df), dtype=np.int16)
+        # lexsort 는 안정 정렬 → 같은 HS/연도 안에서는 원본 파일 순서 유지
+        self.order = np.lexsort((years, hs))
+        hs_sorted = hs[self.order]
+        self.years_sorted = years[self.order]
+        self.codes, self.starts = np.unique(hs_sorted, return_index=True)
+        self.ends = np.append(self.starts[1:], len(hs_sorted))
+        self.names = self._item_names()
+
+    def _item_names(self) -> dict:
+        """HS 별 대표 품목명: 우선순위 컬럼에서 처음 나오는 비어있지 않은 값"""
+        if self.items is not None:
+            rep = representative(self.items, ITEM_NAME_COLS)
+        else:
+            cols = [c for c in ITEM_NAME_COLS if c in self.df.columns]
+            rep = representative(self.df[cols + ["품목번호"]].take(self.order), cols) if cols else None
+        if rep is None or rep.empty:
+            return {}
+        names = None
+        for c in rep.columns:
+            first = rep[c].astype(object)
+            names = first if names is None else names.fillna(first)
+        return names.dropna().to_dict()
+
+    def __contains__(self, hs) -> bool:
+        lo, hi = self.bounds(hs)
+        return hi > lo
+
+    def bounds(self, hs, year: int | None = None) -> tuple[int, int]:
+        """order 배열 상의 [lo, hi) 구간 (없으면 (0, 0))"""
+        try:
+            key = hs_key(hs)
+        except (TypeError, ValueError):
+            return 0, 0
+        i = np.searchsorted(self.codes, key)
+        if i >= len(self.codes) or self.codes[i] != key:
+            return 0, 0
+        lo, hi = int(self.starts[i]), int(self.ends[i])
+        if year is not None:
+            yrs = self.years_sorted[lo:hi]
+            lo, hi = lo + int(np.searchsorted(yrs, year, "left")), lo + int(np.searchsorted(yrs, year, "right"))
+        return lo, hi
+
+    def rows(self, hs, year: int | None = None) -> pd.DataFrame:
+        """해당 HS(및 연도)의 행만 원본 순서대로 반환"""
+        lo, hi = self.bounds(hs, year)
+        return self.df.take(self.order[lo:hi])
+
+    def years(self, hs) -> list[int]:
+        lo, hi = self.bounds(hs)
+        return sorted(set(self.years_sorted[lo:hi].tolist()))
+
+    def item_name(self, hs) -> str | None:
+        try:
+            return self.names.get(hs_key(hs))
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,50 @@
+"""
+품목 차원(dimension) 테이블 — 품목번호 → 이름/대분류/소분류/결정세번
+
+`*_with_info.csv` 는 관세율 행마다 품목 정보를 반복하고, 결정세번이 여러 개인 HS 는
+관세율 행 자체가 결정세번 수만큼 중복된다. 그래서
+- 관세율(fact) 테이블: 품목 정보 없이 (HS, 연도, 관세율구분, 국가 …) 한 행씩
+- 품목(dimension) 테이블: (품목번호, 결정세번, 이름, 대분류, 소분류) 중복 제거
+로 나눠 두고, 품목 정보가 필요할 때만 join 한다.
+"""
+import pandas as pd
+
+from .schema import concat_typed
+
+# 품목 차원 컬럼 (품목번호 제외)
+ITEM_COLS = ["결정세번", "결정세번 다름", "이름", "대분류", "소분류"]
+# HS 별 대표값으로 fact 에 붙일 수 있는 속성
+ITEM_ATTRS = ["이름", "대분류", "소분류"]
+
+
+def split_items(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """with_info 프레임 → (중복 없는 관세율 fact, 품목 차원)"""
+    dims = [c for c in ITEM_COLS if c in df.columns]
+    if not dims or "품목번호" not in df.columns:
+        return df, pd.DataFrame(columns=["품목번호"])
+    items = df[["품목번호"] + dims].drop_duplicates(ignore_index=True)
+    facts = df.drop(columns=dims).drop_duplicates(ignore_index=True)
+    return facts, items
+
+
+def item_table(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    """연도별 품목 차원 합치기 — 연도 순서대로 처음 나온 행을 남김 (연도 컬럼은 버림)"""
+    items = concat_typed([d.drop(columns=["연도"], errors="ignore") for d in dfs if d is not None])
+    if items.empty:
+        return pd.DataFrame(columns=["품목번호"])
+    return items.drop_duplicates(ignore_index=True)
+
+
+def representative(items: pd.DataFrame, cols: list[str] | None = None) -> pd.DataFrame:
+    """HS 별 대표 속성 1행 (각 컬럼에서 처음 나오는 비어있지 않은 값) — index: 품목번호"""
+    cols = [c for c in (cols or ITEM_ATTRS) if c in items.columns]
+    if items.empty or not cols:
+        return pd.DataFrame(columns=cols, index=pd.Index([], name="품목번호"))
+    return items.groupby("품목번호", observed=True, sort=True)[cols].first()
+
+
+def join_items(df: pd.DataFrame, items: pd.DataFrame, cols: list[str] | None = None) -> pd.DataFrame:
+    """fact 행에 HS 별 대표 품목 속성을 붙임 (행 수는 그대로 — 결정세번 중복 없음)"""
+    rep = representative(items, cols)
+    out = df.drop(columns=[c for c in rep.columns if c in df.columns])
+    return out.join(rep, on="품목번호")
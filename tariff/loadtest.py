@@ -0,0 +1,350 @@
+"""
+동시 세션 부하 테스트 — 실제 `streamlit run` 서버 하나에 브라우저 세션 N 개를 흉내 내 접속
+
+    python -m tariff loadtest                          # 1, 5, 10, 20 세션 × 20 동작
+    python -m tariff loadtest --sessions 50 --steps 40 --think 0.5
+
+- 서버: headless streamlit 프로세스 하나 (운영과 같은 캐시/스레드 구조, 세션 수 단계마다 새로 띄움)
+- 세션: websocket 클라이언트 (streamlit 이 의존하는 tornado 사용) — 브라우저처럼 BackMsg(rerun_script) 를 보내고
+  ForwardMsg(script_finished) 가 올 때까지를 rerun 지연으로 잼
+  (AppTest 는 프로세스 전역 런타임을 바꿔 끼우므로 한 프로세스에서 여러 세션을 동시에 돌릴 수 없음)
+- 시나리오: HS 접두어 입력 / 페이지 전환 / 국가 선택 — 위젯은 label 로 찾고,
+  fragment 안의 위젯은 브라우저와 같이 그 fragment 만 다시 실행하도록 요청
+- 결과: 처리량(rerun/s), p50/p95/p99 지연, 오류 수, 서버 RSS 증가량(세션당) → bench/loadtest.jsonl 에 누적
+"""
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from .bench import BENCH_DIR, _stats, git_rev
+from .config import HS_PATH, ROOT_DIR
+from .snapshot import read_csv_safe
+
+APP_PATH = ROOT_DIR / "streamlit_app.py"
+RESULTS_PATH = BENCH_DIR / "loadtest.jsonl"
+
+# 동작 → 가중치 (국가 선택은 국가 선택 박스가 있는 조회 페이지에서만, 없으면 조회 페이지로 이동)
+ACTIONS = {"prefix": 0.3, "page": 0.3, "country": 0.4}
+PREFIX_LABEL = "HS 코드 검색"
+PAGE_LABEL = "페이지"
+COUNTRY_LABEL = "국가 선택"
+LOOKUP_PAGE = "수입 관세율 조회"
+STARTUP_TIMEOUT = 120  # 서버가 health 응답을 줄 때까지 기다리는 최대 시간(초)
+RERUN_TIMEOUT = 300    # rerun 하나가 끝날 때까지 기다리는 최대 시간(초)
+
+
+def hs_prefixes(hs_path: Path = HS_PATH) -> list[str]:
+    """사용자가 칠 법한 접두어 (HS 목록의 류 2 / 호 4 / 소호 6 단위)"""
+    df = read_csv_safe(hs_path, dtype=str)
+    codes = df.iloc[:, 0].dropna().str.strip()
+    return sorted({c[:w] for c in codes for w in (2, 4, 6) if len(c) >= w})
+
+
+def _prefer_installed_streamlit() -> None:
+    """
+    레포 루트를 sys.path 맨 뒤로 — 루트에서 `python -m tariff` 로 실행해도
+    루트의 streamlit.py 대신 설치된 streamlit 패키지(proto/tornado 클라이언트)를 import
+    """
+    root = ROOT_DIR.resolve()
+    rest = [p for p in sys.path if Path(p or ".").resolve() != root]
+    sys.path[:] = rest + [str(root)]
+
+
+# =========================================
+# 서버
+# =========================================
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app: Path, port: int) -> subprocess.Popen:
+    """
+    headless streamlit 서버 시작 (레포 루트의 streamlit.py 가 패키지를 가리지 않도록 임시 디렉터리에서 실행)
+    """
+    cmd = [sys.executable, "-m", "streamlit", "run", str(Path(app).resolve()),
+           "--server.headless", "true", "--server.port", str(port), "--server.address", "127.0.0.1",
+           "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"]
+    return subprocess.Popen(cmd, cwd=tempfile.gettempdir(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def wait_healthy(port: int, proc: subprocess.Popen, timeout: float = STARTUP_TIMEOUT) -> None:
+    from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+
+    client = AsyncHTTPClient()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit 서버가 종료되었습니다 (exit {proc.returncode})")
+        try:
+            r = await client.fetch(f"http://127.0.0.1:{port}/_stcore/health", request_timeout=2)
+            if r.body.strip() == b"ok":
+                return
+        except (HTTPClientError, OSError):
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError(f"{timeout:.0f}초 안에 streamlit 서버가 뜨지 않았습니다")
+
+
+def server_rss_mb(pid: int) -> float | None:
+    """서버 프로세스 RSS (리눅스 /proc 기준, 그 외 플랫폼은 None)"""
+    try:
+        with open(f"/proc/{pid}/status") as fp:
+            for line in fp:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+# =========================================
+# 세션 (브라우저 흉내)
+# =========================================
+class Session:
+    def __init__(self, port: int, rng: random.Random, prefixes: list[str], think: float = 0.0):
+        self.port = port
+        self.rng = rng
+        self.prefixes = prefixes
+        self.think = think
+        self.samples: list[tuple[str, float]] = []  # (동작, 초)
+        self.errors = 0
+        self._ws = None
+        self._states = {}   # 위젯 id → WidgetState (브라우저처럼 매 rerun 전부 보냄)
+        self._widgets = {}  # label → (요소 종류, 위젯 proto, fragment id) — 직전 화면 기준
+        self._cache = {}    # ForwardMsg hash → 메시지 (서버가 참조(ref_hash)만 보낼 때 사용)
+
+    async def connect(self) -> float:
+        from tornado.websocket import websocket_connect
+
+        self._ws = await websocket_connect(f"ws://127.0.0.1:{self.port}/_stcore/stream",
+                                           max_message_size=256 * 2**20)
+        return await self._rerun("connect")
+
+    def close(self) -> None:
+        if self._ws is not None:
+            self._ws.close()
+
+    async def _resolve(self, fwd):
+        """ref_hash 만 온 메시지 → 이전에 받은 본문 (없으면 HTTP 로 받아옴)"""
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from tornado.httpclient import AsyncHTTPClient
+
+        if fwd.WhichOneof("type") != "ref_hash":
+            if fwd.hash:
+                self._cache[fwd.hash] = fwd
+            return fwd
+        cached = self._cache.get(fwd.ref_hash)
+        if cached is None:
+            r = await AsyncHTTPClient().fetch(f"http://127.0.0.1:{self.port}/_stcore/message?hash={fwd.ref_hash}")
+            cached = ForwardMsg()
+            cached.ParseFromString(r.body)
+            self._cache[fwd.ref_hash] = cached
+        out = type(fwd)()
+        out.CopyFrom(cached)
+        out.metadata.CopyFrom(fwd.metadata)
+        return out
+
+    def _on_delta(self, delta) -> None:
+        if delta.WhichOneof("type") != "new_element":
+            return
+        el = delta.new_element
+        kind = el.WhichOneof("type")
+        if kind == "exception":
+            self.errors += 1
+            return
+        proto = getattr(el, kind)
+        if hasattr(proto, "id") and hasattr(proto, "label") and proto.id:
+            self._widgets[proto.label] = (kind, proto, delta.fragment_id)
+
+    async def _rerun(self, action: str, fragment_id: str = "") -> float:
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(self._states.values())
+        if not fragment_id:
+            self._widgets = {}  # 전체 rerun 이면 화면을 새로 받음
+        t = time.perf_counter()
+        await self._ws.write_message(msg.SerializeToString(), binary=True)
+        while True:
+            raw = await asyncio.wait_for(self._ws.read_message(), RERUN_TIMEOUT)
+            if raw is None:
+                raise ConnectionError("streamlit 서버와 연결이 끊어졌습니다")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            fwd = await self._resolve(fwd)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta":
+                self._on_delta(fwd.delta)
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    self.errors += 1
+                elif fwd.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                dt = time.perf_counter() - t
+                self.samples.append((action, dt))
+                return dt
+
+    async def _set(self, label: str, value, action: str) -> bool:
+        """label 위젯 값을 바꾸고 rerun (selectbox/radio 는 옵션 문자열 → 위치). 위젯이 없으면 False"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        found = self._widgets.get(label)
+        if found is None:
+            return False
+        kind, proto, fragment_id = found
+        state = WidgetState(id=proto.id)
+        if kind in ("selectbox", "radio"):
+            options = list(proto.options)
+            if value not in options:
+                return False
+            state.int_value = options.index(value)
+        else:
+            state.string_value = str(value)
+        self._states[proto.id] = state
+        await self._rerun(action, fragment_id)
+        return True
+
+    def _options(self, label: str) -> list[str]:
+        found = self._widgets.get(label)
+        return list(found[1].options) if found is not None else []
+
+    async def step(self) -> None:
+        """가중치에 따라 동작 하나"""
+        action = self.rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+        if action == "country":
+            countries = self._options(COUNTRY_LABEL)
+            if countries:
+                await self._set(COUNTRY_LABEL, self.rng.choice(countries), "country")
+            else:  # 국가 선택 박스가 없는 페이지 → 조회 페이지로
+                await self._set(PAGE_LABEL, LOOKUP_PAGE, "page")
+        elif action == "prefix":
+            await self._set(PREFIX_LABEL, self.rng.choice(self.prefixes), "prefix")
+        else:
+            pages = [p for p in self._options(PAGE_LABEL) if "예정" not in p]
+            if pages:
+                await self._set(PAGE_LABEL, self.rng.choice(pages), "page")
+
+    async def run(self, steps: int) -> None:
+        for _ in range(steps):
+            if self.think:
+                await asyncio.sleep(self.rng.uniform(0, 2 * self.think))
+            await self.step()
+
+
+# =========================================
+# 실행
+# =========================================
+async def _visit_all(port: int, prefixes: list[str]) -> None:
+    """측정 전에 모든 페이지를 한 번씩 열어 프로세스 캐시를 채움 (첫 로딩 비용은 결과에서 제외)"""
+    s = Session(port, random.Random(0), prefixes)
+    await s.connect()
+    for page in [p for p in s._options(PAGE_LABEL) if "예정" not in p]:
+        await s._set(PAGE_LABEL, page, "page")
+    await s._set(PAGE_LABEL, LOOKUP_PAGE, "page")
+    s.close()
+
+
+async def _run_level(port: int, pid: int, n: int, steps: int, think: float, prefixes: list[str],
+                     seed: int) -> dict:
+    await _visit_all(port, prefixes)
+    rss_base = server_rss_mb(pid)
+    rss_peak = rss_base
+    sessions = [Session(port, random.Random(seed + i), prefixes, think) for i in range(n)]
+
+    async def sample_rss():
+        nonlocal rss_peak
+        while True:
+            cur = server_rss_mb(pid)
+            if cur is not None and (rss_peak is None or cur > rss_peak):
+                rss_peak = cur
+            await asyncio.sleep(0.2)
+
+    sampler = asyncio.ensure_future(sample_rss())
+    t = time.perf_counter()
+    try:
+        await asyncio.gather(*(s.connect() for s in sessions))
+        await asyncio.gather(*(s.run(steps) for s in sessions))
+    finally:
+        wall = time.perf_counter() - t
+        sampler.cancel()
+        for s in sessions:
+            s.close()
+    rss_end = server_rss_mb(pid)
+
+    samples = [dt for s in sessions for _, dt in s.samples]
+    by_action = {}
+    for s in sessions:
+        for action, dt in s.samples:
+            by_action.setdefault(action, []).append(dt)
+    grow = None if rss_base is None or rss_end is None else round(rss_end - rss_base, 1)
+    return {
+        "sessions": n,
+        "reruns": len(samples),
+        "errors": sum(s.errors for s in sessions),
+        "wall_s": round(wall, 3),
+        "rerun_per_s": round(len(samples) / wall, 2) if wall else None,
+        **{k: v for k, v in _stats(samples).items() if k != "n"},
+        "rss_base_mb": rss_base,
+        "rss_peak_mb": rss_peak,
+        "rss_growth_mb": grow,
+        "rss_per_session_mb": None if grow is None else round(grow / n, 2),
+        "actions": {a: _stats(v) for a, v in sorted(by_action.items())},
+    }
+
+
+def run_level(n: int, steps: int = 20, think: float = 0.0, app: Path = APP_PATH, seed: int = 0) -> dict:
+    """새 서버를 띄워 세션 n 개를 동시에 돌리고 결과 한 줄 반환"""
+    _prefer_installed_streamlit()
+    port = free_port()
+    proc = start_server(app, port)
+    try:
+        async def main():
+            await wait_healthy(port, proc)
+            return await _run_level(port, proc.pid, n, steps, think, hs_prefixes(), seed)
+        return asyncio.run(main())
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def run(levels: list[int], steps: int = 20, think: float = 0.0, app: Path = APP_PATH,
+        out: Path = RESULTS_PATH) -> list[dict]:
+    """세션 수 단계별로 측정해 표로 출력하고 jsonl 에 누적"""
+    records = []
+    for n in levels:
+        rec = {"ts": datetime.now().isoformat(timespec="seconds"), "rev": git_rev(),
+               "steps": steps, "think_s": think, **run_level(n, steps, think, app)}
+        records.append(rec)
+        print(f"세션 {n:>4}: rerun {rec['reruns']:,}회 / {rec['rerun_per_s']} rerun/s / "
+              f"p50 {rec['p50_ms']:.0f} ms / p95 {rec['p95_ms']:.0f} ms / p99 {rec['p99_ms']:.0f} ms / "
+              f"오류 {rec['errors']}", flush=True)
+
+    cols = ["sessions", "reruns", "errors", "rerun_per_s", "p50_ms", "p95_ms", "p99_ms", "mean_ms",
+            "rss_base_mb", "rss_peak_mb", "rss_per_session_mb"]
+    pd.set_option("display.width", 200)
+    print()
+    print(pd.DataFrame(records)[cols].to_string(index=False))
+
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "a", encoding="utf-8") as fp:
+        for rec in records:
+            fp.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    return records
@@ -0,0 +1,114 @@
+"""
+품목명 검색 인덱스 — 이름/소분류/대분류 문자 n-gram 역색인 (띄어쓰기 없는 한국어 품목명용)
+
+- 정규화: NFKC + 소문자 + 글자/숫자 외 제거 ("포토 레지스트" == "포토레지스트", 영문 병기도 검색)
+- 토큰: 글자 2-gram (한 글자 질의는 1-gram) — 형태소 분석 없이 부분 문자열 검색
+- 역색인은 행이 아니라 서로 다른 문자열(카테고리) 단위: n-gram → 카테고리 번호 배열
+  질의 한 번 = n-gram 몇 개의 posting 에 가중치를 더하고, 카테고리 점수를 코드 배열로 행에 펼친 뒤 HS 별 최고 점수 줄
+  → 품목 수가 늘어도 파이썬 반복은 질의 n-gram 수만큼
+- 점수: 질의 n-gram 중 맞은 비율(idf 가중) × 필드 가중치, 질의 전체가 부분 문자열로 들어 있으면 가산
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from .schema import hs_str
+
+# 필드 → 가중치 (품목명이 분류명보다 우선)
+FIELD_WEIGHTS = {"이름": 1.0, "소분류": 0.6, "대분류": 0.4}
+MIN_COVERAGE = 0.5     # 질의 n-gram 중 이 비율 이상 맞아야 후보
+SUBSTRING_BONUS = 0.5  # 질의 전체가 그대로 들어 있으면 더하는 점수
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_text(s) -> str:
+    """NFKC + 소문자 + 공백/기호 제거"""
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", str(s)).lower())
+
+
+def ngrams(s: str) -> list[str]:
+    """정규화된 문자열의 서로 다른 2-gram (한 글자면 그 글자)"""
+    if len(s) < 2:
+        return [s] if s else []
+    return list(dict.fromkeys(s[i:i + 2] for i in range(len(s) - 1)))
+
+
+class _Field:
+    """한 컬럼의 카테고리별 정규화 문자열 + (n-gram → 카테고리 번호) 역색인 + 행별 카테고리 코드"""
+
+    def __init__(self, values: pd.Series):
+        cat = values.astype("category") if not isinstance(values.dtype, pd.CategoricalDtype) else values
+        self.codes = cat.cat.codes.to_numpy()
+        self.texts = [normalize_text(v) for v in cat.cat.categories]
+        postings: dict[str, list[int]] = {}
+        for i, t in enumerate(self.texts):
+            for g in ngrams(t):
+                postings.setdefault(g, []).append(i)
+            for ch in dict.fromkeys(t):  # 한 글자 질의용
+                postings.setdefault(ch, []).append(i)
+        self.postings = {g: np.asarray(p, dtype=np.int32) for g, p in postings.items()}
+
+    def scores(self, q: str, grams: list[str], weights: np.ndarray) -> np.ndarray:
+        """카테고리별 점수 (맞은 n-gram 가중 비율, 기준 미만은 0, 부분 문자열이면 가산)"""
+        score = np.zeros(len(self.texts), dtype=np.float64)
+        for g, w in zip(grams, weights):
+            p = self.postings.get(g)
+            if p is not None:
+                score[p] += w
+        score /= weights.sum()
+        score[score < MIN_COVERAGE - 1e-9] = 0.0
+        for i in np.flatnonzero(score):
+            if q in self.texts[i]:
+                score[i] += SUBSTRING_BONUS
+        return score
+
+
+class NameIndex:
+    def __init__(self, items: pd.DataFrame):
+        """items: 품목 차원 테이블 (품목번호 + 이름/대분류/소분류 중 있는 컬럼, HS 당 여러 줄 가능)"""
+        fields = [c for c in FIELD_WEIGHTS if c in items.columns]
+        if items.empty or "품목번호" not in items.columns or not fields:
+            items, fields = pd.DataFrame({"품목번호": pd.Series(dtype="int64")}), []
+        self.codes, self._row_hs = np.unique(items["품목번호"].to_numpy(dtype=np.int64), return_inverse=True)
+        self.fields = {c: _Field(items[c]) for c in fields}
+        self.row_names = (items["이름"].astype(object).to_numpy() if "이름" in items.columns
+                          else np.full(len(items), None, dtype=object))
+        # idf 용 문서 빈도 (카테고리 기준, 필드 합산)
+        self._df: dict[str, int] = {}
+        for f in self.fields.values():
+            for g, p in f.postings.items():
+                self._df[g] = self._df.get(g, 0) + len(p)
+        self._n_docs = max(sum(len(f.texts) for f in self.fields.values()), 1)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def search(self, query: str, limit: int = 50) -> pd.DataFrame:
+        """질의 → (품목번호, 이름, 점수) 점수 높은 순 (같으면 품목번호 순, 이름은 HS 안에서 가장 잘 맞은 줄)"""
+        cols = ["품목번호", "이름", "점수"]
+        q = normalize_text(query)
+        grams = ngrams(q)
+        if not grams or not len(self.codes):
+            return pd.DataFrame(columns=cols)
+        weights = np.asarray([np.log1p(self._n_docs / (1 + self._df.get(g, 0))) for g in grams])
+
+        row = np.zeros(len(self._row_hs), dtype=np.float64)
+        for name, f in self.fields.items():
+            cat_score = f.scores(q, grams, weights) * FIELD_WEIGHTS[name]
+            np.maximum(row, np.where(f.codes >= 0, cat_score[np.maximum(f.codes, 0)], 0.0), out=row)
+
+        hit = np.flatnonzero(row > 0)
+        if not len(hit):
+            return pd.DataFrame(columns=cols)
+        # HS 별 최고 점수 줄 하나 → 점수 내림차순, 품목번호 순
+        hit = hit[np.lexsort((-row[hit], self._row_hs[hit]))]
+        hit = hit[np.r_[True, self._row_hs[hit][1:] != self._row_hs[hit][:-1]]]
+        top = hit[np.lexsort((self._row_hs[hit], -row[hit]))][:limit]
+        return pd.DataFrame({
+            "품목번호": hs_str(pd.Series(self.codes[self._row_hs[top]], dtype="int64")).to_numpy(),
+            "이름": self.row_names[top],
+            "점수": np.round(row[top], 3),
+        })
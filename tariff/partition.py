@@ -0,0 +1,172 @@
+"""
+연도 × HS 류(2단위) 파티션 저장소 — pyarrow dataset 으로 조건 푸시다운 조회
+
+    data/.cache/partitions/year=2024/chapter=85/part-0.parquet
+
+- 연도별 fact 스냅샷(snapshot.compile_year)을 류 단위로 나눠 parquet 로 저장 (류 안에서는 품목번호 순)
+- 원본 CSV 지문이 바뀐 연도 디렉터리만 다시 쓰고 통째로 교체 (다른 연도는 그대로)
+- query(hs/prefix, years): 연도·류 파티션은 디렉터리 단위로, 품목번호 범위는 row group 통계로 건너뜀
+  → 조회 비용과 메모리가 전체 품목 수가 아니라 해당 류/연도 크기에 비례
+"""
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .schema import HS_WIDTH
+from .snapshot import SCHEMA_VERSION, compile_year, default_cache_dir, source_signature
+
+MANIFEST_NAME = "manifest.json"
+ROW_GROUP_ROWS = 64 * 1024  # row group 단위 (품목번호 min/max 통계로 건너뛰는 단위)
+
+PARTITIONING = ds.partitioning(pa.schema([("year", pa.int16()), ("chapter", pa.int8())]), flavor="hive")
+PARTITION_COLS = ["year", "chapter"]
+
+
+def hs_range(prefix: str) -> tuple[int, int]:
+    """HS 접두어 → 품목번호 정수 범위 [lo, hi] ('8486' → 8486000000 ~ 8486999999)"""
+    prefix = prefix[:HS_WIDTH]
+    return int(prefix.ljust(HS_WIDTH, "0")), int(prefix.ljust(HS_WIDTH, "9"))
+
+
+class PartitionedStore:
+    def __init__(self, tariff_dir: Path, years: list[int], root: Path | None = None):
+        self.tariff_dir = Path(tariff_dir)
+        self.years = list(years)
+        self.root = Path(root) if root else default_cache_dir(tariff_dir) / "partitions"
+        self._lock = threading.Lock()
+        self._dataset: ds.Dataset | None = None
+
+    # =========================================
+    # 쓰기
+    # =========================================
+    def _manifest(self) -> dict:
+        try:
+            manifest = json.loads((self.root / MANIFEST_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"schema_version": SCHEMA_VERSION, "years": {}}
+        if manifest.get("schema_version") != SCHEMA_VERSION:
+            return {"schema_version": SCHEMA_VERSION, "years": {}}
+        return manifest
+
+    def _save_manifest(self, manifest: dict) -> None:
+        f = self.root / MANIFEST_NAME
+        tmp = f.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, f)
+
+    def _write_year(self, year: int, df: pd.DataFrame) -> None:
+        """한 연도를 임시 디렉터리에 류별로 쓴 뒤 year=YYYY 디렉터리와 교체"""
+        target = self.root / f"year={year}"
+        tmp = self.root / f".year={year}.tmp{os.getpid()}.{threading.get_ident()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        df = df.assign(chapter=(df["품목번호"] // 10 ** (HS_WIDTH - 2)).astype("int8"))
+        df = df.sort_values(["chapter", "품목번호"], kind="stable")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        ds.write_dataset(
+            table, tmp, format="parquet",
+            partitioning=ds.partitioning(pa.schema([("chapter", pa.int8())]), flavor="hive"),
+            max_rows_per_group=ROW_GROUP_ROWS, min_rows_per_group=min(ROW_GROUP_ROWS, len(df)) or None,
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        old = target.with_name(f".year={year}.old{os.getpid()}.{threading.get_ident()}")
+        if target.exists():
+            os.replace(target, old)
+        os.replace(tmp, target)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def sync(self, years: list[int] | None = None) -> list[int]:
+        """
+        원본이 바뀐(또는 처음 보는) 연도만 다시 파티셔닝 — 다시 쓴 연도 목록 반환
+        years 를 주면 그 연도만 확인 (새로 생긴 연도는 저장소 연도 목록에 추가)
+        """
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            manifest = self._manifest()
+            written = []
+            self.years = sorted(set(self.years) | set(years or []))
+            for y in years or self.years:
+                sig = list(source_signature(self.tariff_dir, y))
+                entry = manifest["years"].get(str(y))
+                if not sig:
+                    if entry is not None:  # 원본이 사라진 연도
+                        shutil.rmtree(self.root / f"year={y}", ignore_errors=True)
+                        manifest["years"].pop(str(y))
+                    continue
+                if entry == sig and (self.root / f"year={y}").exists():
+                    continue
+                df = compile_year(self.tariff_dir, y)  # 연도 하나씩만 메모리에 올렸다가 버림
+                if df is None or df.empty or "품목번호" not in df.columns:
+                    continue
+                self._write_year(y, df)
+                manifest["years"][str(y)] = sig
+                written.append(y)
+            self._save_manifest(manifest)
+            self._dataset = None
+            return written
+
+    # =========================================
+    # 조회
+    # =========================================
+    @property
+    def dataset(self) -> ds.Dataset | None:
+        if self._dataset is None:
+            paths = sorted(self.root.glob("year=*/chapter=*/*.parquet"))
+            if paths:
+                self._dataset = ds.dataset([str(p) for p in paths], format="parquet",
+                                           partitioning=PARTITIONING, partition_base_dir=str(self.root))
+        return self._dataset
+
+    @property
+    def columns(self) -> list[str]:
+        d = self.dataset
+        return [] if d is None else [c for c in d.schema.names if c not in PARTITION_COLS]
+
+    def stored_years(self) -> list[int]:
+        return sorted(int(p.name.split("=", 1)[1]) for p in self.root.glob("year=*") if p.is_dir())
+
+    def _filter(self, hs=None, prefix: str = "", years=None, **equals) -> ds.Expression | None:
+        expr = None
+
+        def add(e):
+            nonlocal expr
+            expr = e if expr is None else expr & e
+
+        if years:
+            add(ds.field("year").isin([int(y) for y in years]))
+        prefix = str(hs).strip().zfill(HS_WIDTH) if hs not in (None, "") else str(prefix).strip()
+        if prefix:
+            if len(prefix) >= 2:
+                add(ds.field("chapter") == int(prefix[:2]))
+            lo, hi = hs_range(prefix)
+            add((ds.field("품목번호") >= lo) & (ds.field("품목번호") <= hi))
+        for col, value in equals.items():
+            add(ds.field(col) == value)
+        return expr
+
+    def query(self, hs=None, prefix: str = "", years=None, columns: list[str] | None = None,
+              **equals) -> pd.DataFrame:
+        """
+        조건에 맞는 파티션/row group 만 읽은 프레임 (연도 파일 원래 컬럼/타입 그대로)
+        - hs: 품목번호 하나 / prefix: HS 접두어 / years: 연도 목록 / equals: 컬럼 == 값 (예: 적용국가구분=2)
+        """
+        d = self.dataset
+        if d is None:
+            return pd.DataFrame(columns=columns or [])
+        cols = columns or self.columns
+        # dictionary 컬럼은 파티션별 사전이 합쳐져 category 로 돌아옴
+        return d.to_table(columns=cols, filter=self._filter(hs, prefix, years, **equals)).to_pandas()
+
+    def distinct(self, column: str, years=None, **equals) -> list:
+        """한 컬럼의 서로 다른 값 (그 컬럼만 읽음)"""
+        d = self.dataset
+        if d is None or column not in d.schema.names:
+            return []
+        arr = d.to_table(columns=[column], filter=self._filter(years=years, **equals)).column(column)
+        return [v for v in pc.unique(arr).to_pylist() if v is not None]
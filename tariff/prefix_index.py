@@ -0,0 +1,69 @@
+"""
+HS 코드 접두어 인덱스 (정렬 배열 + bisect)
+
+- 접두어 검색: 정렬된 코드 배열에서 bisect 두 번 → O(log n) + 결과 개수
+- 계층(류 2 / 호 4 / 소호 6 / 세번 10단위)별 하위 그룹과 개수도 같은 방식으로 조회
+"""
+import re
+from bisect import bisect_left
+
+# (이름, 자릿수)
+HS_LEVELS = [("류", 2), ("호", 4), ("소호", 6), ("세번", 10)]
+
+
+def normalize_query(q: str) -> str:
+    """'8486.10', '8486 10' 처럼 입력해도 숫자만 남김"""
+    return re.sub(r"\D", "", q or "")
+
+
+def _prefix_end(prefix: str) -> str:
+    """prefix 로 시작하는 문자열 바로 다음 위치를 가리키는 상한 키"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class HsPrefixIndex:
+    def __init__(self, codes):
+        self.codes = sorted(set(str(c).strip() for c in codes if str(c).strip()))
+        # 계층별: 서로 다른 접두어(정렬) / 그 접두어가 시작하는 codes 상의 위치
+        self.levels = {}
+        for _, width in HS_LEVELS:
+            heads, starts = [], []
+            for i, c in enumerate(self.codes):
+                h = c[:width]
+                if not heads or heads[-1] != h:
+                    heads.append(h)
+                    starts.append(i)
+            starts.append(len(self.codes))
+            self.levels[width] = (heads, starts)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self):
+        return iter(self.codes)
+
+    def bounds(self, prefix: str) -> tuple[int, int]:
+        if not prefix:
+            return 0, len(self.codes)
+        return bisect_left(self.codes, prefix), bisect_left(self.codes, _prefix_end(prefix))
+
+    def count(self, prefix: str) -> int:
+        lo, hi = self.bounds(prefix)
+        return hi - lo
+
+    def match(self, prefix: str, limit: int | None = None) -> list[str]:
+        """prefix 로 시작하는 코드 (정렬 순). limit 을 주면 앞에서부터 그 개수만"""
+        lo, hi = self.bounds(prefix)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return self.codes[lo:hi]
+
+    def level_counts(self, prefix: str, width: int) -> list[tuple[str, int]]:
+        """prefix 아래 width 자리 그룹별 코드 수 — 예: level_counts('84', 4) → [('8486', 30), ...]"""
+        if len(prefix) >= width:
+            n = self.count(prefix)
+            return [(prefix[:width], n)] if n else []
+        heads, starts = self.levels[width]
+        lo = bisect_left(heads, prefix) if prefix else 0
+        hi = bisect_left(heads, _prefix_end(prefix)) if prefix else len(heads)
+        return [(heads[i], starts[i + 1] - starts[i]) for i in range(lo, hi)]
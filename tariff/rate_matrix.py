@@ -0,0 +1,175 @@
+"""
+실효세율 행렬: (HS × 연도 × 국가) → 적용 가능한 관세율구분값 집합 / 최저 관세율
+
+- 적용국가구분=1 행은 (HS, 연도) 단위로 한 번 계산해 모든 국가에 브로드캐스트 (base_rate 로도 보관)
+- 적용국가구분=2 행은 CountryIndex 의 (국가 → 행 위치) 목록을 펼쳐서 ufunc.at 으로 누적
+- 관세율구분값 집합은 비트마스크(uint8 packed)로 저장 → 국가·HS 가 늘어나도 조밀하게 유지
+"""
+import numpy as np
+import pandas as pd
+
+from .country_index import CountryIndex
+from .schema import hs_key, hs_str
+
+# 적용국가구분=1 이지만 특정 원산지에만 해당하는 관세율구분 (U: 북한산, 남북교역 물품)
+# → 모든 국가에 브로드캐스트하면 전 품목 최저세율이 0 이 되므로 행렬에서 제외
+ORIGIN_SPECIFIC_CODES = {"U"}
+
+
+class RateMatrix:
+    def __init__(self, country_index: CountryIndex):
+        hs_idx = country_index.hs_index
+        df = hs_idx.df
+        self.codes = hs_idx.codes
+        self.countries = list(country_index.countries)
+        self.years = np.unique(hs_idx.years_sorted)
+        self._cty_pos = {c: i for i, c in enumerate(self.countries)}
+
+        agr = df["관세율구분값"] if "관세율구분값" in df.columns else pd.Series(dtype="category")
+        if not isinstance(agr.dtype, pd.CategoricalDtype):
+            agr = agr.astype("category")
+        self.agreements = np.asarray(agr.cat.categories, dtype=object)
+
+        H, Y, C, A = len(self.codes), len(self.years), len(self.countries), len(self.agreements)
+        nbytes = max((A + 7) // 8, 1)
+        self.min_rate = np.full((H, Y, C), np.nan, dtype=np.float32)
+        self.best = np.full((H, Y, C), -1, dtype=np.int16)          # 최저세율을 주는 관세율구분값 코드
+        self.mask = np.zeros((H, Y, C, nbytes), dtype=np.uint8)     # 적용 가능한 관세율구분값 비트
+        self.base_rate = np.full((H, Y), np.nan, dtype=np.float32)  # 공통(적용국가구분=1) 최저세율
+        if H == 0 or Y == 0 or df.empty:
+            return
+
+        order = hs_idx.order
+        n = len(order)
+        hs_id = np.repeat(np.arange(H), hs_idx.ends - hs_idx.starts)
+        yr_id = np.searchsorted(self.years, hs_idx.years_sorted)
+        agr_id = agr.cat.codes.to_numpy()[order].astype(np.int64)
+        rate = (df["관세율_num"].to_numpy(dtype=np.float64)[order] if "관세율_num" in df.columns
+                else np.full(n, np.nan))
+
+        # 1) 적용국가구분=1 → (HS, 연도) 평면에서 계산 후 국가 축으로 브로드캐스트
+        b = country_index.base_pos
+        if "관세율구분" in df.columns:
+            kind = df["관세율구분"].to_numpy()[order[b]]
+            b = b[~np.isin(kind.astype(object), list(ORIGIN_SPECIFIC_CODES))]
+        base_min, base_best, base_mask = self._accumulate(
+            (hs_id[b], yr_id[b]), (H, Y), agr_id[b], rate[b], nbytes)
+        self.base_rate = base_min.astype(np.float32)
+
+        # 2) 적용국가구분=2 → (행, 국가) 쌍으로 펼쳐서 누적
+        pos, cid = [], []
+        for i, c in enumerate(self.countries):
+            p = country_index.postings.get(c)
+            if p is not None and len(p):
+                pos.append(p)
+                cid.append(np.full(len(p), i, dtype=np.int64))
+        if pos:
+            p, c = np.concatenate(pos), np.concatenate(cid)
+            self.min_rate, self.best, self.mask = self._accumulate(
+                (hs_id[p], yr_id[p], c), (H, Y, C), agr_id[p], rate[p], nbytes)
+
+        # 3) 합치기: 공통 세율이 더 낮거나, 국가 지정 세율이 없으면 공통 세율 채택
+        min_rate, best, self.mask = self._merge(
+            (base_min[:, :, None], base_best[:, :, None], base_mask[:, :, None, :]),
+            (self.min_rate, self.best, self.mask))
+        self.min_rate = min_rate.astype(np.float32)
+        self.best = best.astype(np.int16)
+
+    @staticmethod
+    def _merge(base: tuple, spec: tuple) -> tuple:
+        """
+        공통(적용국가구분=1) 누적과 국가 지정(적용국가구분=2) 누적 합치기 — 각각 _accumulate 결과
+        공통 세율이 더 낮거나 국가 지정 세율이 없을 때만 공통 채택 (같은 세율이면 국가 지정 협정이 대표)
+        """
+        base_min, base_best, base_mask = base
+        min_rate, best, mask = spec
+        take_base = ~np.isnan(base_min) & (np.isnan(min_rate) | (base_min < min_rate))
+        return (np.where(take_base, base_min, min_rate), np.where(take_base, base_best, best),
+                mask | base_mask)
+
+    @staticmethod
+    def _accumulate(index: tuple, shape: tuple, agr_id, rate, nbytes: int):
+        """셀별 최저세율 / 그 세율의 관세율구분값 / 적용 관세율구분값 비트마스크"""
+        min_rate = np.full(shape, np.nan, dtype=np.float64)
+        best = np.full(shape, -1, dtype=np.int16)
+        mask = np.zeros(shape + (nbytes,), dtype=np.uint8)
+        if len(agr_id) == 0:
+            return min_rate, best, mask
+        flat = np.ravel_multi_index(index, shape)
+        np.bitwise_or.at(mask.reshape(-1, nbytes), (flat, agr_id >> 3),
+                         (1 << (agr_id & 7)).astype(np.uint8))
+        ok = ~np.isnan(rate)
+        flat, agr_id, rate = flat[ok], agr_id[ok], rate[ok]
+        np.fmin.at(min_rate.reshape(-1), flat, rate)
+        # 셀마다 (세율, 관세율구분값 코드) 가 가장 작은 행 하나를 대표로
+        srt = np.lexsort((agr_id, rate, flat))
+        first = srt[np.r_[True, flat[srt][1:] != flat[srt][:-1]]]
+        best.reshape(-1)[flat[first]] = agr_id[first]
+        return min_rate, best, mask
+
+    # =========================================
+    # 조회
+    # =========================================
+    def _ids(self, hs, year) -> tuple[int, int] | None:
+        try:
+            key = hs_key(hs)
+        except (TypeError, ValueError):
+            return None
+        h = int(np.searchsorted(self.codes, key))
+        y = int(np.searchsorted(self.years, year))
+        if h >= len(self.codes) or self.codes[h] != key or y >= len(self.years) or self.years[y] != year:
+            return None
+        return h, y
+
+    @staticmethod
+    def _rates(values) -> np.ndarray:
+        """float32 저장값 → 표시용 float64 (0.6000000238 → 0.6)"""
+        return np.round(np.asarray(values, dtype=np.float64), 4)
+
+    def _agreement_names(self, bits: np.ndarray) -> list[str]:
+        on = np.flatnonzero(np.unpackbits(bits, bitorder="little")[: len(self.agreements)])
+        return self.agreements[on].tolist()
+
+    def lookup(self, hs, country: str, year: int) -> tuple[float, str | None, list[str]]:
+        """(최저 관세율, 그 세율의 관세율구분값, 적용 가능한 관세율구분값 목록) — 없으면 (nan, None, [])"""
+        ids = self._ids(hs, year)
+        c = self._cty_pos.get(country)
+        if ids is None or c is None:
+            return float("nan"), None, []
+        h, y = ids
+        best = int(self.best[h, y, c])
+        return (float(self._rates(self.min_rate[h, y, c])),
+                self.agreements[best] if best >= 0 else None,
+                self._agreement_names(self.mask[h, y, c]))
+
+    def cheapest(self, hs, year: int) -> pd.DataFrame:
+        """해당 HS/연도의 국가별 최저 관세율 (낮은 순) — '최저세율 원산지' 보기"""
+        cols = ["국가", "최저 관세율(%)", "적용 협정"]
+        ids = self._ids(hs, year)
+        if ids is None or not self.countries:
+            return pd.DataFrame(columns=cols)
+        h, y = ids
+        best = self.best[h, y]
+        out = pd.DataFrame({
+            "국가": self.countries,
+            "최저 관세율(%)": self._rates(self.min_rate[h, y]),
+            "적용 협정": np.where(best >= 0, self.agreements[np.maximum(best, 0)], None),
+        })
+        return out.dropna(subset=["최저 관세율(%)"]).sort_values(
+            ["최저 관세율(%)", "국가"], kind="stable").reset_index(drop=True)
+
+    def to_frame(self, year: int | None = None) -> pd.DataFrame:
+        """긴 형태 (품목번호, 연도, 국가, 최저 관세율, 적용 협정) — 내보내기/검증용"""
+        H, Y, C = self.min_rate.shape
+        h, y, c = (a.ravel() for a in np.meshgrid(np.arange(H), np.arange(Y), np.arange(C), indexing="ij"))
+        best = self.best.ravel()
+        out = pd.DataFrame({
+            "품목번호": hs_str(pd.Series(self.codes[h], dtype="int64")).to_numpy(),
+            "연도": self.years[y],
+            "국가": np.asarray(self.countries, dtype=object)[c],
+            "최저 관세율(%)": self._rates(self.min_rate.ravel()),
+            "적용 협정": np.where(best >= 0, self.agreements[np.maximum(best, 0)], None),
+        })
+        if year is not None:
+            out = out[out["연도"] == year]
+        return out.dropna(subset=["최저 관세율(%)"]).reset_index(drop=True)
@@ -0,0 +1,63 @@
+"""
+연도 파일 변경 감지 (Streamlit 비의존) — 바뀐 연도만 다시 읽고 파생 구조를 부분 갱신하기 위한 입력
+
+- 연도 파일은 `tariff_semi_{연도}.csv` / `tariff_semi_{연도}_with_info.csv` 두 가지 이름만 인정
+- 엑셀 잠금 파일(`~$…`, `zNex~$…`), 숨김/임시 파일(`.…`, `…~`, `*.tmp`, `*.part`) 은 무시
+- TariffWatcher.poll(): 직전 poll 이후 (크기, mtime) 이 바뀌었거나 새로 생기거나 사라진 연도 목록
+  stat 호출만 하므로 rerun 마다 불러도 된다
+"""
+import re
+import threading
+from pathlib import Path
+
+from .snapshot import source_signature
+
+YEAR_FILE = re.compile(r"^tariff_semi_(\d{4})(?:_with_info)?\.csv$")
+TEMP_MARKERS = ("~$", ".~lock")
+TEMP_SUFFIXES = ("~", ".tmp", ".part", ".crdownload")
+
+
+def is_ignored(name: str) -> bool:
+    """잠금/임시/숨김 파일 여부"""
+    return name.startswith(".") or any(m in name for m in TEMP_MARKERS) or name.endswith(TEMP_SUFFIXES)
+
+
+def discover_years(tariff_dir: Path) -> list[int]:
+    """폴더에 있는 연도 파일의 연도 목록 (임시 파일 제외)"""
+    d = Path(tariff_dir)
+    if not d.is_dir():
+        return []
+    years = set()
+    for p in d.iterdir():
+        m = YEAR_FILE.match(p.name)
+        if m and not is_ignored(p.name):
+            years.add(int(m.group(1)))
+    return sorted(years)
+
+
+class TariffWatcher:
+    def __init__(self, tariff_dir: Path, years: list[int] | None = None):
+        """years: 폴더에 없어도 항상 지켜볼 연도 (나머지는 폴더에서 찾음)"""
+        self.tariff_dir = Path(tariff_dir)
+        self._fixed = list(years or [])
+        self._lock = threading.Lock()
+        self._seen = self.scan()
+
+    def scan(self) -> dict[int, tuple]:
+        """연도 → 원본 지문 (원본이 없는 연도는 빠짐)"""
+        years = sorted(set(self._fixed) | set(discover_years(self.tariff_dir)))
+        out = {y: source_signature(self.tariff_dir, y) for y in years}
+        return {y: sig for y, sig in out.items() if sig}
+
+    @property
+    def years(self) -> list[int]:
+        with self._lock:
+            return sorted(self._seen)
+
+    def poll(self) -> list[int]:
+        """직전 poll 이후 바뀐/추가된/삭제된 연도 (없으면 빈 목록). 여러 세션이 동시에 불러도 한 번만 보고"""
+        with self._lock:
+            cur = self.scan()
+            changed = sorted(y for y in set(cur) | set(self._seen) if cur.get(y) != self._seen.get(y))
+            self._seen = cur
+            return changed
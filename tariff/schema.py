@@ -0,0 +1,110 @@
+"""
+관세 데이터프레임의 메모리 절약형 타입 스키마
+
+- 반복되는 문자열(이름/국가/관세율구분값 등) → category
+- 품목번호/결정세번 → int64 코드 (표시할 때는 hs_str 로 10자리 0 채움, 숫자로 읽히지 않는 행은 버리고 로그)
+- 적용개시일/적용만료일 → datetime64, 적용국가구분 → int8
+
+    python -m tariff memory      # 컬럼별 메모리 before/after 리포트
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+log = logging.getLogger("tariff.schema")
+
+HS_WIDTH = 10
+
+CATEGORY_COLS = [
+    "관세율구분", "관세율", "관세율구분값", "국가", "용도세율구분",
+    "결정세번 다름", "이름", "대분류", "소분류",
+]
+INT_CODE_COLS = ["품목번호", "결정세번"]
+DATE_COLS = ["적용개시일", "적용만료일"]
+FLOAT_COLS = ["단위당세액", "기준가격"]  # 관세율_num 은 평균 계산 정밀도 때문에 float64 유지
+
+
+# =========================================
+# HS 코드 변환
+# =========================================
+def hs_key(code) -> int:
+    """'2812190000' / 2812190000 → 2812190000 (품목번호 컬럼 비교용)"""
+    return int(str(code).strip())
+
+
+def hs_str(codes) -> pd.Series | str:
+    """정수 품목번호 → 10자리 문자열(앞자리 0 복원)"""
+    if isinstance(codes, pd.Series):
+        return codes.astype("int64").astype(str).str.zfill(HS_WIDTH)
+    return str(int(codes)).zfill(HS_WIDTH)
+
+
+# =========================================
+# 스키마 적용
+# =========================================
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    문자열(dtype=str)로 읽은 원본 프레임을 압축 타입으로 변환
+    (품목번호/결정세번이 비었거나 숫자가 아닌 행은 버림 — 한 줄 때문에 연도 전체 변환이 실패하지 않도록)
+    """
+    out = df.copy()
+    codes = {c: pd.to_numeric(out[c].astype(str).str.strip(), errors="coerce")
+             for c in INT_CODE_COLS if c in out.columns}
+    bad = np.zeros(len(out), dtype=bool)
+    for v in codes.values():
+        bad |= v.isna().to_numpy()
+    if bad.any():
+        log.warning("품목번호/결정세번을 숫자로 읽을 수 없는 %d행을 제외했습니다 (예: 행 %s)",
+                    int(bad.sum()), ", ".join(map(str, out.index[bad][:5])))
+        out = out[~bad].reset_index(drop=True)
+    for c, v in codes.items():
+        out[c] = v[~bad].to_numpy().astype("int64")
+    for c in DATE_COLS:
+        if c in out.columns:
+            out[c] = pd.to_datetime(out[c], format="%Y%m%d", errors="coerce")
+    if "적용국가구분" in out.columns:
+        out["적용국가구분"] = pd.to_numeric(out["적용국가구분"], errors="coerce").fillna(0).astype("int8")
+    if "연도" in out.columns:
+        out["연도"] = out["연도"].astype("int16")
+    for c in FLOAT_COLS:
+        if c in out.columns:
+            out[c] = pd.to_numeric(out[c], errors="coerce").astype("float32")
+    if "관세율_num" in out.columns:
+        out["관세율_num"] = out["관세율_num"].astype("float64")
+    for c in CATEGORY_COLS:
+        if c in out.columns:
+            out[c] = out[c].astype("category")
+    return out
+
+
+def concat_typed(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    연도별 프레임 합치기. 카테고리 목록이 연도마다 달라 그냥 concat 하면
+    object 로 풀려버리므로, 먼저 카테고리를 합집합으로 맞춘 뒤 합친다.
+    """
+    dfs = [d for d in dfs if d is not None]
+    if not dfs:
+        return pd.DataFrame()
+    if len(dfs) > 1:
+        for c in dfs[0].columns:
+            if all(c in d.columns and isinstance(d[c].dtype, pd.CategoricalDtype) for d in dfs):
+                cats = union_categoricals([d[c] for d in dfs], sort_categories=True).categories
+                dfs = [d.assign(**{c: d[c].cat.set_categories(cats)}) for d in dfs]
+    return pd.concat(dfs, ignore_index=True)
+
+
+# =========================================
+# 메모리 리포트
+# =========================================
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """컬럼별 메모리(MB) 비교표"""
+    b = before.memory_usage(deep=True, index=False) / 1e6
+    a = after.memory_usage(deep=True, index=False) / 1e6
+    rep = pd.DataFrame({"before_MB": b, "after_MB": a.reindex(b.index)})
+    rep["dtype"] = [str(after[c].dtype) if c in after.columns else "" for c in rep.index]
+    rep.loc["합계"] = [b.sum(), a.sum(), ""]
+    rep["ratio"] = (rep["before_MB"] / rep["after_MB"].replace(0, np.nan)).round(1)
+    return rep.round({"before_MB": 3, "after_MB": 3})
+
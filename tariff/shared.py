@@ -0,0 +1,85 @@
+"""
+호스트 단위 공유 프레임 — 압축 없는 Arrow IPC 파일 + 읽기 전용 memory-map
+
+- publish(df, path): Arrow IPC 파일로 한 번 기록 (tmp → os.replace 라서 여러 워커가 동시에 써도 안전)
+- attach(path): 파일을 memory-map 해서 복사 없이 DataFrame 으로 변환
+  (숫자/날짜 컬럼과 카테고리 코드는 OS 페이지 캐시를 그대로 가리킴 → 같은 호스트의 워커끼리 물리 메모리 공유)
+- shared_frame(dir, version, name, build): 있으면 attach, 없으면 build → publish → attach
+  파일은 data_version 별 하위 디렉터리에 두고, 새 버전을 공개할 때 이전 버전 디렉터리는 지운다
+  (이미 매핑한 워커는 유닉스에서 파일이 지워져도 계속 읽을 수 있고, 다음 rerun 에서 새 버전을 매핑)
+
+반환되는 프레임의 버퍼는 읽기 전용 — 호출 측에서 제자리 수정 금지 (기존 캐시 객체와 같은 규칙)
+"""
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+SUFFIX = ".arrow"
+ITEMS_NAME = "items"
+
+
+def facts_name(years) -> str:
+    """연도 조합별 fact 파일 이름 — 앱과 워밍업이 같은 파일을 가리키도록 한 곳에서 만듦"""
+    return "facts_" + "-".join(map(str, years))
+
+
+def to_table(df: pd.DataFrame) -> pa.Table:
+    """
+    DataFrame → Arrow 테이블. 카테고리는 dictionary 로, 나머지는 from_pandas=False 로 변환해
+    float NaN / NaT 를 null 로 바꾸지 않음 (null 이 있으면 pandas 로 돌릴 때 복사가 생김)
+    """
+    cols = [pa.Array.from_pandas(df[c]) if isinstance(df[c].dtype, pd.CategoricalDtype)
+            else pa.array(df[c].to_numpy(), from_pandas=df[c].dtype == object)
+            for c in df.columns]
+    return pa.table(cols, names=[str(c) for c in df.columns])
+
+
+def publish(df: pd.DataFrame, path: Path) -> Path:
+    """압축 없는 Arrow IPC 파일로 기록 (memory-map 으로 바로 읽을 수 있는 형태)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = to_table(df)
+    tmp = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+    return path
+
+
+def attach(path: Path) -> pd.DataFrame:
+    """Arrow IPC 파일을 읽기 전용으로 매핑해 DataFrame 으로 (컬럼마다 별도 블록 → 합치면서 복사하지 않음)"""
+    source = pa.memory_map(str(path), "r")
+    return pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+
+
+def _prune(shared_dir: Path, keep: str) -> None:
+    """다른 데이터 버전 디렉터리 정리 (윈도우에서 매핑 중인 파일은 지워지지 않으므로 실패는 무시)"""
+    for d in shared_dir.iterdir():
+        if d.is_dir() and d.name != keep:
+            shutil.rmtree(d, ignore_errors=True)
+
+
+def shared_frame(shared_dir: Path, version: str, name: str, build) -> pd.DataFrame:
+    """shared_dir/version/name.arrow 를 매핑해서 반환 — 없으면 이 프로세스가 build() 해서 공개"""
+    path = Path(shared_dir) / version / f"{name}{SUFFIX}"
+    if path.exists():
+        try:
+            return attach(path)
+        except (OSError, pa.ArrowInvalid):
+            pass  # 쓰다 만 파일/다른 형식 → 다시 공개
+    publish(build(), path)
+    _prune(Path(shared_dir), version)
+    return attach(path)
+
+
+def published(shared_dir: Path) -> list[dict]:
+    """공개된 파일 목록 (진단 페이지용)"""
+    root = Path(shared_dir)
+    if not root.exists():
+        return []
+    return [{"버전": p.parent.name, "이름": p.stem, "크기(MB)": round(p.stat().st_size / 2**20, 2)}
+            for p in sorted(root.glob(f"*/*{SUFFIX}"))]
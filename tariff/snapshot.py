@@ -0,0 +1,257 @@
+"""
+연도별 관세 CSV → 컬럼형(Arrow IPC/Feather) 스냅샷 컴파일
+
+- 원본 CSV 는 연도마다 한 번만 파싱해 `data/.cache/` 아래에 타입이 지정된 스냅샷으로 저장
+- 스냅샷은 원본 파일의 크기/mtime(변경 시 sha1)으로 검증하고, 원본이 바뀐 연도만 다시 컴파일
+- 컴파일 시 파일은 한 번만 읽어 인코딩 판별·sha1·pyarrow 파싱에 같이 사용
+- 관세율(fact)은 `tariff_semi_{연도}.csv`, 품목 차원은 `*_with_info.csv` 에서 따로 컴파일 (items.py)
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from .items import ITEM_COLS, item_table, split_items
+from .schema import apply_schema, concat_typed
+
+# 파생 컬럼/타입 규칙이 바뀌면 올려서 기존 스냅샷을 모두 무효화
+SCHEMA_VERSION = 3
+
+MANIFEST_NAME = "manifest.json"
+
+# 같은 프로세스의 여러 스레드가 연도별로 동시에 컴파일할 때 매니페스트 갱신 보호
+_manifest_lock = threading.Lock()
+
+
+# =========================================
+# 원본 CSV 읽기
+# =========================================
+def detect_encoding(data: bytes) -> str:
+    """BOM → utf-8-sig, BOM 없는 utf-8 → utf-8, 그 외(엑셀 저장본 등) → cp949"""
+    if data.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError:
+        return "cp949"
+    return "utf-8"
+
+
+def read_csv_safe(path: Path, **kwargs) -> pd.DataFrame:
+    """인코딩을 한 번 판별한 뒤 읽기 (utf-8-sig / utf-8 / cp949) — 실패 시 파일을 다시 읽지 않음"""
+    data = Path(path).read_bytes()
+    return pd.read_csv(io.BytesIO(data), encoding=detect_encoding(data), **kwargs)
+
+
+def info_path(tariff_dir: Path, year: int) -> Path:
+    """품목 정보가 붙은 원본 (품목 차원 테이블의 출처)"""
+    return Path(tariff_dir) / f"tariff_semi_{year}_with_info.csv"
+
+
+def source_path(tariff_dir: Path, year: int) -> Path:
+    """관세율 fact 원본 — 품목 정보 없는 연도 파일, 없으면 with_info 파일(중복 제거해서 사용)"""
+    plain = Path(tariff_dir) / f"tariff_semi_{year}.csv"
+    return plain if plain.exists() else info_path(tariff_dir, year)
+
+
+def default_cache_dir(tariff_dir: Path) -> Path:
+    """data/tariff_semi → data/.cache"""
+    return Path(tariff_dir).parent / ".cache"
+
+
+def parse_csv_bytes(data: bytes, encoding: str | None = None) -> pd.DataFrame:
+    """
+    pyarrow 멀티스레드 CSV 파서로 한 번에 파싱 (모든 컬럼 문자열, 빈 칸은 NaN → read_csv(dtype=str) 와 동일)
+    """
+    encoding = encoding or detect_encoding(data)
+    if encoding != "utf-8-sig" and encoding != "utf-8":
+        data = data.decode(encoding).encode("utf-8")
+    header = next(csv.reader([data.split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")]))
+    table = pa_csv.read_csv(
+        io.BytesIO(data),
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={c: pa.string() for c in header},
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
+def parse_year(path: Path, year: int, typed: bool = True, data: bytes | None = None) -> pd.DataFrame:
+    """
+    원본 CSV 한 개를 읽어 '연도', '관세율_num' 파생 컬럼까지 만든 프레임
+    - typed=False 면 문자열 그대로(메모리 비교용), True 면 schema.apply_schema 적용
+    - data 를 주면 파일을 다시 읽지 않음 (지문 계산과 파싱에 같은 바이트 사용)
+    """
+    df = parse_csv_bytes(Path(path).read_bytes() if data is None else data)
+    df["연도"] = year
+    # 관세율 숫자형 변환
+    if "관세율" in df.columns:
+        df["관세율_num"] = pd.to_numeric(df["관세율"].str.replace(",", ""), errors="coerce")
+    # 품목번호 표준화(공백 제거)
+    if "품목번호" in df.columns:
+        df["품목번호"] = df["품목번호"].astype(str).str.strip()
+    return apply_schema(df) if typed else df
+
+
+# =========================================
+# 원본 지문(fingerprint) / 매니페스트
+# =========================================
+def _sha1(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat(path: Path) -> dict:
+    st_ = path.stat()
+    return {"size": st_.st_size, "mtime_ns": st_.st_mtime_ns}
+
+
+def _load_manifest(cache_dir: Path) -> dict:
+    """{"schema_version", "years": 연도별 fact 스냅샷, "items": 연도별 품목 차원 스냅샷}"""
+    f = cache_dir / MANIFEST_NAME
+    empty = {"schema_version": SCHEMA_VERSION, "years": {}, "items": {}}
+    try:
+        manifest = json.loads(f.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return empty
+    if manifest.get("schema_version") != SCHEMA_VERSION:
+        return empty
+    return {**empty, **manifest}
+
+
+def _save_manifest(cache_dir: Path, manifest: dict) -> None:
+    f = cache_dir / MANIFEST_NAME
+    tmp = f.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, f)
+
+
+def _is_fresh(entry: dict | None, src: Path, snap: Path) -> bool | None:
+    """
+    True: 스냅샷 그대로 사용 / False: 다시 컴파일
+    None: 내용은 같지만 mtime 만 바뀜(매니페스트만 갱신)
+    """
+    if not entry or not snap.exists():
+        return False
+    cur = _stat(src)
+    if cur["size"] == entry.get("size") and cur["mtime_ns"] == entry.get("mtime_ns"):
+        return True
+    if cur["size"] == entry.get("size") and _sha1(src) == entry.get("sha1"):
+        return None
+    return False
+
+
+def snapshot_path(cache_dir: Path, year: int, section: str = "years") -> Path:
+    name = "tariff_semi" if section == "years" else "tariff_items"
+    return Path(cache_dir) / f"{name}_{year}.arrow"
+
+
+def _compile(src: Path, year: int, section: str, build, cache_dir: Path) -> pd.DataFrame:
+    """매니페스트[section][연도] 로 검증해 스냅샷을 쓰거나, build(bytes) 로 다시 만들어 저장"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    snap = snapshot_path(cache_dir, year, section)
+
+    manifest = _load_manifest(cache_dir)
+    entry = manifest[section].get(str(year))
+    if entry and entry.get("source") != src.name:
+        entry = None  # 출처 파일이 바뀜 (예: with_info → 연도 파일)
+    fresh = _is_fresh(entry, src, snap)
+    if fresh is not False:
+        try:
+            df = pd.read_feather(snap)
+        except (OSError, ValueError):
+            fresh = False
+        else:
+            if fresh is None:
+                with _manifest_lock:
+                    manifest = _load_manifest(cache_dir)
+                    manifest[section].setdefault(str(year), entry).update(_stat(src))
+                    _save_manifest(cache_dir, manifest)
+            return df
+
+    data = src.read_bytes()  # 파일은 한 번만 읽어서 지문과 파싱에 같이 사용
+    df = build(data)
+    tmp = snap.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+    df.to_feather(tmp)
+    os.replace(tmp, snap)
+
+    # 다른 연도를 동시에 컴파일한 스레드/프로세스가 있을 수 있으므로 최신 매니페스트에 병합
+    with _manifest_lock:
+        manifest = _load_manifest(cache_dir)
+        manifest[section][str(year)] = {"source": src.name, "sha1": hashlib.sha1(data).hexdigest(), **_stat(src)}
+        _save_manifest(cache_dir, manifest)
+    return df
+
+
+def compile_year(tariff_dir: Path, year: int, cache_dir: Path | None = None) -> pd.DataFrame | None:
+    """한 연도의 관세율 fact 스냅샷을 (필요할 때만) 컴파일하고 프레임을 반환. 원본이 없으면 None"""
+    src = source_path(tariff_dir, year)
+    if not src.exists():
+        return None
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(tariff_dir)
+    # with_info 로 대신 읽는 경우 품목 컬럼을 떼고 결정세번 때문에 생긴 중복 행 제거
+    return _compile(src, year, "years", lambda data: split_items(parse_year(src, year, data=data))[0], cache_dir)
+
+
+def compile_items(tariff_dir: Path, year: int, cache_dir: Path | None = None) -> pd.DataFrame | None:
+    """한 연도의 품목 차원 스냅샷 (품목번호 + 결정세번/이름/대분류/소분류). 원본이 없으면 None"""
+    src = info_path(tariff_dir, year)
+    if not src.exists():
+        return None
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(tariff_dir)
+    cols = ["품목번호"] + ITEM_COLS
+
+    def build(data: bytes) -> pd.DataFrame:
+        df = parse_csv_bytes(data)
+        return apply_schema(df[[c for c in cols if c in df.columns]].drop_duplicates(ignore_index=True))
+
+    return _compile(src, year, "items", build, cache_dir)
+
+
+def source_signature(tariff_dir: Path, year: int) -> tuple:
+    """fact/품목 원본 CSV 의 (크기, mtime_ns) 들 — 파일이 없으면 빈 튜플"""
+    sig = ()
+    for src in dict.fromkeys([source_path(tariff_dir, year), info_path(tariff_dir, year)]):
+        if src.exists():
+            s = _stat(src)
+            sig += (src.name, s["size"], s["mtime_ns"])
+    return sig
+
+
+def data_version(tariff_dir: Path, years: list[int]) -> str:
+    """원본 파일 크기/mtime 으로 만든 데이터 버전 문자열(캐시 키용, stat 호출만 수행)"""
+    h = hashlib.sha1(str(SCHEMA_VERSION).encode())
+    for y in years:
+        sig = source_signature(tariff_dir, y)
+        if sig:
+            h.update(f"{y}:{':'.join(map(str, sig))};".encode())
+    return h.hexdigest()[:16]
+
+
+def load_tariff_frame(tariff_dir: Path, years: list[int], cache_dir: Path | None = None) -> pd.DataFrame:
+    """연도별 스냅샷을 스레드 풀에서 동시에 읽어 하나로 합친 프레임(바뀐 연도만 CSV 재파싱)"""
+    years = list(years)
+    with ThreadPoolExecutor(max_workers=max(len(years), 1)) as pool:
+        dfs = list(pool.map(lambda y: compile_year(tariff_dir, y, cache_dir), years))
+    return concat_typed(dfs)
+
+
+def load_item_table(tariff_dir: Path, years: list[int], cache_dir: Path | None = None) -> pd.DataFrame:
+    """연도별 품목 차원 스냅샷을 동시에 읽어 중복 제거한 품목 테이블"""
+    years = list(years)
+    with ThreadPoolExecutor(max_workers=max(len(years), 1)) as pool:
+        dfs = list(pool.map(lambda y: compile_items(tariff_dir, y, cache_dir), years))
+    return item_table(dfs)
@@ -0,0 +1,64 @@
+"""
+연도별 지연 로딩(lazy) 저장소
+
+- year(y): 그 연도를 처음 요청할 때만 스냅샷/CSV 를 읽음 (이후 메모리에서 재사용)
+- prefetch(years): 나머지 연도를 스레드 풀에서 미리 읽기 시작 (요청 스레드는 막지 않음)
+- 같은 연도를 여러 스레드가 동시에 요청해도 실제 로딩은 한 번 (Future 공유)
+- 원본 CSV 의 크기/mtime 이 바뀌면 해당 연도만 다시 로딩
+- release(years): 합친 프레임을 다른 곳(공유 memory-map 등)에 넘긴 뒤 연도별 사본을 놓아 줌
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from .schema import concat_typed
+from .snapshot import compile_year, source_signature
+
+
+class TariffStore:
+    def __init__(self, tariff_dir: Path, years: list[int], cache_dir: Path | None = None,
+                 max_workers: int | None = None):
+        self.tariff_dir = Path(tariff_dir)
+        self.years = list(years)
+        self.cache_dir = cache_dir
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or max(len(self.years), 1),
+                                        thread_name_prefix="tariff-load")
+        self._lock = threading.Lock()
+        self._loads: dict[int, tuple[tuple, Future]] = {}  # 연도 → (원본 지문, 로딩 Future)
+
+    def _future(self, year: int) -> Future:
+        sig = source_signature(self.tariff_dir, year)
+        with self._lock:
+            cur = self._loads.get(year)
+            if cur is None or cur[0] != sig:
+                fut = self._pool.submit(compile_year, self.tariff_dir, year, self.cache_dir)
+                self._loads[year] = (sig, fut)
+                return fut
+            return cur[1]
+
+    def prefetch(self, years: list[int] | None = None) -> None:
+        """백그라운드 로딩 시작 (이미 로딩 중/완료면 아무것도 안 함)"""
+        for y in years or self.years:
+            self._future(y)
+
+    def year(self, year: int) -> pd.DataFrame | None:
+        """한 연도 프레임 (원본이 없으면 None)"""
+        return self._future(year).result()
+
+    def frame(self, years: list[int] | None = None) -> pd.DataFrame:
+        """여러 연도를 합친 프레임 — 요청한 연도만 (동시에) 로딩"""
+        years = list(years or self.years)
+        futures = [self._future(y) for y in years]
+        return concat_typed([f.result() for f in futures])
+
+    def release(self, years: list[int] | None = None) -> None:
+        """연도별 프레임 참조를 버림 (다음 요청 때 스냅샷에서 다시 읽음)"""
+        with self._lock:
+            for y in years or self.years:
+                self._loads.pop(y, None)
+
+    def loaded_years(self) -> list[int]:
+        with self._lock:
+            return sorted(y for y, (_, f) in self._loads.items() if f.done() and not f.exception())
@@ -0,0 +1,121 @@
+"""
+적용개시일/적용만료일 유효기간 인덱스 — "날짜 D 에 적용 중인 관세율" 조회
+
+HS 구간 안에서 행을 적용개시일 순으로 다시 정렬하고, 두 배열을 들고 있는다.
+- starts: (HS 구간 번호, 적용개시일) 을 하나의 정수 키로 합친 값 → 전체가 단조 증가
+- reach : 같은 HS 구간 안에서 적용만료일의 누적 최댓값을 같은 방식으로 합친 값 → 단조 증가
+날짜 D 의 후보는 reach >= D 인 첫 위치 ~ starts <= D 인 마지막 위치 사이뿐이라
+searchsorted 두 번 + 좁은 구간 필터로 끝난다. 여러 (HS, 날짜) 쌍도 한 번에 벡터 연산으로 처리.
+"""
+import numpy as np
+import pandas as pd
+
+from .hs_index import HsIndex
+from .schema import hs_key
+
+_EPOCH = np.datetime64("1900-01-01", "D")
+_SPAN = 1 << 17  # 1900-01-01 부터의 일수 상한 (~2258년) — HS 구간 번호와 합칠 때의 자리수
+
+
+def _days(values) -> np.ndarray:
+    """날짜 배열 → 1900-01-01 기준 일수 (NaT 는 -1, 호출 측에서 열린 구간으로 처리)"""
+    d = pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[D]")
+    out = (d - _EPOCH).astype(np.int64)
+    out[np.isnat(d)] = -1
+    return out
+
+
+class ValidityIndex:
+    def __init__(self, hs_index: HsIndex):
+        self.hs_index = hs_index
+        df = hs_index.df
+        n = len(hs_index.order)
+        if n == 0 or "적용개시일" not in df.columns or "적용만료일" not in df.columns:
+            self.order = np.empty(0, dtype=np.int64)
+            self.starts = self.reach = self.end = np.empty(0, dtype=np.int64)
+            return
+
+        seg = np.repeat(np.arange(len(hs_index.codes), dtype=np.int64), hs_index.ends - hs_index.starts)
+        start = _days(df["적용개시일"].to_numpy()[hs_index.order])
+        end = _days(df["적용만료일"].to_numpy()[hs_index.order])
+        start = np.where(start < 0, 0, start)              # 개시일 없음 → 처음부터
+        end = np.where(end < 0, _SPAN - 1, end)            # 만료일 없음 → 계속 유효
+
+        # HS 구간은 그대로 두고 구간 안에서만 (적용개시일, 적용만료일) 순으로 재정렬
+        srt = np.lexsort((end, start, seg))
+        self.order = hs_index.order[srt]                   # df 행 위치
+        seg, start, end = seg[srt], start[srt], end[srt]
+        self.end = end
+        self.starts = seg * _SPAN + start
+        # 구간 번호를 더해 두면 전체 누적 최댓값이 구간마다 자동으로 새로 시작됨
+        self.reach = np.maximum.accumulate(seg * _SPAN + end)
+
+    # =========================================
+    # 조회
+    # =========================================
+    def _segments(self, hs) -> np.ndarray:
+        """HS 코드들(정수 키 배열 또는 문자열) → HsIndex 구간 번호 (없는 코드는 -1)"""
+        codes = self.hs_index.codes
+        arr = np.atleast_1d(np.asarray(hs))
+        if arr.dtype.kind in "iu":
+            keys = arr.astype(np.int64)
+        else:
+            keys = np.array([self._key(h) for h in arr.astype(object)], dtype=np.int64)
+        if len(codes) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        i = np.minimum(np.searchsorted(codes, keys), len(codes) - 1)
+        return np.where(codes[i] == keys, i, -1)
+
+    @staticmethod
+    def _key(hs) -> int:
+        try:
+            return hs_key(hs)
+        except (TypeError, ValueError):
+            return -1
+
+    def lookup(self, hs, dates) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (HS, 날짜) 쌍 배치 조회 → (질의 번호, df 행 위치)
+        hs 와 dates 는 같은 길이거나 한쪽이 스칼라(브로드캐스트)
+        """
+        seg = self._segments(hs)
+        day = _days(np.atleast_1d(np.asarray(dates, dtype="datetime64[ns]")))
+        seg, day = np.broadcast_arrays(seg, day)
+        q = np.flatnonzero((seg >= 0) & (day >= 0) & (day < _SPAN))
+        if len(q) == 0 or len(self.order) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        key = seg[q] * _SPAN + day[q]
+        lo = np.searchsorted(self.reach, key, "left")     # 이 앞은 전부 D 이전에 만료
+        hi = np.searchsorted(self.starts, key, "right")   # 이 뒤는 전부 D 이후에 개시
+        cnt = np.maximum(hi - lo, 0)
+        # 후보 구간 펼치기: 질의마다 lo..hi-1
+        qid = np.repeat(q, cnt)
+        pos = np.repeat(lo - np.cumsum(cnt) + cnt, cnt) + np.arange(cnt.sum())
+        keep = self.end[pos] >= day[qid]
+        return qid[keep], self.order[pos[keep]]
+
+    def positions(self, hs, date) -> np.ndarray:
+        """날짜 D 에 적용 중인 해당 HS 행의 df 위치 (원본 순서)"""
+        _, pos = self.lookup(hs, date)
+        return np.sort(pos)
+
+    def rows(self, hs, date) -> pd.DataFrame:
+        """날짜 D 에 적용 중인 해당 HS 행"""
+        return self.hs_index.df.take(self.positions(hs, date))
+
+    def rows_at(self, hs, dates) -> pd.DataFrame:
+        """여러 날짜(또는 여러 HS × 날짜) 한 번에 — 결과에 '기준일' 컬럼을 붙여 반환"""
+        dates = pd.to_datetime(pd.Series(np.atleast_1d(np.asarray(dates, dtype="datetime64[ns]"))))
+        qid, pos = self.lookup(hs, dates.to_numpy())
+        out = self.hs_index.df.take(pos)
+        ref = np.broadcast_to(dates.to_numpy(), np.broadcast_shapes(np.shape(np.atleast_1d(hs)), dates.shape))
+        return out.assign(기준일=ref[qid])
+
+
+def in_force(df: pd.DataFrame, date) -> pd.Series:
+    """이미 골라낸 행(예: 국가별 행)에서 날짜 D 에 적용 중인 행 마스크 (만료일 당일 포함)"""
+    d = pd.Timestamp(date)
+    start = df["적용개시일"] if "적용개시일" in df.columns else pd.Series(pd.NaT, index=df.index)
+    end = df["적용만료일"] if "적용만료일" in df.columns else pd.Series(pd.NaT, index=df.index)
+    return (start.isna() | (start <= d)) & (end.isna() | (end >= d))
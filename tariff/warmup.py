@@ -0,0 +1,69 @@
+"""
+서버 워밍업 (Streamlit 비의존) — 배포 직후 첫 사용자가 캐시 생성 비용을 내지 않도록 트래픽 전에 실행
+
+    python -m tariff warmup && streamlit run streamlit_app.py
+
+- warm_up(): 호스트 단위 캐시를 순서대로 채움
+  연도별 스냅샷(data/.cache) → 연도×류 파티션 → 워커들이 매핑할 공유 Arrow 파일
+  이후 워커는 CSV 파싱 없이 파일을 매핑하고 작은 인덱스만 만든다 (그 시간도 index.* 로 같이 측정)
+- import_times(): 모듈마다 새 인터프리터에서 import 한 시간 — 지연 import 대상 확인용
+"""
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .config import HS_PATH, SHARED_DIR, TARIFF_DIR, YEARS
+
+# 앱이 시작할 때 / 차트 페이지에서만 불러오는 모듈
+IMPORT_MODULES = ["pandas", "pyarrow", "streamlit", "tariff", "plotly.express"]
+
+
+def warm_up(tariff_dir: Path = TARIFF_DIR, years: list[int] = YEARS, hs_path: Path = HS_PATH,
+            shared_dir: Path = SHARED_DIR) -> dict[str, float]:
+    """단계별 소요 시간(초). 이미 만들어진 캐시는 검증만 하므로 두 번째 실행은 빠르다"""
+    from . import (CountryIndex, HsIndex, HsPrefixIndex, PartitionedStore, RateMatrix, TariffCube,
+                   ValidityIndex, data_version, load_item_table, load_tariff_frame, read_csv_safe)
+    from .shared import ITEMS_NAME, facts_name, shared_frame
+
+    times = {}
+
+    def step(name, fn, *args):
+        t = time.perf_counter()
+        out = fn(*args)
+        times[name] = round(time.perf_counter() - t, 4)
+        return out
+
+    version = step("version", data_version, tariff_dir, years)
+    facts = step("snapshot.facts", load_tariff_frame, tariff_dir, years)
+    items = step("snapshot.items", load_item_table, tariff_dir, years)
+    step("partitions", PartitionedStore(tariff_dir, years).sync)
+    df = step("shared.facts", shared_frame, shared_dir, version, facts_name(years), lambda: facts)
+    items = step("shared.items", shared_frame, shared_dir, version, ITEMS_NAME, lambda: items)
+    del facts  # 이후로는 매핑된 사본만 사용 (워커와 같은 경로)
+
+    # 워커마다 다시 만드는 인덱스 — 공유 파일을 매핑한 상태에서의 비용
+    step("index.hs_list", lambda: HsPrefixIndex(read_csv_safe(hs_path, dtype=str).iloc[:, 0].dropna()))
+    hs_idx = step("index.hs", HsIndex, df, items)
+    cty_idx = step("index.country", CountryIndex, hs_idx)
+    step("index.rate_matrix", RateMatrix, cty_idx)
+    step("index.validity", ValidityIndex, hs_idx)
+    step("index.cube", TariffCube, df, items)
+    return times
+
+
+def import_times(modules: list[str] = IMPORT_MODULES) -> dict[str, float]:
+    """
+    모듈별 cold import 시간(초) — 서로 영향이 없도록 각각 새 인터프리터에서 측정
+    (레포 루트의 streamlit.py 가 streamlit 패키지를 가리지 않도록 루트는 sys.path 맨 뒤에 추가)
+    """
+    code = "import importlib, sys, time; sys.path.append(sys.argv[2]); t = time.perf_counter(); " \
+           "importlib.import_module(sys.argv[1]); print(time.perf_counter() - t)"
+    root = str(Path(__file__).resolve().parent.parent)
+    out = {}
+    for m in modules:
+        r = subprocess.run([sys.executable, "-c", code, m, root], capture_output=True, text=True,
+                           cwd=tempfile.gettempdir())
+        out[m] = round(float(r.stdout.strip()), 4) if r.returncode == 0 and r.stdout.strip() else None
+    return out
@@ -0,0 +1,43 @@
+"""BOM 일괄 조회 — 기준일 있는 줄과 없는 줄이 같은 결과를 내는지 (레포 data/ 기준)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from tariff import CountryIndex, HsIndex, RateMatrix, ValidityIndex, load_item_table, load_tariff_frame
+from tariff.bom import normalize_bom, resolve_bom
+from tariff.config import TARIFF_DIR, YEARS
+
+
+@pytest.fixture(scope="module")
+def indexes():
+    df = load_tariff_frame(TARIFF_DIR, YEARS)
+    hs_idx = HsIndex(df, load_item_table(TARIFF_DIR, YEARS))
+    cty_idx = CountryIndex(hs_idx)
+    return RateMatrix(cty_idx), ValidityIndex(hs_idx), cty_idx
+
+
+def test_dated_and_undated_lines_agree(indexes):
+    rate_mx, valid_idx, cty_idx = indexes
+    year = int(rate_mx.years[-1])
+    hs, cty = np.meshgrid(np.arange(len(rate_mx.codes)), np.arange(len(rate_mx.countries)), indexing="ij")
+    lines = pd.DataFrame({
+        "HS코드": pd.Series(rate_mx.codes[hs.ravel()]).astype(str).str.zfill(10),
+        "원산지": np.asarray(rate_mx.countries, dtype=object)[cty.ravel()],
+    })
+    undated = resolve_bom(normalize_bom(lines), rate_mx, valid_idx, cty_idx, default_year=year)
+    dated = resolve_bom(normalize_bom(lines.assign(기준일=f"{year}-06-01")), rate_mx, valid_idx, cty_idx)
+
+    # 연중 세율이 바뀌지 않은 줄(세율·적용 가능 협정이 같은 줄)은 대표 협정도 같아야 함
+    same = ((undated["최저 관세율(%)"].fillna(-1) == dated["최저 관세율(%)"].fillna(-1))
+            & (undated["적용 가능 협정"] == dated["적용 가능 협정"]))
+    assert same.mean() > 0.9
+    pd.testing.assert_series_equal(undated.loc[same, "최저세율 협정"], dated.loc[same, "최저세율 협정"])
+
+
+def test_unparsable_hs_codes_are_flagged(indexes):
+    rate_mx, valid_idx, cty_idx = indexes
+    country = rate_mx.countries[0]
+    bom = normalize_bom(pd.DataFrame({"HS코드": ["", None, "abc", "9999999999"], "원산지": [country] * 4}))
+    out = resolve_bom(bom, rate_mx, valid_idx, cty_idx)
+    assert out["HS코드"].tolist() == ["", "", "abc", "9999999999"]
+    assert out["비고"].tolist() == ["HS 코드 형식 오류"] * 3 + ["HS 코드 없음"]
@@ -0,0 +1,26 @@
+"""연도별 변경 내역 — ChangeLog.filter 의 최소 변동폭 조건"""
+import pandas as pd
+
+from tariff.changes import COUNTRY, DOWN, NEW, ChangeLog
+
+
+def _frame() -> pd.DataFrame:
+    rows = [
+        # (연도, 품목번호, 관세율구분, 관세율, 국가)
+        (2024, 8486201000, "FCN1", 8.0, "미국"),
+        (2025, 8486201000, "FCN1", 8.0, "미국 캐나다"),  # 세율 그대로, 국가만 추가
+        (2024, 8542310000, "FEU1", 5.0, "독일"),
+        (2025, 8542310000, "FEU1", 4.9, "독일"),         # 0.1%p 인하
+        (2025, 3707901000, "A", 6.5, "all"),            # 신규
+    ]
+    df = pd.DataFrame(rows, columns=["연도", "품목번호", "관세율구분", "관세율_num", "국가"])
+    return df.assign(관세율=df["관세율_num"].astype(str), 관세율구분값=df["관세율구분"], 적용국가구분=2)
+
+
+def test_min_delta_keeps_country_only_changes():
+    log = ChangeLog(_frame())
+    assert set(log.filter()["변경"]) == {COUNTRY, DOWN, NEW}
+
+    out = log.filter(min_delta=1.0)
+    assert set(out["변경"]) == {COUNTRY, NEW}
+    assert out.loc[out["변경"] == COUNTRY, "추가 국가"].tolist() == ["캐나다"]
@@ -0,0 +1,63 @@
+"""
+연도 파일 교체 후 부분 갱신 — 레포 사본에서 앱을 띄우고 연도 파일 하나를 고친 뒤
+같은 세션의 페이지들이 예외 없이 새 값으로 다시 그려지는지 (파티션/스냅샷/큐브/변경 내역 캐시 경로)
+"""
+import shutil
+from pathlib import Path
+
+import pytest
+
+import tariff.config
+from tariff.loadtest import _prefer_installed_streamlit
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = ["수입 관세율 조회", "연도별 관세 추이", "HS 그룹 비교", "연도별 변경 내역"]
+
+
+@pytest.fixture
+def app_copy(tmp_path, monkeypatch):
+    """앱 + data/ 사본 (캐시/공유 파일도 사본 아래에 생김)"""
+    data = tmp_path / "data"
+    (data / "tariff_semi").mkdir(parents=True)
+    shutil.copy(ROOT / "streamlit_app.py", tmp_path)
+    shutil.copy(ROOT / "data" / "unique_hscode_semi.csv", data)
+    for f in (ROOT / "data" / "tariff_semi").glob("tariff_semi_*.csv"):
+        shutil.copy(f, data / "tariff_semi")
+    monkeypatch.setattr(tariff.config, "SHARED_DIR", data / ".cache" / "shared")
+    return tmp_path
+
+
+def _trend_max(at, year: int) -> float:
+    at.sidebar.radio[0].set_value("연도별 관세 추이").run()
+    table = at.dataframe[0].value
+    return float(table.loc[table["연도"] == year, "최고(%)"].iloc[0])
+
+
+def _run_pages(at) -> None:
+    for page in PAGES:
+        at.sidebar.radio[0].set_value(page).run()
+        assert not at.exception, (page, [e.value for e in at.exception])
+
+
+def test_edited_year_file_rerenders_pages(app_copy):
+    _prefer_installed_streamlit()
+    AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+    at = AppTest.from_file(str(app_copy / "streamlit_app.py"), default_timeout=300)
+    at.run()
+    assert not at.exception
+    _run_pages(at)
+    assert _trend_max(at, 2025) == 5.5
+
+    # 2025년 첫 행(2812190000 기본세율 5%)을 9.5% 로 — 파일 크기도 바뀜
+    src = app_copy / "data" / "tariff_semi" / "tariff_semi_2025.csv"
+    text = src.read_text(encoding="utf-8")
+    old = "2812190000,A,5,,,1,,20250101,20251231,기본세율,all"
+    assert old in text
+    src.write_text(text.replace(old, old.replace(",A,5,", ",A,9.5,"), 1), encoding="utf-8")
+
+    at.run()
+    assert not at.exception
+    assert any("2025" in t.value for t in at.toast)
+    _run_pages(at)
+    assert _trend_max(at, 2025) == 9.5